@@ -1,12 +1,20 @@
-from typing import List, Optional
+import json
+from typing import Dict, List, Optional
 from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from datetime import datetime
 from app.core.database import get_db
-from app.models import ProcessingBatch, UsageRecord, MatchResult
+from app.api.pagination import COUNT_MODES, count_rows, keyset_page, page_results, parse_datetime
+from app.models import BatchJob, BatchStats, ProcessingBatch, UsageRecord
+from app.services.ai_review import count_pending_reviews
+from app.services.matching import MatchingService
+from app.services.batch_jobs import active_job, batch_job_runner
+from app.services.batch_stats import FAST_PATH_STAGES, BatchStatsCollector
+from app.services.progress import BatchProgress, progress_bus
 
 router = APIRouter()
 
@@ -19,6 +27,17 @@ class BatchResponse(BaseModel):
     matched_records: int
     unmatched_records: int
     flagged_records: int
+    embeddings_skipped: int = 0
+    ai_cache_hits: int = 0
+    ai_cache_misses: int = 0
+    ai_cache_hit_rate: Optional[float] = None
+    ai_reviews_queued: int = 0
+    pending_ai_reviews: int = 0
+    ai_skipped: int = 0
+    ai_calls: int = 0
+    ai_seconds: float = 0
+    degraded_records: int = 0
+    auto_confirmed_records: int = 0
     status: str
     error_message: Optional[str] = None
     started_at: Optional[datetime] = None
@@ -31,9 +50,61 @@ class BatchResponse(BaseModel):
 
 class BatchListResponse(BaseModel):
     batches: List[BatchResponse]
-    total: int
+    total: Optional[int] = None
     page: int
     page_size: int
+    next_cursor: Optional[str] = None
+
+
+class BatchJobResponse(BaseModel):
+    id: str
+    batch_id: str
+    archive: bool
+    status: str
+    phase: Optional[str] = None
+    rows_total: int = 0
+    rows_done: int = 0
+    archive_path: Optional[str] = None
+    error_message: Optional[str] = None
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    created_at: datetime
+
+
+class BatchStatsResponse(BaseModel):
+    batch_id: str
+    match_types: Dict[str, int] = {}
+    confidence_histogram: Dict[str, int] = {}
+    decided_by: Dict[str, int] = {}
+    fast_path_hits: int = 0
+    stage_runs: Dict[str, int] = {}
+    stage_seconds: Dict[str, float] = {}
+    updated_at: Optional[datetime] = None
+
+
+def job_response(job: BatchJob) -> BatchJobResponse:
+    return BatchJobResponse(
+        id=str(job.id),
+        batch_id=str(job.batch_id),
+        archive=job.archive,
+        status=job.status,
+        phase=job.phase,
+        rows_total=job.rows_total or 0,
+        rows_done=job.rows_done or 0,
+        archive_path=job.archive_path,
+        error_message=job.error_message,
+        started_at=job.started_at,
+        completed_at=job.completed_at,
+        created_at=job.created_at
+    )
+
+
+def cache_hit_rate(batch: ProcessingBatch) -> Optional[float]:
+    """Share of LLM verdicts served from the cache, or None if none were needed."""
+    lookups = (batch.ai_cache_hits or 0) + (batch.ai_cache_misses or 0)
+    if not lookups:
+        return None
+    return round((batch.ai_cache_hits or 0) / lookups, 4)
 
 
 @router.get("", response_model=BatchListResponse)
@@ -41,25 +112,34 @@ async def list_batches(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
     status: Optional[str] = None,
+    cursor: Optional[str] = None,
+    count: str = Query("exact", pattern=COUNT_MODES),
     db: AsyncSession = Depends(get_db)
 ):
-    """List all processing batches."""
-    query = select(ProcessingBatch).order_by(ProcessingBatch.created_at.desc())
+    """List all processing batches, newest first.
+
+    Pass ``next_cursor`` back as ``cursor`` to page by keyset instead of offset.
+    """
+    query = select(ProcessingBatch)
 
     if status:
         query = query.where(ProcessingBatch.status == status)
 
-    # Count total
-    count_query = select(func.count(ProcessingBatch.id))
-    if status:
-        count_query = count_query.where(ProcessingBatch.status == status)
-    total_result = await db.execute(count_query)
-    total = total_result.scalar() or 0
+    total = await count_rows(db, query, count)
 
     # Paginate
-    query = query.offset((page - 1) * page_size).limit(page_size)
+    query = keyset_page(
+        query,
+        (ProcessingBatch.created_at, ProcessingBatch.id),
+        (parse_datetime, UUID),
+        page, page_size, cursor,
+        descending=True
+    )
     result = await db.execute(query)
-    batches = result.scalars().all()
+    batches, next_cursor = page_results(
+        result.scalars().all(), page_size, lambda batch: (batch.created_at, batch.id)
+    )
+    pending_reviews = await count_pending_reviews(db, [b.id for b in batches])
 
     return BatchListResponse(
         batches=[
@@ -71,6 +151,17 @@ async def list_batches(
                 matched_records=b.matched_records,
                 unmatched_records=b.unmatched_records,
                 flagged_records=b.flagged_records,
+                embeddings_skipped=b.embeddings_skipped or 0,
+                ai_cache_hits=b.ai_cache_hits or 0,
+                ai_cache_misses=b.ai_cache_misses or 0,
+                ai_cache_hit_rate=cache_hit_rate(b),
+                ai_reviews_queued=b.ai_reviews_queued or 0,
+                pending_ai_reviews=pending_reviews.get(b.id, 0),
+                ai_skipped=b.ai_skipped or 0,
+                ai_calls=b.ai_calls or 0,
+                ai_seconds=round(b.ai_seconds or 0, 2),
+                degraded_records=b.degraded_records or 0,
+                auto_confirmed_records=b.auto_confirmed_records or 0,
                 status=b.status,
                 error_message=b.error_message,
                 started_at=b.started_at,
@@ -81,7 +172,8 @@ async def list_batches(
         ],
         total=total,
         page=page,
-        page_size=page_size
+        page_size=page_size,
+        next_cursor=next_cursor
     )
 
 
@@ -95,6 +187,8 @@ async def get_batch(
     if not batch:
         raise HTTPException(status_code=404, detail="Batch not found")
 
+    pending_reviews = await count_pending_reviews(db, [batch.id])
+
     return BatchResponse(
         id=str(batch.id),
         filename=batch.filename,
@@ -103,6 +197,17 @@ async def get_batch(
         matched_records=batch.matched_records,
         unmatched_records=batch.unmatched_records,
         flagged_records=batch.flagged_records,
+        embeddings_skipped=batch.embeddings_skipped or 0,
+        ai_cache_hits=batch.ai_cache_hits or 0,
+        ai_cache_misses=batch.ai_cache_misses or 0,
+        ai_cache_hit_rate=cache_hit_rate(batch),
+        ai_reviews_queued=batch.ai_reviews_queued or 0,
+        pending_ai_reviews=pending_reviews.get(batch.id, 0),
+        ai_skipped=batch.ai_skipped or 0,
+        ai_calls=batch.ai_calls or 0,
+        ai_seconds=round(batch.ai_seconds or 0, 2),
+        degraded_records=batch.degraded_records or 0,
+        auto_confirmed_records=batch.auto_confirmed_records or 0,
         status=batch.status,
         error_message=batch.error_message,
         started_at=batch.started_at,
@@ -111,25 +216,167 @@ async def get_batch(
     )
 
 
-@router.delete("/{batch_id}")
-async def delete_batch(
+@router.get("/{batch_id}/stats", response_model=BatchStatsResponse)
+async def get_batch_stats(
     batch_id: UUID,
     db: AsyncSession = Depends(get_db)
 ):
-    """Delete a batch and all associated records."""
+    """Match type counts, confidence histogram and cascade stage timings for a batch.
+
+    Read from the counts kept up to date as the batch is matched and
+    reviewed, without scanning its results.
+    """
     batch = await db.get(ProcessingBatch, batch_id)
     if not batch:
         raise HTTPException(status_code=404, detail="Batch not found")
 
-    # Delete associated usage records (cascades to match results)
-    query = select(UsageRecord).where(UsageRecord.batch_id == batch_id)
-    result = await db.execute(query)
+    stats = await db.get(BatchStats, batch_id)
+    if stats is None:
+        return BatchStatsResponse(batch_id=str(batch_id))
+
+    decided_by = stats.decided_by or {}
+    return BatchStatsResponse(
+        batch_id=str(batch_id),
+        match_types={key: count for key, count in (stats.match_types or {}).items() if count},
+        confidence_histogram=dict(sorted(
+            (bucket, count) for bucket, count in (stats.confidence_histogram or {}).items() if count
+        )),
+        decided_by={key: count for key, count in decided_by.items() if count},
+        fast_path_hits=sum(decided_by.get(stage, 0) for stage in FAST_PATH_STAGES),
+        stage_runs=stats.stage_runs or {},
+        stage_seconds={stage: round(seconds, 3) for stage, seconds in (stats.stage_seconds or {}).items()},
+        updated_at=stats.updated_at
+    )
+
+
+@router.get("/{batch_id}/progress")
+async def stream_batch_progress(
+    batch_id: UUID,
+    db: AsyncSession = Depends(get_db)
+):
+    """Follow a batch's processing as server-sent events, alongside the uploading client.
+
+    Batches not being processed by this server get a single event with
+    their stored counters.
+    """
+    batch = await db.get(ProcessingBatch, batch_id)
+    if not batch:
+        raise HTTPException(status_code=404, detail="Batch not found")
+
+    if progress_bus.active(batch_id):
+        events = progress_bus.subscribe(batch_id)
+    else:
+        snapshot = {
+            "stage": batch.status,
+            "batch_id": str(batch.id),
+            "processed": batch.processed_records,
+            "total": batch.total_records,
+            "matched": batch.matched_records,
+            "unmatched": batch.unmatched_records,
+            "flagged": batch.flagged_records
+        }
+
+        async def single_event():
+            yield snapshot
+        events = single_event()
+
+    async def generate():
+        async for event in events:
+            yield f"data: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+
+@router.post("/{batch_id}/rematch-degraded")
+async def rematch_degraded(
+    batch_id: UUID,
+    limit: int = Query(500, ge=1, le=5000),
+    db: AsyncSession = Depends(get_db)
+):
+    """Re-run matching, without deadlines, for records that were matched degraded."""
+    batch = await db.get(ProcessingBatch, batch_id)
+    if not batch:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    if batch.status == "processing":
+        raise HTTPException(status_code=409, detail="Batch is still processing")
+
+    result = await db.execute(
+        select(UsageRecord)
+        .where(UsageRecord.batch_id == batch_id, UsageRecord.is_degraded.is_(True))
+        .order_by(UsageRecord.row_number)
+        .limit(limit)
+    )
     usage_records = result.scalars().all()
 
-    for record in usage_records:
-        await db.delete(record)
+    # Flushed every sub-batch, so the counter changes and statistics are
+    # committed with the matches they describe
+    matching_service = MatchingService(db, enforce_deadlines=False)
+    progress = BatchProgress(batch_id, batch.total_records, flush_seconds=0)
+    stats = BatchStatsCollector(batch_id, flush_seconds=0)
+    rematched = 0
+    for i in range(0, len(usage_records), 10):
+        sub_batch = usage_records[i:i + 10]
+        await matching_service.rematch_records(sub_batch, stats=stats, progress=progress)
+        rematched += len(sub_batch)
 
-    await db.delete(batch)
+    remaining_result = await db.execute(
+        select(func.count(UsageRecord.id))
+        .where(UsageRecord.batch_id == batch_id, UsageRecord.is_degraded.is_(True))
+    )
+
+    return {
+        "rematched": rematched,
+        "remaining": remaining_result.scalar() or 0
+    }
+
+
+@router.delete("/{batch_id}", response_model=BatchJobResponse, status_code=202)
+async def delete_batch(
+    batch_id: UUID,
+    archive: bool = False,
+    db: AsyncSession = Depends(get_db)
+):
+    """Delete a batch and all associated records in the background.
+
+    With ``archive`` the batch's usage records and matches are first written
+    to a gzipped NDJSON file on the server, once no AI reviews are pending
+    for it. Returns the job, whose progress is at ``/batches/jobs/{job_id}``.
+    """
+    batch = await db.get(ProcessingBatch, batch_id)
+    if not batch:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    if batch.status == "processing":
+        raise HTTPException(status_code=409, detail="Batch is still being processed")
+    if await active_job(db, batch_id):
+        raise HTTPException(status_code=409, detail="Batch is already being deleted")
+    # The archive is read a chunk at a time, so the batch must not be changing
+    if archive and (await count_pending_reviews(db, [batch_id])).get(batch_id):
+        raise HTTPException(status_code=409, detail="Batch has AI reviews pending")
+
+    job = BatchJob(batch_id=batch_id, archive=archive, status="pending")
+    db.add(job)
     await db.commit()
+    await db.refresh(job)
+    batch_job_runner.launch(job.id)
 
-    return {"message": "Batch deleted successfully"}
+    return job_response(job)
+
+
+@router.get("/jobs/{job_id}", response_model=BatchJobResponse)
+async def get_batch_job(
+    job_id: UUID,
+    db: AsyncSession = Depends(get_db)
+):
+    """Progress of a batch deletion or archival job."""
+    job = await db.get(BatchJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_response(job)
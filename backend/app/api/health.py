@@ -3,6 +3,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from app.core.database import get_db
 from app.services.ollama import OllamaService
+from app.services.circuit_breaker import llm_breaker, embedding_breaker
 
 router = APIRouter()
 
@@ -39,8 +40,15 @@ async def detailed_health_check(db: AsyncSession = Depends(get_db)):
     except Exception as e:
         status["ollama"] = f"unhealthy: {str(e)}"
 
+    breakers = {
+        breaker.name: breaker.snapshot()
+        for breaker in (llm_breaker, embedding_breaker)
+    }
+
     overall = "healthy" if all(
         v == "healthy" for v in status.values()
+    ) and all(
+        b["state"] == "closed" for b in breakers.values()
     ) else "degraded"
 
-    return {"status": overall, "services": status}
+    return {"status": overall, "services": status, "circuit_breakers": breakers}
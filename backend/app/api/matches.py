@@ -1,19 +1,109 @@
 from typing import List, Optional
 from uuid import UUID
+import pyarrow as pa
 from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import StreamingResponse
-from sqlalchemy import select, func, and_
+from sqlalchemy import select, update, and_
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
-from pydantic import BaseModel
+from sqlalchemy.orm import selectinload, load_only
+from pydantic import BaseModel, Field
 from datetime import datetime
-import csv
-import io
+from decimal import Decimal
 from app.core.database import get_db
+from app.api.pagination import COUNT_MODES, count_rows, keyset_page, page_results
 from app.models import MatchResult, UsageRecord, Work
+from app.services.decisions import record_decision, record_decisions, rebuild_decisions
+from app.services.reviews import refresh_match_status
+from app.services.exports import stream_csv, stream_ndjson, stream_parquet
 
 router = APIRouter()
 
+# Columns the match listings and exports read; embeddings are never loaded
+WORK_INFO_COLUMNS = (Work.id, Work.work_code, Work.title, Work.songwriters, Work.iswc)
+USAGE_INFO_COLUMNS = (
+    UsageRecord.id, UsageRecord.recording_title, UsageRecord.recording_artist,
+    UsageRecord.work_title, UsageRecord.songwriter, UsageRecord.row_number,
+    UsageRecord.match_stage, UsageRecord.is_degraded
+)
+MATCH_LOAD_OPTIONS = (
+    selectinload(MatchResult.usage_record).load_only(*USAGE_INFO_COLUMNS),
+    selectinload(MatchResult.work).load_only(*WORK_INFO_COLUMNS),
+)
+
+# The fields of MatchResponse, flattened into one row per match for exports
+EXPORT_MATCH_ID = MatchResult.id.label("match_id")
+MATCH_EXPORT_COLUMNS = (
+    EXPORT_MATCH_ID,
+    UsageRecord.id.label("usage_record_id"),
+    UsageRecord.row_number,
+    UsageRecord.recording_title,
+    UsageRecord.recording_artist,
+    UsageRecord.work_title.label("usage_work_title"),
+    UsageRecord.songwriter.label("usage_songwriter"),
+    UsageRecord.match_stage,
+    UsageRecord.is_degraded,
+    Work.id.label("work_id"),
+    Work.work_code,
+    Work.title.label("work_title"),
+    Work.songwriters,
+    Work.iswc,
+    MatchResult.confidence_score,
+    MatchResult.match_type,
+    MatchResult.title_similarity,
+    MatchResult.songwriter_similarity,
+    MatchResult.vector_similarity,
+    MatchResult.ai_reasoning,
+    MatchResult.is_confirmed,
+    MatchResult.is_rejected,
+    MatchResult.reviewed_at,
+    MatchResult.auto_confirm_rule,
+    MatchResult.created_at,
+)
+EXPORT_FORMATS = "^(parquet|ndjson)$"
+# Most IDs a bulk review may list; larger sets are selected by filter
+MAX_BULK_REVIEW_IDS = 10000
+
+
+def match_export_record(row) -> dict:
+    """One exported match, with numerics as floats as in MatchResponse."""
+    record = dict(row._mapping)
+    for key in ("confidence_score", "title_similarity", "songwriter_similarity", "vector_similarity"):
+        if record[key] is not None:
+            record[key] = float(record[key])
+    record["is_degraded"] = bool(record["is_degraded"])
+    return record
+
+
+def match_export_schema():
+    """Parquet schema of :data:`MATCH_EXPORT_COLUMNS`."""
+    return pa.schema([
+        ("match_id", pa.int64()),
+        ("usage_record_id", pa.int64()),
+        ("row_number", pa.int32()),
+        ("recording_title", pa.string()),
+        ("recording_artist", pa.string()),
+        ("usage_work_title", pa.string()),
+        ("usage_songwriter", pa.string()),
+        ("match_stage", pa.string()),
+        ("is_degraded", pa.bool_()),
+        ("work_id", pa.int64()),
+        ("work_code", pa.string()),
+        ("work_title", pa.string()),
+        ("songwriters", pa.list_(pa.string())),
+        ("iswc", pa.string()),
+        ("confidence_score", pa.float64()),
+        ("match_type", pa.string()),
+        ("title_similarity", pa.float64()),
+        ("songwriter_similarity", pa.float64()),
+        ("vector_similarity", pa.float64()),
+        ("ai_reasoning", pa.string()),
+        ("is_confirmed", pa.bool_()),
+        ("is_rejected", pa.bool_()),
+        ("reviewed_at", pa.timestamp("us")),
+        ("auto_confirm_rule", pa.string()),
+        ("created_at", pa.timestamp("us")),
+    ])
+
 
 class WorkInfo(BaseModel):
     id: int
@@ -33,6 +123,8 @@ class UsageInfo(BaseModel):
     work_title: Optional[str] = None
     songwriter: Optional[str] = None
     row_number: int
+    match_stage: Optional[str] = None
+    is_degraded: bool = False
 
     class Config:
         from_attributes = True
@@ -51,6 +143,7 @@ class MatchResponse(BaseModel):
     is_confirmed: bool
     is_rejected: bool
     reviewed_at: Optional[datetime] = None
+    auto_confirm_rule: Optional[str] = None
     created_at: datetime
 
     class Config:
@@ -59,34 +152,42 @@ class MatchResponse(BaseModel):
 
 class MatchListResponse(BaseModel):
     matches: List[MatchResponse]
-    total: int
+    total: Optional[int] = None
     page: int
     page_size: int
+    next_cursor: Optional[str] = None
 
 
 class ReviewRequest(BaseModel):
     action: str  # 'confirm' or 'reject'
 
 
-@router.get("/batch/{batch_id}", response_model=MatchListResponse)
-async def list_batch_matches(
+class BulkReviewRequest(BaseModel):
+    action: str  # 'confirm' or 'reject'
+    match_ids: Optional[List[int]] = Field(None, max_length=MAX_BULK_REVIEW_IDS)
+    batch_id: Optional[UUID] = None
+    match_type: Optional[str] = None
+    min_confidence: Optional[float] = None
+    max_confidence: Optional[float] = None
+
+
+def filter_batch_matches(
+    query,
     batch_id: UUID,
-    page: int = Query(1, ge=1),
-    page_size: int = Query(20, ge=1, le=100),
     match_type: Optional[str] = None,
     min_confidence: Optional[float] = None,
     reviewed: Optional[bool] = None,
-    db: AsyncSession = Depends(get_db)
+    best_only: bool = False
 ):
-    """List all matches for a batch."""
-    # Build query
-    query = (
-        select(MatchResult)
-        .join(UsageRecord)
-        .where(UsageRecord.batch_id == batch_id)
-        .options(selectinload(MatchResult.usage_record), selectinload(MatchResult.work))
-        .order_by(MatchResult.confidence_score.desc())
-    )
+    """Apply the batch match filters shared by the listing and the full export.
+
+    ``query`` must already join match_results to usage_records. Both
+    tables are restricted to the batch so each reads one partition.
+    """
+    query = query.where(MatchResult.batch_id == batch_id, UsageRecord.batch_id == batch_id)
+
+    if best_only:
+        query = query.where(MatchResult.id == UsageRecord.best_match_id)
 
     if match_type:
         query = query.where(MatchResult.match_type == match_type)
@@ -104,24 +205,46 @@ async def list_batch_matches(
                 and_(MatchResult.is_confirmed == False, MatchResult.is_rejected == False)
             )
 
-    # Count total
-    count_query = (
-        select(func.count(MatchResult.id))
-        .join(UsageRecord)
-        .where(UsageRecord.batch_id == batch_id)
+    return query
+
+
+@router.get("/batch/{batch_id}", response_model=MatchListResponse)
+async def list_batch_matches(
+    batch_id: UUID,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    match_type: Optional[str] = None,
+    min_confidence: Optional[float] = None,
+    reviewed: Optional[bool] = None,
+    best_only: bool = False,
+    cursor: Optional[str] = None,
+    count: str = Query("exact", pattern=COUNT_MODES),
+    db: AsyncSession = Depends(get_db)
+):
+    """List matches for a batch by descending confidence, or only each usage record's best match.
+
+    Pass ``next_cursor`` back as ``cursor`` to page by keyset instead of offset.
+    """
+    # Build query
+    query = filter_batch_matches(
+        select(MatchResult).join(UsageRecord).options(*MATCH_LOAD_OPTIONS),
+        batch_id, match_type, min_confidence, reviewed, best_only
     )
-    if match_type:
-        count_query = count_query.where(MatchResult.match_type == match_type)
-    if min_confidence is not None:
-        count_query = count_query.where(MatchResult.confidence_score >= min_confidence)
 
-    total_result = await db.execute(count_query)
-    total = total_result.scalar() or 0
+    total = await count_rows(db, query, count)
 
     # Paginate
-    query = query.offset((page - 1) * page_size).limit(page_size)
+    query = keyset_page(
+        query,
+        (MatchResult.confidence_score, MatchResult.id),
+        (Decimal, int),
+        page, page_size, cursor,
+        descending=True
+    )
     result = await db.execute(query)
-    matches = result.scalars().all()
+    matches, next_cursor = page_results(
+        result.scalars().all(), page_size, lambda match: (match.confidence_score, match.id)
+    )
 
     return MatchListResponse(
         matches=[
@@ -133,7 +256,9 @@ async def list_batch_matches(
                     recording_artist=m.usage_record.recording_artist,
                     work_title=m.usage_record.work_title,
                     songwriter=m.usage_record.songwriter,
-                    row_number=m.usage_record.row_number
+                    row_number=m.usage_record.row_number,
+                    match_stage=m.usage_record.match_stage,
+                    is_degraded=bool(m.usage_record.is_degraded)
                 ),
                 work=WorkInfo(
                     id=m.work.id,
@@ -151,13 +276,15 @@ async def list_batch_matches(
                 is_confirmed=m.is_confirmed,
                 is_rejected=m.is_rejected,
                 reviewed_at=m.reviewed_at,
+                auto_confirm_rule=m.auto_confirm_rule,
                 created_at=m.created_at
             )
             for m in matches
         ],
         total=total,
         page=page,
-        page_size=page_size
+        page_size=page_size,
+        next_cursor=next_cursor
     )
 
 
@@ -166,43 +293,30 @@ async def list_unmatched(
     batch_id: UUID,
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    count: str = Query("exact", pattern=COUNT_MODES),
     db: AsyncSession = Depends(get_db)
 ):
-    """List usage records with no matches."""
-    # Subquery to find records with matches
-    matched_ids = (
-        select(MatchResult.usage_record_id)
-        .distinct()
-    )
+    """List usage records with no matches, in file order.
 
+    Pass ``next_cursor`` back as ``cursor`` to page by keyset instead of offset.
+    """
     query = (
         select(UsageRecord)
-        .where(
-            and_(
-                UsageRecord.batch_id == batch_id,
-                ~UsageRecord.id.in_(matched_ids)
-            )
-        )
-        .order_by(UsageRecord.row_number)
+        .options(load_only(*USAGE_INFO_COLUMNS))
+        .where(UsageRecord.batch_id == batch_id, UsageRecord.match_status == "unmatched")
     )
 
-    # Count
-    count_query = (
-        select(func.count(UsageRecord.id))
-        .where(
-            and_(
-                UsageRecord.batch_id == batch_id,
-                ~UsageRecord.id.in_(matched_ids)
-            )
-        )
-    )
-    total_result = await db.execute(count_query)
-    total = total_result.scalar() or 0
+    total = await count_rows(db, query, count)
 
     # Paginate
-    query = query.offset((page - 1) * page_size).limit(page_size)
+    query = keyset_page(
+        query, (UsageRecord.row_number, UsageRecord.id), (int, int), page, page_size, cursor
+    )
     result = await db.execute(query)
-    records = result.scalars().all()
+    records, next_cursor = page_results(
+        result.scalars().all(), page_size, lambda record: (record.row_number, record.id)
+    )
 
     return {
         "records": [
@@ -218,7 +332,8 @@ async def list_unmatched(
         ],
         "total": total,
         "page": page,
-        "page_size": page_size
+        "page_size": page_size,
+        "next_cursor": next_cursor
     }
 
 
@@ -228,8 +343,15 @@ async def review_match(
     review: ReviewRequest,
     db: AsyncSession = Depends(get_db)
 ):
-    """Confirm or reject a match."""
-    match = await db.get(MatchResult, match_id)
+    """Confirm or reject a match.
+
+    The decision is remembered for the usage line, so the same line in a
+    later upload is matched to a confirmed work straight away and never
+    proposed a rejected one. The record's best match and status, and its
+    batch's counters, follow the review.
+    """
+    result = await db.execute(select(MatchResult).where(MatchResult.id == match_id))
+    match = result.scalar_one_or_none()
     if not match:
         raise HTTPException(status_code=404, detail="Match not found")
 
@@ -243,58 +365,124 @@ async def review_match(
         raise HTTPException(status_code=400, detail="Invalid action. Use 'confirm' or 'reject'")
 
     match.reviewed_at = datetime.utcnow()
+    match.auto_confirm_rule = None
+    usage_record = await db.get(UsageRecord, (match.usage_record_id, match.batch_id))
+    await record_decision(db, usage_record, match)
+    await db.flush()
+    await refresh_match_status(db, [(match.batch_id, match.usage_record_id)])
     await db.commit()
 
     return {"message": f"Match {review.action}ed successfully"}
 
 
-@router.get("/export/{batch_id}/unmatched")
-async def export_unmatched(
-    batch_id: UUID,
+@router.post("/bulk-review")
+async def bulk_review_matches(
+    review: BulkReviewRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """Confirm or reject many matches in one UPDATE.
+
+    Matches are selected by ``match_ids``, by ``batch_id`` with optional
+    ``match_type`` and confidence range, or by both. Selected by filter
+    alone, only matches nobody has reviewed yet are changed. Every
+    decision is remembered, and the usage records' status and batch
+    counters are updated, as a single review would do.
+    """
+    if review.action not in ("confirm", "reject"):
+        raise HTTPException(status_code=400, detail="Invalid action. Use 'confirm' or 'reject'")
+    if review.match_ids is None and review.batch_id is None:
+        raise HTTPException(status_code=400, detail="Give match_ids, batch_id or both")
+
+    confirm = review.action == "confirm"
+    statement = update(MatchResult).values(
+        is_confirmed=confirm,
+        is_rejected=not confirm,
+        reviewed_at=datetime.utcnow(),
+        auto_confirm_rule=None
+    )
+
+    if review.match_ids is not None:
+        statement = statement.where(MatchResult.id.in_(review.match_ids))
+    else:
+        statement = statement.where(
+            MatchResult.is_confirmed == False, MatchResult.is_rejected == False
+        )
+
+    if review.batch_id is not None:
+        statement = statement.where(MatchResult.batch_id == review.batch_id)
+
+    if review.match_type:
+        statement = statement.where(MatchResult.match_type == review.match_type)
+
+    if review.min_confidence is not None:
+        statement = statement.where(MatchResult.confidence_score >= review.min_confidence)
+
+    if review.max_confidence is not None:
+        statement = statement.where(MatchResult.confidence_score <= review.max_confidence)
+
+    result = await db.execute(
+        statement
+        .returning(
+            MatchResult.id,
+            MatchResult.batch_id,
+            MatchResult.usage_record_id,
+            MatchResult.work_id,
+            MatchResult.is_confirmed,
+            MatchResult.reviewed_at
+        )
+        .execution_options(synchronize_session=False)
+    )
+    reviews = result.all()
+    await record_decisions(db, reviews)
+    await refresh_match_status(db, [(row.batch_id, row.usage_record_id) for row in reviews])
+    await db.commit()
+
+    return {"message": f"{len(reviews)} matches {review.action}ed", "reviewed": len(reviews)}
+
+
+@router.post("/rebuild-decisions")
+async def rebuild_match_decisions(
     db: AsyncSession = Depends(get_db)
 ):
-    """Export unmatched records as CSV."""
-    # Get unmatched records
-    matched_ids = select(MatchResult.usage_record_id).distinct()
+    """Load all existing reviews into the decision table consulted before matching."""
+    reviews = await rebuild_decisions(db)
+    return {"message": f"Loaded {reviews} reviewed matches", "reviews": reviews}
 
+
+@router.get("/export/{batch_id}/unmatched")
+async def export_unmatched(batch_id: UUID):
+    """Export unmatched records as CSV, streamed as it is read."""
     query = (
-        select(UsageRecord)
-        .where(
-            and_(
-                UsageRecord.batch_id == batch_id,
-                ~UsageRecord.id.in_(matched_ids)
-            )
+        select(
+            UsageRecord.row_number,
+            UsageRecord.recording_title,
+            UsageRecord.recording_artist,
+            UsageRecord.work_title,
+            UsageRecord.songwriter,
+            UsageRecord.id
         )
-        .order_by(UsageRecord.row_number)
+        .where(UsageRecord.batch_id == batch_id, UsageRecord.match_status == "unmatched")
     )
 
-    result = await db.execute(query)
-    records = result.scalars().all()
-
-    # Generate CSV
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow([
+    header = [
         "Row Number",
         "Recording Title",
         "Recording Artist",
         "Work Title",
         "Songwriter"
-    ])
-
-    for record in records:
-        writer.writerow([
-            record.row_number,
-            record.recording_title or "",
-            record.recording_artist or "",
-            record.work_title or "",
-            record.songwriter or ""
-        ])
+    ]
 
-    output.seek(0)
+    def format_row(row):
+        return [
+            row.row_number,
+            row.recording_title or "",
+            row.recording_artist or "",
+            row.work_title or "",
+            row.songwriter or ""
+        ]
 
     return StreamingResponse(
-        iter([output.getvalue()]),
+        stream_csv(query, (UsageRecord.row_number, UsageRecord.id), header, format_row),
         media_type="text/csv",
         headers={
             "Content-Disposition": f"attachment; filename=unmatched_{batch_id}.csv"
@@ -303,33 +491,37 @@ async def export_unmatched(
 
 
 @router.get("/export/{batch_id}/flagged")
-async def export_flagged(
-    batch_id: UUID,
-    db: AsyncSession = Depends(get_db)
-):
-    """Export flagged (medium/low confidence) matches as CSV."""
+async def export_flagged(batch_id: UUID):
+    """Export flagged (medium/low confidence or awaiting AI review) matches as CSV, streamed as it is read."""
     query = (
-        select(MatchResult)
+        select(
+            UsageRecord.row_number,
+            UsageRecord.work_title,
+            UsageRecord.recording_title,
+            UsageRecord.songwriter,
+            Work.work_code,
+            Work.title,
+            Work.songwriters,
+            MatchResult.confidence_score,
+            MatchResult.match_type,
+            MatchResult.ai_reasoning,
+            MatchResult.id
+        )
+        .select_from(MatchResult)
         .join(UsageRecord)
+        .join(Work, MatchResult.work_id == Work.id)
         .where(
             and_(
+                MatchResult.batch_id == batch_id,
                 UsageRecord.batch_id == batch_id,
-                MatchResult.match_type.in_(["medium_confidence", "low_confidence"]),
+                MatchResult.match_type.in_(["medium_confidence", "low_confidence", "pending_ai"]),
                 MatchResult.is_confirmed == False,
                 MatchResult.is_rejected == False
             )
         )
-        .options(selectinload(MatchResult.usage_record), selectinload(MatchResult.work))
-        .order_by(MatchResult.confidence_score.desc())
     )
 
-    result = await db.execute(query)
-    matches = result.scalars().all()
-
-    # Generate CSV
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow([
+    header = [
         "Row Number",
         "Usage Title",
         "Usage Songwriter",
@@ -339,27 +531,67 @@ async def export_flagged(
         "Confidence Score",
         "Match Type",
         "AI Reasoning"
-    ])
-
-    for match in matches:
-        writer.writerow([
-            match.usage_record.row_number,
-            match.usage_record.work_title or match.usage_record.recording_title,
-            match.usage_record.songwriter or "",
-            match.work.work_code,
-            match.work.title,
-            "; ".join(match.work.songwriters),
-            f"{float(match.confidence_score):.2%}",
-            match.match_type,
-            match.ai_reasoning or ""
-        ])
-
-    output.seek(0)
+    ]
+
+    def format_row(row):
+        return [
+            row.row_number,
+            row.work_title or row.recording_title,
+            row.songwriter or "",
+            row.work_code,
+            row.title,
+            "; ".join(row.songwriters),
+            f"{float(row.confidence_score):.2%}",
+            row.match_type,
+            row.ai_reasoning or ""
+        ]
 
     return StreamingResponse(
-        iter([output.getvalue()]),
+        stream_csv(
+            query, (MatchResult.confidence_score, MatchResult.id), header, format_row, descending=True
+        ),
         media_type="text/csv",
         headers={
             "Content-Disposition": f"attachment; filename=flagged_{batch_id}.csv"
         }
     )
+
+
+@router.get("/export/{batch_id}")
+async def export_matches(
+    batch_id: UUID,
+    format: str = Query("parquet", pattern=EXPORT_FORMATS),
+    match_type: Optional[str] = None,
+    min_confidence: Optional[float] = None,
+    reviewed: Optional[bool] = None,
+    best_only: bool = False
+):
+    """Export every match of a batch, joined with its usage line and work, as Parquet or NDJSON.
+
+    Takes the filters of the batch match listing and streams the whole
+    result in the listing's order: Parquet one row group per chunk read,
+    NDJSON one object per line.
+    """
+    query = filter_batch_matches(
+        select(*MATCH_EXPORT_COLUMNS)
+        .select_from(MatchResult)
+        .join(UsageRecord)
+        .join(Work, MatchResult.work_id == Work.id),
+        batch_id, match_type, min_confidence, reviewed, best_only
+    )
+    sort_columns = (MatchResult.confidence_score, EXPORT_MATCH_ID)
+
+    if format == "parquet":
+        body = stream_parquet(query, sort_columns, match_export_schema(), match_export_record, descending=True)
+        media_type = "application/vnd.apache.parquet"
+    else:
+        body = stream_ndjson(query, sort_columns, match_export_record, descending=True)
+        media_type = "application/x-ndjson"
+
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f"attachment; filename=matches_{batch_id}.{format}"
+        }
+    )
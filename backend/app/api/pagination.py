@@ -0,0 +1,120 @@
+"""
+Shared pagination helpers for list endpoints.
+
+Lists can be paged two ways. With ``page`` they use OFFSET, which gets
+slower the deeper the page. With ``cursor`` (the ``next_cursor`` of the
+previous response) they seek straight past the last row seen on an index,
+so every page costs the same however deep it is.
+
+Counting every matching row can cost more than the page itself, so the
+total is exact, estimated from the planner or skipped, as selected by
+``count``.
+"""
+
+import base64
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+from uuid import UUID
+from fastapi import HTTPException
+from sqlalchemy import Select, tuple_, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Accepted values of the ``count`` query parameter
+COUNT_MODES = "^(exact|estimate|none)$"
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Opaque cursor holding the sort key of the last row of a page."""
+    raw = json.dumps([_encode_value(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, types: Sequence[Callable[[Any], Any]]) -> List[Any]:
+    """Read a cursor back into sort key values, converting each with ``types``."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError("wrong number of values")
+        return [convert(value) for convert, value in zip(types, values)]
+    except (ValueError, TypeError, UnicodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def parse_datetime(value: str) -> datetime:
+    return datetime.fromisoformat(value)
+
+
+def keyset_page(
+    query: Select,
+    sort_columns: Sequence[Any],
+    cursor_types: Sequence[Callable[[Any], Any]],
+    page: int,
+    page_size: int,
+    cursor: Optional[str],
+    descending: bool = False
+) -> Select:
+    """Order ``query`` by ``sort_columns`` and restrict it to one page plus one row.
+
+    The sort columns must end in a unique column so the order is total.
+    The extra row tells :func:`page_results` whether another page follows.
+    """
+    if descending:
+        query = query.order_by(*(column.desc() for column in sort_columns))
+    else:
+        query = query.order_by(*sort_columns)
+
+    if cursor:
+        values = decode_cursor(cursor, cursor_types)
+        key = tuple_(*sort_columns)
+        query = query.where(key < tuple_(*values) if descending else key > tuple_(*values))
+    else:
+        query = query.offset((page - 1) * page_size)
+
+    return query.limit(page_size + 1)
+
+
+def page_results(
+    rows: Sequence[Any],
+    page_size: int,
+    sort_key: Callable[[Any], Sequence[Any]]
+) -> Tuple[Sequence[Any], Optional[str]]:
+    """Trim the look-ahead row and build the cursor for the next page, if there is one."""
+    if len(rows) <= page_size:
+        return rows, None
+    rows = rows[:page_size]
+    return rows, encode_cursor(sort_key(rows[-1]))
+
+
+async def estimate_count(db: AsyncSession, query: Select) -> int:
+    """Planner row estimate for ``query``: instant at any size, but only as good as table statistics."""
+    connection = await db.connection()
+    # Rendered by the driver's own dialect and sent as is, as text() would
+    # take colons in the rendered literals for bind parameters
+    compiled = query.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True})
+    result = await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}")
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def count_rows(db: AsyncSession, query: Select, mode: str) -> Optional[int]:
+    """Total for a list endpoint. ``query`` is the filtered, unpaginated selection."""
+    if mode == "none":
+        return None
+    if mode == "estimate":
+        return await estimate_count(db, query)
+    count_query = query.with_only_columns(func.count(), maintain_column_froms=True).order_by(None)
+    result = await db.execute(count_query)
+    return result.scalar() or 0
@@ -2,13 +2,25 @@ from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
 from pydantic import BaseModel
 from app.core.database import get_db
+from app.api.pagination import COUNT_MODES, count_rows, keyset_page, page_results
 from app.models import Work
 from app.services.embedding import EmbeddingService
+from app.services.minhash import title_index
+from app.services.songwriter_index import rebuild_songwriter_index, count_indexed_works
 
 router = APIRouter()
 
+# Columns WorkResponse is built from; embeddings stay in the database and
+# only their presence is selected
+WORK_RESPONSE_COLUMNS = (
+    Work.id, Work.work_code, Work.title, Work.alternative_titles, Work.iswc,
+    Work.songwriters, Work.publishers, Work.release_year, Work.genre
+)
+HAS_EMBEDDING = Work.combined_embedding.isnot(None).label("has_embedding")
+
 
 class WorkCreate(BaseModel):
     work_code: str
@@ -39,9 +51,25 @@ class WorkResponse(BaseModel):
 
 class WorkListResponse(BaseModel):
     works: List[WorkResponse]
-    total: int
+    total: Optional[int] = None
     page: int
     page_size: int
+    next_cursor: Optional[str] = None
+
+
+def work_response(work: Work, has_embedding: bool) -> WorkResponse:
+    return WorkResponse(
+        id=work.id,
+        work_code=work.work_code,
+        title=work.title,
+        alternative_titles=work.alternative_titles,
+        iswc=work.iswc,
+        songwriters=work.songwriters,
+        publishers=work.publishers,
+        release_year=work.release_year,
+        genre=work.genre,
+        has_embedding=bool(has_embedding)
+    )
 
 
 @router.get("", response_model=WorkListResponse)
@@ -49,10 +77,15 @@ async def list_works(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
     search: Optional[str] = None,
+    cursor: Optional[str] = None,
+    count: str = Query("exact", pattern=COUNT_MODES),
     db: AsyncSession = Depends(get_db)
 ):
-    """List works with optional search."""
-    query = select(Work).order_by(Work.title)
+    """List works by title with optional search.
+
+    Pass ``next_cursor`` back as ``cursor`` to page by keyset instead of offset.
+    """
+    query = select(Work, HAS_EMBEDDING).options(load_only(*WORK_RESPONSE_COLUMNS))
 
     if search:
         search_lower = f"%{search.lower()}%"
@@ -61,41 +94,19 @@ async def list_works(
             func.array_to_string(Work.songwriters_normalized, ' ').ilike(search_lower)
         )
 
-    # Count
-    count_query = select(func.count(Work.id))
-    if search:
-        search_lower = f"%{search.lower()}%"
-        count_query = count_query.where(
-            Work.title_normalized.ilike(search_lower) |
-            func.array_to_string(Work.songwriters_normalized, ' ').ilike(search_lower)
-        )
-    total_result = await db.execute(count_query)
-    total = total_result.scalar() or 0
+    total = await count_rows(db, query, count)
 
     # Paginate
-    query = query.offset((page - 1) * page_size).limit(page_size)
+    query = keyset_page(query, (Work.title, Work.id), (str, int), page, page_size, cursor)
     result = await db.execute(query)
-    works = result.scalars().all()
+    rows, next_cursor = page_results(result.all(), page_size, lambda row: (row[0].title, row[0].id))
 
     return WorkListResponse(
-        works=[
-            WorkResponse(
-                id=w.id,
-                work_code=w.work_code,
-                title=w.title,
-                alternative_titles=w.alternative_titles,
-                iswc=w.iswc,
-                songwriters=w.songwriters,
-                publishers=w.publishers,
-                release_year=w.release_year,
-                genre=w.genre,
-                has_embedding=w.combined_embedding is not None
-            )
-            for w in works
-        ],
+        works=[work_response(work, has_embedding) for work, has_embedding in rows],
         total=total,
         page=page,
-        page_size=page_size
+        page_size=page_size,
+        next_cursor=next_cursor
     )
 
 
@@ -105,22 +116,16 @@ async def get_work(
     db: AsyncSession = Depends(get_db)
 ):
     """Get a specific work."""
-    work = await db.get(Work, work_id)
-    if not work:
+    result = await db.execute(
+        select(Work, HAS_EMBEDDING)
+        .options(load_only(*WORK_RESPONSE_COLUMNS))
+        .where(Work.id == work_id)
+    )
+    row = result.first()
+    if not row:
         raise HTTPException(status_code=404, detail="Work not found")
 
-    return WorkResponse(
-        id=work.id,
-        work_code=work.work_code,
-        title=work.title,
-        alternative_titles=work.alternative_titles,
-        iswc=work.iswc,
-        songwriters=work.songwriters,
-        publishers=work.publishers,
-        release_year=work.release_year,
-        genre=work.genre,
-        has_embedding=work.combined_embedding is not None
-    )
+    return work_response(*row)
 
 
 @router.post("", response_model=WorkResponse)
@@ -131,7 +136,7 @@ async def create_work(
     """Create a new work."""
     # Check for duplicate work_code
     existing = await db.execute(
-        select(Work).where(Work.work_code == work_data.work_code)
+        select(Work.id).where(Work.work_code == work_data.work_code)
     )
     if existing.scalar_one_or_none():
         raise HTTPException(status_code=400, detail="Work code already exists")
@@ -150,19 +155,10 @@ async def create_work(
     db.add(work)
     await db.commit()
     await db.refresh(work)
+    title_index.add_work(work)
 
-    return WorkResponse(
-        id=work.id,
-        work_code=work.work_code,
-        title=work.title,
-        alternative_titles=work.alternative_titles,
-        iswc=work.iswc,
-        songwriters=work.songwriters,
-        publishers=work.publishers,
-        release_year=work.release_year,
-        genre=work.genre,
-        has_embedding=work.combined_embedding is not None
-    )
+    # Embeddings are generated separately, so a new work has none yet
+    return work_response(work, has_embedding=False)
 
 
 @router.post("/generate-embeddings")
@@ -172,7 +168,11 @@ async def generate_embeddings(
     """Generate embeddings for all works that don't have them."""
     embedding_service = EmbeddingService()
 
-    query = select(Work).where(Work.combined_embedding.is_(None))
+    query = (
+        select(Work)
+        .options(load_only(Work.id, Work.title, Work.songwriters))
+        .where(Work.combined_embedding.is_(None))
+    )
     result = await db.execute(query)
     works = result.scalars().all()
 
@@ -200,6 +200,19 @@ async def generate_embeddings(
     return {"message": f"Generated embeddings for {processed} works", "processed": processed}
 
 
+@router.post("/rebuild-songwriter-index")
+async def rebuild_songwriter_keys(
+    db: AsyncSession = Depends(get_db)
+):
+    """Rebuild the surname -> work index used for songwriter candidate generation."""
+    works_indexed, keys_written = await rebuild_songwriter_index(db)
+    return {
+        "message": f"Indexed {keys_written} surname keys for {works_indexed} works",
+        "works": works_indexed,
+        "keys": keys_written
+    }
+
+
 @router.get("/stats/summary")
 async def get_works_stats(
     db: AsyncSession = Depends(get_db)
@@ -216,5 +229,6 @@ async def get_works_stats(
     return {
         "total_works": total,
         "with_embeddings": with_embedding,
-        "without_embeddings": total - with_embedding
+        "without_embeddings": total - with_embedding,
+        "songwriter_indexed": await count_indexed_works(db)
     }
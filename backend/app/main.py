@@ -2,6 +2,8 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api import api_router
 from app.core.config import get_settings
+from app.services.ai_review import ai_review_worker
+from app.services.batch_jobs import batch_job_runner
 
 settings = get_settings()
 
@@ -26,6 +28,19 @@ app.add_middleware(
 app.include_router(api_router, prefix="/api")
 
 
+@app.on_event("startup")
+async def start_background_workers():
+    if settings.use_ai_for_ambiguous and settings.ai_review_async:
+        await ai_review_worker.start()
+    await batch_job_runner.start()
+
+
+@app.on_event("shutdown")
+async def stop_background_workers():
+    await ai_review_worker.stop()
+    await batch_job_runner.stop()
+
+
 @app.get("/")
 async def root():
     return {
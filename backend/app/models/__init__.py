@@ -2,5 +2,12 @@ from app.models.works import Work
 from app.models.usage import UsageRecord
 from app.models.match import MatchResult
 from app.models.batch import ProcessingBatch
+from app.models.ai_verdict import AIVerdict
+from app.models.ai_review import AIReviewTask
+from app.models.songwriter_key import WorkSongwriterKey
+from app.models.work_title import WorkTitle
+from app.models.match_decision import MatchDecision
+from app.models.batch_job import BatchJob
+from app.models.batch_stats import BatchStats
 
-__all__ = ["Work", "UsageRecord", "MatchResult", "ProcessingBatch"]
+__all__ = ["Work", "UsageRecord", "MatchResult", "ProcessingBatch", "AIVerdict", "AIReviewTask", "WorkSongwriterKey", "WorkTitle", "MatchDecision", "BatchJob", "BatchStats"]
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, String, Text, TIMESTAMP, ForeignKeyConstraint, func
+from sqlalchemy.dialects.postgresql import UUID
+from app.core.database import Base
+
+
+class AIReviewTask(Base):
+    __tablename__ = "ai_review_queue"
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["match_result_id", "batch_id"],
+            ["match_results.id", "match_results.batch_id"],
+            ondelete="CASCADE"
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    match_result_id = Column(Integer, nullable=False)
+    usage_record_id = Column(Integer, nullable=False)
+    batch_id = Column(UUID(as_uuid=True), nullable=False)
+    status = Column(String(20), default="pending")  # 'pending', 'processing', 'done', 'failed', 'skipped'
+    attempts = Column(Integer, default=0)
+    last_error = Column(Text)
+    created_at = Column(TIMESTAMP, server_default=func.now())
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
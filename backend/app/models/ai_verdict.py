@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, Text, TIMESTAMP, Boolean, Numeric, ForeignKey, UniqueConstraint, func
+from app.core.database import Base
+
+
+class AIVerdict(Base):
+    __tablename__ = "ai_verdict_cache"
+    __table_args__ = (
+        UniqueConstraint("usage_key", "work_id", "model", "prompt_version", name="uq_ai_verdict_key"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    usage_key = Column(String(64), nullable=False)  # sha256 of normalized usage title + songwriter
+    work_id = Column(Integer, ForeignKey("works.id", ondelete="CASCADE"), nullable=False)
+    model = Column(String(100), nullable=False)
+    prompt_version = Column(String(32), nullable=False)
+    is_match = Column(Boolean, nullable=False)
+    confidence = Column(Numeric(5, 4), nullable=False)
+    reasoning = Column(Text)
+    work_fingerprint = Column(String(64))  # sha256 of the work title + songwriters the verdict was made on
+    created_at = Column(TIMESTAMP, server_default=func.now())
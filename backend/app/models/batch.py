@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, TIMESTAMP, func
+from sqlalchemy import Column, Integer, Float, String, Text, TIMESTAMP, func
 from sqlalchemy.dialects.postgresql import UUID
 from app.core.database import Base
 import uuid
@@ -14,6 +14,15 @@ class ProcessingBatch(Base):
     matched_records = Column(Integer, default=0)
     unmatched_records = Column(Integer, default=0)
     flagged_records = Column(Integer, default=0)
+    embeddings_skipped = Column(Integer, default=0)
+    ai_cache_hits = Column(Integer, default=0)
+    ai_cache_misses = Column(Integer, default=0)
+    ai_reviews_queued = Column(Integer, default=0)
+    ai_skipped = Column(Integer, default=0)  # Ambiguous candidates left to deterministic scoring
+    ai_calls = Column(Integer, default=0)
+    ai_seconds = Column(Float, default=0)
+    degraded_records = Column(Integer, default=0)  # Matched without optional stages to meet a deadline
+    auto_confirmed_records = Column(Integer, default=0)  # Best matches confirmed by auto-confirmation rules
     status = Column(String(50), default="pending")  # 'pending', 'processing', 'completed', 'failed'
     error_message = Column(Text)
     started_at = Column(TIMESTAMP)
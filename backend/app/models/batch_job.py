@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, Boolean, Text, TIMESTAMP, func
+from sqlalchemy.dialects.postgresql import UUID
+from app.core.database import Base
+import uuid
+
+
+class BatchJob(Base):
+    """Background deletion of a batch, optionally archiving it to disk first."""
+    __tablename__ = "batch_jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    batch_id = Column(UUID(as_uuid=True), nullable=False, index=True)  # No foreign key: the batch is what gets deleted
+    archive = Column(Boolean, nullable=False, default=False)
+    status = Column(String(20), nullable=False, default="pending")  # 'pending', 'running', 'completed', 'failed'
+    phase = Column(String(30))  # 'archiving', 'dropping_partitions', 'deleting_batch'; the step reached
+    rows_total = Column(Integer, default=0)  # Rows to archive
+    rows_done = Column(Integer, default=0)
+    archive_path = Column(Text)  # Compressed NDJSON file, once written
+    error_message = Column(Text)
+    started_at = Column(TIMESTAMP)
+    completed_at = Column(TIMESTAMP)
+    created_at = Column(TIMESTAMP, server_default=func.now())
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, TIMESTAMP, ForeignKey, func
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from app.core.database import Base
+
+
+class BatchStats(Base):
+    """Running statistics of a batch, added to as it is matched and reviewed."""
+    __tablename__ = "batch_stats"
+
+    batch_id = Column(UUID(as_uuid=True), ForeignKey("processing_batches.id", ondelete="CASCADE"), primary_key=True)
+    match_types = Column(JSONB, nullable=False, default=dict)  # match_type -> match results
+    confidence_histogram = Column(JSONB, nullable=False, default=dict)  # Bucket lower bound ("0.85") -> match results
+    decided_by = Column(JSONB, nullable=False, default=dict)  # Cascade stage -> usage records it decided
+    stage_runs = Column(JSONB, nullable=False, default=dict)  # Cascade stage -> records it ran for
+    stage_seconds = Column(JSONB, nullable=False, default=dict)  # Cascade stage -> total seconds
+    updated_at = Column(TIMESTAMP, server_default=func.now())
@@ -1,16 +1,28 @@
-from sqlalchemy import Column, Integer, String, Text, TIMESTAMP, Boolean, Numeric, ForeignKey, func
+from sqlalchemy import (
+    Column, Integer, String, Text, TIMESTAMP, Boolean, Numeric, ForeignKey, ForeignKeyConstraint, func
+)
+from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
 
 class MatchResult(Base):
     __tablename__ = "match_results"
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["usage_record_id", "batch_id"],
+            ["usage_records.id", "usage_records.batch_id"],
+            ondelete="CASCADE"
+        ),
+    )
 
-    id = Column(Integer, primary_key=True, index=True)
-    usage_record_id = Column(Integer, ForeignKey("usage_records.id", ondelete="CASCADE"), nullable=False)
+    # Partitioned by batch like usage_records, so the key includes batch_id
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
+    batch_id = Column(UUID(as_uuid=True), primary_key=True, nullable=False)
+    usage_record_id = Column(Integer, nullable=False)
     work_id = Column(Integer, ForeignKey("works.id", ondelete="CASCADE"), nullable=False)
     confidence_score = Column(Numeric(5, 4), nullable=False)
-    match_type = Column(String(50), nullable=False)  # 'exact', 'high_confidence', 'medium_confidence', 'low_confidence', 'ai_matched'
+    match_type = Column(String(50), nullable=False)  # 'exact', 'high_confidence', 'medium_confidence', 'low_confidence', 'ai_matched', 'pending_ai'
     title_similarity = Column(Numeric(5, 4))
     songwriter_similarity = Column(Numeric(5, 4))
     vector_similarity = Column(Numeric(5, 4))
@@ -18,6 +30,7 @@ class MatchResult(Base):
     is_confirmed = Column(Boolean, default=False)
     is_rejected = Column(Boolean, default=False)
     reviewed_at = Column(TIMESTAMP)
+    auto_confirm_rule = Column(String(50))  # Rule that confirmed the match, if no reviewer did
     created_at = Column(TIMESTAMP, server_default=func.now())
 
     usage_record = relationship("UsageRecord", back_populates="matches")
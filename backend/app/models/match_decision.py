@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, Boolean, TIMESTAMP, ForeignKey, UniqueConstraint, func
+from app.core.database import Base
+
+
+class MatchDecision(Base):
+    """Reviewer verdict on a usage line / work pair, reused when the line comes back."""
+    __tablename__ = "match_decisions"
+    __table_args__ = (
+        UniqueConstraint("fingerprint", "work_id", name="uq_match_decision_key"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    fingerprint = Column(String(64), nullable=False)  # sha256 of the normalized usage line
+    work_id = Column(Integer, ForeignKey("works.id", ondelete="CASCADE"), nullable=False)
+    is_confirmed = Column(Boolean, nullable=False)  # False: rejected
+    match_result_id = Column(Integer)  # Review the decision came from; no foreign key so batches can be deleted
+    decided_at = Column(TIMESTAMP, server_default=func.now())
@@ -0,0 +1,10 @@
+from sqlalchemy import Column, Integer, String, ForeignKey
+from app.core.database import Base
+
+
+class WorkSongwriterKey(Base):
+    """Surname -> work inverted index, maintained by the application."""
+    __tablename__ = "work_songwriter_keys"
+
+    surname_key = Column(String(200), primary_key=True)
+    work_id = Column(Integer, ForeignKey("works.id", ondelete="CASCADE"), primary_key=True, index=True)
@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Integer, String, TIMESTAMP, func, JSON
+from sqlalchemy import Column, Integer, String, Boolean, Numeric, TIMESTAMP, func, JSON
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from pgvector.sqlalchemy import Vector
 from app.core.database import Base
 
@@ -8,18 +8,32 @@ from app.core.database import Base
 class UsageRecord(Base):
     __tablename__ = "usage_records"
 
-    id = Column(Integer, primary_key=True, index=True)
-    batch_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    # Partitioned by batch, so the key includes batch_id and writes touch
+    # only the batch's partition
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
+    batch_id = Column(UUID(as_uuid=True), primary_key=True, nullable=False, index=True)
     recording_title = Column(String(500))
     recording_artist = Column(String(500))
     work_title = Column(String(500))
     work_title_normalized = Column(String(500))
     songwriter = Column(String(500))
     songwriter_normalized = Column(String(500))
+    iswc = Column(String(20))  # Normalized; the identifiers as given are in original_row_data
+    work_code = Column(String(50))
     original_row_data = Column(JSON)
     row_number = Column(Integer)
+    # Loaded with the row as matching checks it in Python; list endpoints
+    # leave it out with load_only
     title_embedding = Column(Vector(768))
-    songwriter_embedding = Column(Vector(768))
+    songwriter_embedding = deferred(Column(Vector(768)), raiseload=True)  # Not used by matching
+    # Batch counter the record falls under: 'matched', 'flagged' or 'unmatched'
+    match_status = Column(String(20), nullable=False, default="unmatched", server_default="unmatched")
+    match_stage = Column(String(50))  # Cascade stage that decided the record, e.g. 'exact_key', 'trigram', 'llm'; NULL if none was decisive
+    # Highest confidence match, kept in step by matching and AI review. No
+    # foreign key so match_results can be rewritten independently.
+    best_match_id = Column(Integer)
+    best_confidence = Column(Numeric(5, 4))
+    is_degraded = Column(Boolean, default=False)  # Optional stages skipped to meet a deadline
     created_at = Column(TIMESTAMP, server_default=func.now())
 
     matches = relationship("MatchResult", back_populates="usage_record", cascade="all, delete-orphan")
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, UniqueConstraint
+from app.core.database import Base
+
+
+class WorkTitle(Base):
+    """Primary and alternative titles of works, kept in step by a database trigger."""
+    __tablename__ = "work_titles"
+    __table_args__ = (
+        UniqueConstraint("work_id", "title_normalized", name="uq_work_titles_work_title"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    work_id = Column(Integer, ForeignKey("works.id", ondelete="CASCADE"), nullable=False)
+    title = Column(String(500), nullable=False)
+    title_normalized = Column(String(500), nullable=False, index=True)
+    is_primary = Column(Boolean, nullable=False, default=False)
@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, Text, ARRAY, TIMESTAMP, func
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Computed, Integer, String, Text, ARRAY, TIMESTAMP, func
+from sqlalchemy.orm import relationship, deferred
 from pgvector.sqlalchemy import Vector
 from app.core.database import Base
 
@@ -13,14 +13,25 @@ class Work(Base):
     title_normalized = Column(String(500), nullable=False)
     alternative_titles = Column(ARRAY(Text))
     iswc = Column(String(20))
+    # "T" + ten digits, or NULL when iswc isn't shaped like an ISWC
+    iswc_normalized = Column(String(11), Computed(
+        r"CASE WHEN upper(regexp_replace(iswc, '[\s.\-]', '', 'g')) ~ '^T[0-9]{10}$' "
+        r"THEN upper(regexp_replace(iswc, '[\s.\-]', '', 'g')) END"
+    ))
     songwriters = Column(ARRAY(Text), nullable=False)
     songwriters_normalized = Column(ARRAY(Text), nullable=False)
     publishers = Column(ARRAY(Text))
     release_year = Column(Integer)
     genre = Column(String(100))
-    title_embedding = Column(Vector(768))
-    songwriter_embedding = Column(Vector(768))
-    combined_embedding = Column(Vector(768))
+    # Double Metaphone codes of title words and songwriter surnames, set by trigger
+    title_phonetic = Column(ARRAY(Text))
+    songwriter_phonetic = Column(ARRAY(Text))
+    # Embeddings are only read inside SQL (vector search, IS NOT NULL), so
+    # they are not loaded with the row. Reading one off an instance raises
+    # rather than lazy loading, which an async session can't do.
+    title_embedding = deferred(Column(Vector(768)), raiseload=True)
+    songwriter_embedding = deferred(Column(Vector(768)), raiseload=True)
+    combined_embedding = deferred(Column(Vector(768)), raiseload=True)
     created_at = Column(TIMESTAMP, server_default=func.now())
     updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
 
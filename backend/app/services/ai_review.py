@@ -0,0 +1,427 @@
+import asyncio
+from typing import Dict, List, Optional, Set
+from uuid import UUID
+from sqlalchemy import select, text, update, func, and_, case
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import AsyncSessionLocal
+from app.models import AIReviewTask, MatchResult, UsageRecord, Work, ProcessingBatch
+from app.services.matching import MatchingService
+from app.services.ollama import OllamaService
+from app.services.verdict_cache import VerdictCache
+from app.services.batch_stats import BatchStatsCollector
+from app.services.circuit_breaker import llm_breaker
+from app.core.config import get_settings
+
+settings = get_settings()
+
+
+async def count_pending_reviews(db: AsyncSession, batch_ids: List[UUID]) -> Dict[UUID, int]:
+    """Number of queued or in-flight AI reviews per batch."""
+    if not batch_ids:
+        return {}
+    result = await db.execute(
+        select(AIReviewTask.batch_id, func.count(AIReviewTask.id))
+        .where(
+            AIReviewTask.batch_id.in_(batch_ids),
+            AIReviewTask.status.in_(["pending", "processing"])
+        )
+        .group_by(AIReviewTask.batch_id)
+    )
+    return {batch_id: count for batch_id, count in result.all()}
+
+
+class AIReviewWorker:
+    """Pool of background tasks that drain the AI review queue.
+
+    Matching marks ambiguous candidates ``pending_ai`` and queues them; the
+    workers claim tasks with ``FOR UPDATE SKIP LOCKED``, ask the LLM and
+    update the match as verdicts arrive, so batches complete without
+    waiting on Ollama. A match a person confirms or rejects first keeps
+    their decision, and a claim that fails is handed back to the queue.
+    """
+
+    def __init__(
+        self,
+        concurrency: Optional[int] = None,
+        claim_size: Optional[int] = None,
+        poll_interval: Optional[float] = None
+    ):
+        self.concurrency = concurrency or settings.ai_review_concurrency
+        self.claim_size = claim_size or settings.ai_review_claim_size
+        self.poll_interval = poll_interval or settings.ai_review_poll_interval
+        self._tasks: List[asyncio.Task] = []
+        self._running = False
+
+    async def start(self) -> None:
+        """Requeue tasks left in flight by a previous run and start the workers."""
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(AIReviewTask)
+                .where(AIReviewTask.status == "processing")
+                .values(status="pending")
+            )
+            await db.commit()
+
+        self._running = True
+        self._tasks = [
+            asyncio.create_task(self._worker_loop()) for _ in range(self.concurrency)
+        ]
+
+    async def stop(self) -> None:
+        self._running = False
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _worker_loop(self) -> None:
+        # Each worker counts its own LLM usage, so what it charges to a batch
+        # never includes calls other workers made in the meantime
+        ollama_service = OllamaService()
+        while self._running:
+            # Leave the queue alone while the LLM circuit is open
+            if not llm_breaker.available:
+                await asyncio.sleep(self.poll_interval)
+                continue
+            try:
+                processed = await self.process_next(ollama_service)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"AI review worker error: {e}")
+                processed = 0
+            if not processed:
+                await asyncio.sleep(self.poll_interval)
+
+    async def _claim(self, db: AsyncSession) -> List[int]:
+        result = await db.execute(
+            text("""
+                UPDATE ai_review_queue
+                SET status = 'processing', attempts = attempts + 1, updated_at = now()
+                WHERE id IN (
+                    SELECT id FROM ai_review_queue
+                    WHERE status = 'pending'
+                    ORDER BY id
+                    LIMIT :limit
+                    FOR UPDATE SKIP LOCKED
+                )
+                RETURNING id
+            """),
+            {"limit": self.claim_size}
+        )
+        task_ids = [row.id for row in result.fetchall()]
+        await db.commit()
+        return task_ids
+
+    async def process_next(self, ollama_service: Optional[OllamaService] = None) -> int:
+        """Claim and adjudicate up to ``claim_size`` queued reviews. Returns how many."""
+        ollama_service = ollama_service or OllamaService()
+        async with AsyncSessionLocal() as db:
+            task_ids = await self._claim(db)
+            if not task_ids:
+                return 0
+
+            try:
+                processed = await self._process_claimed(db, task_ids, ollama_service)
+            except Exception as e:
+                # Hand the claim back rather than leave it 'processing' until a restart
+                await db.rollback()
+                await self._release(db, task_ids, str(e))
+                await db.commit()
+                raise
+            await db.commit()
+            return processed
+
+    async def _process_claimed(
+        self,
+        db: AsyncSession,
+        task_ids: List[int],
+        ollama_service: OllamaService
+    ) -> int:
+        result = await db.execute(
+            select(AIReviewTask, MatchResult, UsageRecord, Work)
+            .join(MatchResult, and_(
+                MatchResult.id == AIReviewTask.match_result_id,
+                MatchResult.batch_id == AIReviewTask.batch_id
+            ))
+            .join(UsageRecord, and_(
+                UsageRecord.id == MatchResult.usage_record_id,
+                UsageRecord.batch_id == MatchResult.batch_id
+            ))
+            .join(Work, Work.id == MatchResult.work_id)
+            .where(AIReviewTask.id.in_(task_ids))
+            .order_by(AIReviewTask.id)
+        )
+        rows = result.all()
+        before = {row.MatchResult.id: (row.MatchResult.match_type, row.MatchResult.confidence_score) for row in rows}
+
+        missing = set(task_ids) - {row.AIReviewTask.id for row in rows}
+        if missing:
+            await db.execute(
+                update(AIReviewTask)
+                .where(AIReviewTask.id.in_(missing))
+                .values(status="failed", last_error="Match no longer available")
+            )
+
+        verdict_cache = VerdictCache(
+            db,
+            model=ollama_service.model,
+            prompt_version=ollama_service.prompt_version
+        )
+
+        rows_by_batch: Dict[UUID, List] = {}
+        batches: Dict[UUID, Optional[ProcessingBatch]] = {}
+        settled = []
+        for row in rows:
+            if self._reviewed(row.MatchResult):
+                self._close_reviewed(row.AIReviewTask)
+                settled.append(row)
+            else:
+                rows_by_batch.setdefault(row.AIReviewTask.batch_id, []).append(row)
+
+        for batch_id, batch_rows in list(rows_by_batch.items()):
+            batch = await db.get(ProcessingBatch, batch_id)
+            if batch is not None and self._budget_exhausted(batch):
+                for task, match, _, _ in batch_rows:
+                    self._skip(task, match, "Batch LLM budget exhausted")
+                settled.extend(batch_rows)
+                del rows_by_batch[batch_id]
+            else:
+                batches[batch_id] = batch
+
+        # No transaction stays open while the LLM answers (see
+        # app/services/partitions.py)
+        await self._record_stats(db, settled, before)
+        await db.commit()
+
+        for batch_id, batch_rows in rows_by_batch.items():
+            verdicts = await self._adjudicate(ollama_service, verdict_cache, batch_rows, batches[batch_id])
+
+            # A reviewer may have decided a match while the LLM was answering
+            unreviewed = await self._lock_unreviewed(db, batch_id, batch_rows)
+            await self._reload_usage_records(db, batch_id, [
+                row.UsageRecord.id for row in batch_rows if row.MatchResult.id in unreviewed
+            ])
+            for task, match, usage_record, work in batch_rows:
+                if match.id not in unreviewed:
+                    self._close_reviewed(task)
+                    continue
+                await self._apply_verdict(db, task, match, usage_record, verdicts.get(task.id))
+            await self._record_stats(db, batch_rows, before)
+            await db.commit()
+
+        return len(rows)
+
+    @staticmethod
+    async def _release(db: AsyncSession, task_ids: List[int], error: str) -> None:
+        """Requeue claimed tasks, failing those out of attempts."""
+        await db.execute(
+            update(AIReviewTask)
+            .where(AIReviewTask.id.in_(task_ids), AIReviewTask.status == "processing")
+            .values(
+                status=case(
+                    (AIReviewTask.attempts >= settings.ai_review_max_attempts, "failed"),
+                    else_="pending"
+                ),
+                last_error=error
+            )
+        )
+
+    @staticmethod
+    def _reviewed(match: MatchResult) -> bool:
+        return bool(match.is_confirmed or match.is_rejected)
+
+    @staticmethod
+    def _close_reviewed(task: AIReviewTask) -> None:
+        """Drop a review a person has already made; their decision stands."""
+        task.status = "done"
+        task.last_error = "Reviewed before the AI verdict"
+
+    @staticmethod
+    async def _lock_unreviewed(db: AsyncSession, batch_id: UUID, rows: List) -> Set[int]:
+        """Lock the matches of ``rows`` still unreviewed until commit, and return their ids."""
+        result = await db.execute(
+            select(MatchResult.id)
+            .where(
+                MatchResult.batch_id == batch_id,
+                MatchResult.id.in_([row.MatchResult.id for row in rows]),
+                MatchResult.is_confirmed.isnot(True),
+                MatchResult.is_rejected.isnot(True)
+            )
+            .with_for_update()
+        )
+        return {row.id for row in result.all()}
+
+    @staticmethod
+    async def _reload_usage_records(db: AsyncSession, batch_id: UUID, record_ids: List[int]) -> None:
+        """Lock and re-read usage records a review may have changed since they were loaded."""
+        if not record_ids:
+            return
+        await db.execute(
+            select(UsageRecord)
+            .where(UsageRecord.batch_id == batch_id, UsageRecord.id.in_(record_ids))
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        )
+
+    @staticmethod
+    async def _record_stats(db: AsyncSession, rows: List, before: Dict[int, tuple]) -> None:
+        """Move the matches whose type or confidence changed between histogram buckets."""
+        collectors: Dict[UUID, BatchStatsCollector] = {}
+        for row in rows:
+            match = row.MatchResult
+            after = (match.match_type, match.confidence_score)
+            if after == before[match.id]:
+                continue
+            stats = collectors.setdefault(match.batch_id, BatchStatsCollector(match.batch_id))
+            stats.remove_match(*before[match.id])
+            stats.add_match(*after)
+        for stats in collectors.values():
+            await stats.flush(db)
+
+    @staticmethod
+    def _budget_exhausted(batch: ProcessingBatch) -> bool:
+        if settings.ai_max_calls_per_batch and (batch.ai_calls or 0) >= settings.ai_max_calls_per_batch:
+            return True
+        if settings.ai_max_seconds_per_batch and (batch.ai_seconds or 0) >= settings.ai_max_seconds_per_batch:
+            return True
+        return False
+
+    @staticmethod
+    def _skip(task: AIReviewTask, match: MatchResult, reason: str) -> None:
+        """Give up on a review and fall back to the deterministic classification."""
+        task.status = "skipped"
+        task.last_error = reason
+        match.match_type = "medium_confidence"
+
+    async def _adjudicate(
+        self,
+        ollama_service: OllamaService,
+        verdict_cache: VerdictCache,
+        rows: List,
+        batch: Optional[ProcessingBatch]
+    ) -> Dict[int, Dict]:
+        """Get verdicts for one batch's claimed reviews, from the cache where possible.
+
+        ``ollama_service`` must not be shared with other workers: the calls
+        it made during this method are charged to ``batch``. The session's
+        transaction is committed before the LLM is asked.
+        """
+        # Another worker may have answered the same usage text already
+        queries = []
+        for task, match, usage_record, work in rows:
+            title, songwriter = MatchingService.get_usage_query(usage_record)
+            usage_key = verdict_cache.make_usage_key(
+                MatchingService.normalize_text(title),
+                MatchingService.normalize_text(songwriter)
+            )
+            queries.append((task, match, usage_record, work, title, songwriter, usage_key))
+
+        cached = await verdict_cache.get_many(
+            [(usage_key, work) for _, _, _, work, _, _, usage_key in queries]
+        )
+        verdicts: Dict[int, Dict] = {}
+        to_ask = []
+        for query in queries:
+            task, _, _, work, _, _, usage_key = query
+            if (usage_key, work.id) in cached:
+                verdicts[task.id] = cached[(usage_key, work.id)]
+            else:
+                to_ask.append(query)
+
+        if not to_ask:
+            return verdicts
+
+        # End the cache lookup's transaction before the LLM call
+        await verdict_cache.db.commit()
+
+        calls_before = ollama_service.calls
+        seconds_before = ollama_service.call_seconds
+        answers = await ollama_service.analyze_batch_matches([
+            {
+                "usage_record_id": usage_record.id,
+                "usage_title": title,
+                "usage_songwriter": songwriter,
+                "work_id": work.id,
+                "work_title": work.title,
+                "work_songwriters": work.songwriters,
+                "similarity_scores": {
+                    "title": float(match.title_similarity or 0),
+                    "songwriter": float(match.songwriter_similarity or 0),
+                    "vector": (
+                        float(match.vector_similarity)
+                        if match.vector_similarity is not None else None
+                    )
+                }
+            }
+            for _, match, usage_record, work, title, songwriter, _ in to_ask
+        ])
+        for (task, _, _, work, _, _, usage_key), answer in zip(to_ask, answers):
+            verdicts[task.id] = answer
+            await verdict_cache.put(usage_key, work, answer)
+
+        if batch is not None:
+            await verdict_cache.db.execute(
+                update(ProcessingBatch)
+                .where(ProcessingBatch.id == batch.id)
+                .values(
+                    ai_calls=ProcessingBatch.ai_calls + (ollama_service.calls - calls_before),
+                    ai_seconds=ProcessingBatch.ai_seconds + (ollama_service.call_seconds - seconds_before)
+                )
+            )
+
+        return verdicts
+
+    async def _apply_verdict(
+        self,
+        db: AsyncSession,
+        task: AIReviewTask,
+        match: MatchResult,
+        usage_record: UsageRecord,
+        verdict: Optional[Dict]
+    ) -> None:
+        """Write a verdict back to the match and keep the batch counters in step."""
+        if verdict is None or verdict.get("error"):
+            if not llm_breaker.available:
+                # Ollama went down mid-claim: requeue without using up an attempt
+                task.status = "pending"
+                task.attempts -= 1
+                return
+            if task.attempts < settings.ai_review_max_attempts:
+                task.status = "pending"
+                task.last_error = verdict["reasoning"] if verdict else "No verdict returned"
+                return
+            # Out of retries: leave the match for a human reviewer
+            task.status = "failed"
+            task.last_error = verdict["reasoning"] if verdict else "No verdict returned"
+            match.match_type = "medium_confidence"
+            match.ai_reasoning = task.last_error
+            return
+
+        was_matched = usage_record.match_status == "matched"
+
+        match_type, confidence = MatchingService.apply_ai_verdict(
+            "medium_confidence", float(match.confidence_score), verdict
+        )
+        match.match_type = match_type
+        match.confidence_score = round(confidence, 4)
+        match.ai_reasoning = verdict.get("reasoning")
+        task.status = "done"
+        task.last_error = None
+        if usage_record.best_confidence is None or confidence > float(usage_record.best_confidence):
+            MatchingService.set_best_match(usage_record, match)
+
+        # A pending_ai match counted the record as flagged; move it across
+        if match_type == "ai_matched" and not was_matched:
+            usage_record.match_status = "matched"
+            await db.execute(
+                update(ProcessingBatch)
+                .where(ProcessingBatch.id == usage_record.batch_id)
+                .values(
+                    matched_records=ProcessingBatch.matched_records + 1,
+                    flagged_records=ProcessingBatch.flagged_records - 1
+                )
+            )
+
+
+ai_review_worker = AIReviewWorker()
@@ -0,0 +1,65 @@
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List
+from uuid import UUID
+from sqlalchemy import and_, case, or_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import AutoConfirmRule
+from app.models import MatchResult, UsageRecord
+from app.services.reviews import refresh_match_status
+
+
+def rule_condition(rule: AutoConfirmRule):
+    """SQL condition selecting the matches ``rule`` confirms."""
+    conditions = [MatchResult.confidence_score >= rule.min_confidence]
+    if rule.match_types:
+        conditions.append(MatchResult.match_type.in_(rule.match_types))
+    for column, minimum in (
+        (MatchResult.title_similarity, rule.min_title_similarity),
+        (MatchResult.songwriter_similarity, rule.min_songwriter_similarity),
+        (MatchResult.vector_similarity, rule.min_vector_similarity),
+    ):
+        if minimum is not None:
+            conditions.append(column >= minimum)
+    return and_(*conditions)
+
+
+async def apply_auto_confirm_rules(
+    db: AsyncSession,
+    batch_id: UUID,
+    rules: List[AutoConfirmRule]
+) -> Dict[str, int]:
+    """Confirm the unreviewed best matches of a batch that meet any rule, in one UPDATE.
+
+    Each match records the first rule it meets. Matches awaiting AI review
+    are left alone, and confirmations are not stored as reviewer decisions.
+    The confirmed records count as matched from then on. Returns the number
+    of matches confirmed per rule.
+    """
+    if not rules:
+        return {}
+
+    conditions = [(rule_condition(rule), rule.name) for rule in rules]
+    result = await db.execute(
+        update(MatchResult)
+        .where(
+            MatchResult.batch_id == batch_id,
+            UsageRecord.batch_id == batch_id,
+            MatchResult.usage_record_id == UsageRecord.id,
+            MatchResult.id == UsageRecord.best_match_id,
+            MatchResult.is_confirmed == False,
+            MatchResult.is_rejected == False,
+            MatchResult.match_type != "pending_ai",
+            or_(*(condition for condition, _ in conditions))
+        )
+        .values(
+            is_confirmed=True,
+            reviewed_at=datetime.utcnow(),
+            auto_confirm_rule=case(*conditions)
+        )
+        .returning(MatchResult.auto_confirm_rule, MatchResult.batch_id, MatchResult.usage_record_id)
+        .execution_options(synchronize_session=False)
+    )
+    confirmed = result.all()
+    await refresh_match_status(db, [(row.batch_id, row.usage_record_id) for row in confirmed])
+    return dict(Counter(row.auto_confirm_rule for row in confirmed))
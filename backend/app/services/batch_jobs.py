@@ -0,0 +1,177 @@
+import asyncio
+import gzip
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional, Set
+from uuid import UUID
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import select, update, delete, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import AsyncSessionLocal
+from app.models import BatchJob, MatchResult, ProcessingBatch, UsageRecord
+from app.services.exports import ndjson_lines, stream_rows
+from app.services.partitions import drop_batch_partitions
+from app.core.config import get_settings
+
+settings = get_settings()
+
+ARCHIVE_CHUNK_SIZE = 5000
+
+# Tables archived per batch, in the order a restore would insert them
+ARCHIVED_MODELS = (UsageRecord, MatchResult)
+
+
+def archive_columns(model) -> List:
+    """Columns of ``model`` kept in archives; embeddings are left out as they can be regenerated."""
+    return [column for column in model.__table__.columns if not isinstance(column.type, Vector)]
+
+
+async def active_job(db: AsyncSession, batch_id: UUID) -> Optional[BatchJob]:
+    """The pending or running job for a batch, if there is one."""
+    result = await db.execute(
+        select(BatchJob)
+        .where(BatchJob.batch_id == batch_id, BatchJob.status.in_(["pending", "running"]))
+        .limit(1)
+    )
+    return result.scalar_one_or_none()
+
+
+class BatchJobRunner:
+    """Background tasks that delete batches, archiving them first when asked.
+
+    A batch's usage records and matches are written, one table after the
+    other, to a gzipped NDJSON file under ``archive_dir``, one object per
+    row tagged with its table. The batch is then removed by dropping its
+    partitions, which takes the place of deleting its rows a chunk at a
+    time: it is as quick for a large batch as for a small one and leaves
+    no dead rows to vacuum. Finally the batch row itself is deleted.
+
+    Each phase is committed to ``batch_jobs`` as it starts, and archive
+    progress as rows are written. A job cut short by a restart is run
+    again from the start of the phase it was in; a finished archive, known
+    by its ``archive_path``, is not written again.
+    """
+
+    def __init__(self):
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def start(self) -> None:
+        """Resume jobs left pending or running by a previous run."""
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(BatchJob.id).where(BatchJob.status.in_(["pending", "running"]))
+            )
+            job_ids = result.scalars().all()
+        for job_id in job_ids:
+            self.launch(job_id)
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    def launch(self, job_id: UUID) -> None:
+        """Run a committed job in the background."""
+        task = asyncio.create_task(self.run(job_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def run(self, job_id: UUID) -> None:
+        async with AsyncSessionLocal() as db:
+            job = await db.get(BatchJob, job_id)
+            if job is None:
+                # Deleted since it was launched or resumed
+                print(f"Batch job {job_id} not found, nothing to run")
+                return
+            job.status = "running"
+            job.started_at = datetime.utcnow()
+            await db.commit()
+
+            try:
+                if job.archive and job.archive_path is None:
+                    await self._enter_phase(db, job, "archiving")
+                    job.rows_done = 0
+                    job.archive_path = await self.archive(db, job)
+
+                await self._enter_phase(db, job, "dropping_partitions")
+                await drop_batch_partitions(db, job.batch_id)
+
+                await self._enter_phase(db, job, "deleting_batch")
+                await db.execute(delete(ProcessingBatch).where(ProcessingBatch.id == job.batch_id))
+                job.status = "completed"
+                job.completed_at = datetime.utcnow()
+                await db.commit()
+            except asyncio.CancelledError:
+                # Left running, to be resumed on the next start
+                raise
+            except Exception as e:
+                await db.rollback()
+                await db.execute(
+                    update(BatchJob)
+                    .where(BatchJob.id == job_id)
+                    .values(status="failed", error_message=str(e), completed_at=datetime.utcnow())
+                )
+                await db.commit()
+
+    @staticmethod
+    async def _enter_phase(db: AsyncSession, job: BatchJob, phase: str) -> None:
+        """Commit the work done so far and report the phase now starting."""
+        job.phase = phase
+        await db.commit()
+
+    async def archive(self, db: AsyncSession, job: BatchJob) -> str:
+        """Write the batch to a gzipped NDJSON file and return its path.
+
+        Rows are read a chunk per transaction (``stream_rows``), so the file
+        is not a snapshot: a review saved while it is written shows in the
+        chunks read after it. ``delete_batch`` only archives batches that
+        matching and AI review are done with.
+        """
+        batch = await db.get(ProcessingBatch, job.batch_id)
+        total = 0
+        for model in ARCHIVED_MODELS:
+            result = await db.execute(
+                select(func.count()).select_from(model).where(model.batch_id == job.batch_id)
+            )
+            total += result.scalar() or 0
+        job.rows_total = total
+        await db.commit()
+
+        directory = Path(settings.archive_dir)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"batch_{job.batch_id}.ndjson.gz"
+        # Written under a temporary name so a partial archive is never mistaken for a whole one
+        partial = path.with_name(path.name + ".partial")
+
+        archive = gzip.open(partial, "wt", encoding="utf-8")
+        try:
+            try:
+                if batch is not None:
+                    header = {column.name: getattr(batch, column.key) for column in archive_columns(ProcessingBatch)}
+                    await asyncio.to_thread(archive.write, ndjson_lines([{"table": "processing_batches", **header}]))
+
+                for model in ARCHIVED_MODELS:
+                    table = model.__tablename__
+                    query = (
+                        select(*archive_columns(model))
+                        .where(model.batch_id == job.batch_id)
+                    )
+                    async for rows in stream_rows(query, (model.id,), ARCHIVE_CHUNK_SIZE):
+                        lines = ndjson_lines({"table": table, **row._mapping} for row in rows)
+                        await asyncio.to_thread(archive.write, lines)
+                        job.rows_done += len(rows)
+                        await db.commit()
+            finally:
+                await asyncio.to_thread(archive.close)
+        except BaseException:
+            # Including cancellation: the next attempt starts a new file
+            partial.unlink(missing_ok=True)
+            raise
+
+        os.replace(partial, path)
+        return str(path)
+
+
+batch_job_runner = BatchJobRunner()
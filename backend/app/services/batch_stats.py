@@ -0,0 +1,99 @@
+import time
+from collections import Counter
+from typing import Dict, Optional
+from uuid import UUID
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert, JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import BatchStats
+from app.services.cascade import MatchContext
+from app.core.config import get_settings
+
+settings = get_settings()
+
+CONFIDENCE_BUCKET_WIDTH = 0.05
+CONFIDENCE_BUCKETS = round(1 / CONFIDENCE_BUCKET_WIDTH)
+
+# Stages that settle a record without any fuzzy search
+FAST_PATH_STAGES = ("known", "identifier", "exact_key")
+
+STAT_COLUMNS = ("match_types", "confidence_histogram", "decided_by", "stage_runs", "stage_seconds")
+
+
+def confidence_bucket(confidence) -> str:
+    """Lower bound of the histogram bucket holding ``confidence``, e.g. "0.85"."""
+    index = min(int(float(confidence) / CONFIDENCE_BUCKET_WIDTH + 1e-9), CONFIDENCE_BUCKETS - 1)
+    return f"{index * CONFIDENCE_BUCKET_WIDTH:.2f}"
+
+
+class BatchStatsCollector:
+    """Statistics for one batch, counted in memory and added to ``batch_stats`` on flush.
+
+    Match types and confidences are counted over the batch's match
+    results, so every change to a match is a local adjustment: matching
+    adds its matches, AI review moves a match between buckets and
+    rematching takes the old ones out. Flushes merge the counts into the
+    stored row in SQL, so collectors in several processes can share a batch.
+    """
+
+    def __init__(self, batch_id: UUID, flush_seconds: Optional[float] = None):
+        self.batch_id = batch_id
+        self.flush_seconds = settings.stats_flush_seconds if flush_seconds is None else flush_seconds
+        self._reset()
+
+    def _reset(self) -> None:
+        self.counts: Dict[str, Counter] = {column: Counter() for column in STAT_COLUMNS}
+        self.flushed_at = time.monotonic()
+
+    def add_match(self, match_type: str, confidence, count: int = 1) -> None:
+        self.counts["match_types"][match_type] += count
+        self.counts["confidence_histogram"][confidence_bucket(confidence)] += count
+
+    def remove_match(self, match_type: str, confidence) -> None:
+        self.add_match(match_type, confidence, count=-1)
+
+    def add_context(self, ctx: MatchContext) -> None:
+        """Count the stages a finished cascade run went through and which one decided it.
+
+        A record no stage was decisive for is counted against none of them.
+        """
+        for stage, seconds in ctx.stage_seconds.items():
+            self.counts["stage_runs"][stage] += 1
+            self.counts["stage_seconds"][stage] += seconds
+        if ctx.decided_by is not None:
+            self.counts["decided_by"][ctx.decided_by] += 1
+
+    def remove_decision(self, stage: Optional[str]) -> None:
+        """Take back the decision of a record that is being matched again."""
+        if stage is not None:
+            self.counts["decided_by"][stage] -= 1
+
+    @property
+    def pending(self) -> bool:
+        return any(self.counts.values())
+
+    def due(self) -> bool:
+        """Whether the flush interval has passed since the last flush."""
+        return time.monotonic() - self.flushed_at >= self.flush_seconds
+
+    async def flush(self, db: AsyncSession) -> None:
+        """Add the counts gathered so far to the batch's row, in the caller's transaction."""
+        if self.pending:
+            values = {column: dict(counter) for column, counter in self.counts.items()}
+            values["stage_seconds"] = {
+                stage: round(seconds, 6) for stage, seconds in values["stage_seconds"].items()
+            }
+            statement = insert(BatchStats).values(batch_id=self.batch_id, **values)
+            await db.execute(statement.on_conflict_do_update(
+                index_elements=[BatchStats.batch_id],
+                set_={
+                    **{
+                        column: func.jsonb_add_counts(
+                            getattr(BatchStats, column), statement.excluded[column], type_=JSONB
+                        )
+                        for column in STAT_COLUMNS
+                    },
+                    "updated_at": func.now(),
+                }
+            ))
+        self._reset()
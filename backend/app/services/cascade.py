@@ -0,0 +1,229 @@
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+from app.models import UsageRecord
+from app.services.normalization import build_features
+from app.services.songwriters import parse_songwriters
+from app.core.config import get_settings
+
+settings = get_settings()
+
+# Relative cost of each matching stage. The cascade always runs the enabled
+# stages cheapest first, whatever order they are configured in.
+STAGE_COSTS = {
+    "known": 0,
+    "identifier": 1,
+    "exact_key": 2,
+    "minhash": 5,
+    "trigram": 10,
+    "phonetic": 12,
+    "songwriter": 15,
+    "vector": 20,
+    "llm": 30,
+}
+
+# Stages that may be skipped when a record runs out of time
+OPTIONAL_STAGES = {"vector", "llm"}
+
+
+class DeadlineExceeded(Exception):
+    """Raised instead of starting a call its deadline leaves no time for."""
+
+
+class Deadline:
+    """A point in time work should be finished by. ``None`` seconds means no deadline."""
+
+    def __init__(self, seconds: Optional[float] = None):
+        self.expires_at = time.monotonic() + seconds if seconds else None
+
+    @classmethod
+    def earliest(cls, *deadlines: Optional["Deadline"]) -> "Deadline":
+        """Combine deadlines, keeping whichever expires first."""
+        combined = cls()
+        for deadline in deadlines:
+            if deadline is None or deadline.expires_at is None:
+                continue
+            if combined.expires_at is None or deadline.expires_at < combined.expires_at:
+                combined.expires_at = deadline.expires_at
+        return combined
+
+    def remaining(self) -> Optional[float]:
+        if self.expires_at is None:
+            return None
+        return self.expires_at - time.monotonic()
+
+    def expired(self) -> bool:
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def timeout(self, limit: float) -> float:
+        """``limit`` seconds, or the time left if the deadline comes sooner."""
+        remaining = self.remaining()
+        return limit if remaining is None else min(limit, remaining)
+
+    def allows(self, expected_seconds: float) -> bool:
+        """Whether there is time left for work expected to take ``expected_seconds``."""
+        remaining = self.remaining()
+        return remaining is None or remaining > expected_seconds
+
+
+class MatchContext:
+    """Working state for one usage record as it moves through the cascade."""
+
+    def __init__(
+        self,
+        usage_record: UsageRecord,
+        title: str,
+        songwriter: str,
+        deadline: Optional[Deadline] = None,
+        iswc: Optional[str] = None,
+        work_code: Optional[str] = None,
+        fingerprint: Optional[str] = None
+    ):
+        self.usage_record = usage_record
+        self.title = title
+        self.songwriter = songwriter
+        # Normalized identifiers from the usage row, if it carries usable ones
+        self.iswc = iswc
+        self.work_code = work_code
+        # Reviewer decisions on this usage line, work_id -> confirmed, once loaded
+        self.fingerprint = fingerprint
+        self.decisions: Optional[Dict[int, bool]] = None
+        self.features = build_features(title, [songwriter] if songwriter else ())
+        self.songwriter_names = parse_songwriters(songwriter)
+        # work_id -> {"work", "title_sim", "songwriter_sim", "vector_sim", "ai_result", "identifier", "known"}
+        self.candidates: Dict[int, Dict] = {}
+        # Candidates above the low confidence threshold, best first
+        self.scored: List[Dict] = []
+        self.stages_run: List[str] = []
+        self.stage_seconds: Dict[str, float] = {}  # Time spent in each stage run
+        # Stage whose result made the rest pointless; None if the cascade ran out
+        self.decided_by: Optional[str] = None
+        self.embedding_requested = False
+        self.deadline = deadline or Deadline()
+        # Set when optional work was skipped to meet the deadline
+        self.degraded = False
+        self.skipped_stages: List[str] = []
+
+    @property
+    def best(self) -> Optional[Dict]:
+        return self.scored[0] if self.scored else None
+
+    @property
+    def runner_up(self) -> Optional[Dict]:
+        return self.scored[1] if len(self.scored) > 1 else None
+
+
+StageHandler = Callable[[MatchContext], Awaitable[None]]
+
+
+class MatchCascade:
+    """Runs matching stages in order of cost and stops as soon as one is decisive."""
+
+    def __init__(
+        self,
+        stages: Dict[str, StageHandler],
+        scorer: Callable[[MatchContext], None],
+        enabled: Optional[List[str]] = None,
+        stop_margin: Optional[float] = None,
+        early_exit: Optional[bool] = None
+    ):
+        if enabled is None:
+            enabled = parse_stage_list(settings.matching_stages)
+        unknown = [name for name in enabled if name not in stages]
+        if unknown:
+            raise ValueError(f"Unknown matching stages: {', '.join(unknown)}")
+
+        self.stages = stages
+        self.scorer = scorer
+        self.order = sorted(enabled, key=lambda name: STAGE_COSTS.get(name, 0))
+        self.stop_margin = settings.cascade_stop_margin if stop_margin is None else stop_margin
+        self.early_exit = settings.cascade_early_exit if early_exit is None else early_exit
+        # Moving average of how long each stage takes, used to judge deadlines
+        self.stage_seconds: Dict[str, float] = {}
+
+    def expected_seconds(self, stage: str) -> float:
+        return self.stage_seconds.get(stage, 0.0)
+
+    def skip_if_late(self, ctx: MatchContext, stage: str) -> bool:
+        """Skip an optional stage when the record's deadline leaves no time for it.
+
+        Returns True if the stage was skipped.
+        """
+        if stage not in OPTIONAL_STAGES or not self.is_pending(ctx, stage):
+            return False
+        if ctx.deadline.allows(self.expected_seconds(stage)):
+            return False
+        ctx.skipped_stages.append(stage)
+        ctx.degraded = True
+        return True
+
+    def _observe(self, stage: str, elapsed: float) -> None:
+        previous = self.stage_seconds.get(stage)
+        self.stage_seconds[stage] = elapsed if previous is None else previous * 0.8 + elapsed * 0.2
+
+    def should_stop(self, ctx: MatchContext) -> bool:
+        """Check whether the current best candidate makes later stages pointless."""
+        if not self.early_exit:
+            return False
+
+        best = ctx.best
+        if best is None:
+            return False
+
+        if best["match_type"] == "exact":
+            return True
+
+        # A clear high confidence winner: nothing later is likely to overtake it
+        if best["confidence"] >= settings.high_confidence_threshold:
+            runner_up = ctx.runner_up
+            runner_up_score = runner_up["confidence"] if runner_up else 0.0
+            return best["confidence"] - runner_up_score >= self.stop_margin
+
+        return False
+
+    async def run(self, ctx: MatchContext, until: Optional[str] = None) -> MatchContext:
+        """Run the remaining stages for ``ctx``.
+
+        With ``until`` the cascade pauses before that stage (or anything at
+        least as costly) so callers can do batch-level work such as embedding
+        and call ``run`` again to resume. Optional stages are skipped, and
+        the record marked degraded, once its deadline leaves no room for them.
+        """
+        for name in self.order:
+            if ctx.decided_by is not None:
+                break
+            if name in ctx.stages_run or name in ctx.skipped_stages:
+                continue
+            if until is not None and STAGE_COSTS.get(name, 0) >= STAGE_COSTS.get(until, 0):
+                return ctx
+            if self.skip_if_late(ctx, name):
+                continue
+
+            started = time.monotonic()
+            await self.stages[name](ctx)
+            elapsed = time.monotonic() - started
+            self._observe(name, elapsed)
+            ctx.stage_seconds[name] = elapsed
+            ctx.stages_run.append(name)
+            self.scorer(ctx)
+
+            if self.should_stop(ctx):
+                ctx.decided_by = name
+
+        # A record no stage was decisive for keeps decided_by None; its
+        # matches are whatever the last stage left in ctx.scored
+        return ctx
+
+    def is_pending(self, ctx: MatchContext, stage: str) -> bool:
+        """Whether ``stage`` is enabled and still ahead of ``ctx``."""
+        return (
+            ctx.decided_by is None
+            and stage in self.order
+            and stage not in ctx.stages_run
+            and stage not in ctx.skipped_stages
+        )
+
+
+def parse_stage_list(value: str) -> List[str]:
+    """Parse a comma separated stage list from settings."""
+    return [name.strip() for name in value.split(",") if name.strip()]
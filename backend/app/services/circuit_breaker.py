@@ -0,0 +1,146 @@
+import time
+from collections import deque
+from typing import Dict, Optional
+from app.core.config import get_settings
+
+settings = get_settings()
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is refused because the circuit is open."""
+
+
+class CircuitBreaker:
+    """Fail-fast guard around a slow or unreliable dependency.
+
+    Tracks the outcome of the last ``window_size`` calls. Once at least
+    ``min_calls`` have been seen and the share of failed or slow calls
+    reaches ``failure_rate_threshold`` the circuit opens and calls are
+    refused for ``open_seconds``. After that a single probe call is let
+    through (half open): success closes the circuit, failure reopens it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        slow_call_seconds: float,
+        failure_rate_threshold: Optional[float] = None,
+        window_size: Optional[int] = None,
+        min_calls: Optional[int] = None,
+        open_seconds: Optional[float] = None
+    ):
+        self.name = name
+        self.slow_call_seconds = slow_call_seconds
+        self.failure_rate_threshold = (
+            settings.breaker_failure_rate_threshold
+            if failure_rate_threshold is None else failure_rate_threshold
+        )
+        self.window_size = window_size or settings.breaker_window_size
+        self.min_calls = min_calls or settings.breaker_min_calls
+        self.open_seconds = settings.breaker_open_seconds if open_seconds is None else open_seconds
+
+        self.state = CLOSED
+        self.opened_at: Optional[float] = None
+        self.probe_in_flight = False
+        self.outcomes = deque(maxlen=self.window_size)  # True = bad (failed or slow)
+        self.total_failures = 0
+        self.total_rejected = 0
+
+    @property
+    def available(self) -> bool:
+        """Whether a call would currently be allowed, without reserving a probe."""
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN:
+            return time.monotonic() - self.opened_at >= self.open_seconds
+        return not self.probe_in_flight
+
+    def allow_request(self) -> bool:
+        """Reserve permission for one call. Must be followed by a record_* call or ``release``."""
+        if self.state == OPEN and time.monotonic() - self.opened_at >= self.open_seconds:
+            self.state = HALF_OPEN
+            self.probe_in_flight = False
+
+        if self.state == CLOSED:
+            return True
+        if self.state == HALF_OPEN and not self.probe_in_flight:
+            self.probe_in_flight = True
+            return True
+
+        self.total_rejected += 1
+        return False
+
+    def check(self) -> None:
+        """Like ``allow_request`` but raises CircuitOpenError when refused."""
+        if not self.allow_request():
+            raise CircuitOpenError(f"{self.name} circuit is open")
+
+    def record_success(self, elapsed: float) -> None:
+        slow = elapsed >= self.slow_call_seconds
+        if self.state == HALF_OPEN:
+            if slow:
+                self._open()
+            else:
+                self._close()
+            return
+        self._record(slow)
+
+    def record_failure(self) -> None:
+        self.total_failures += 1
+        if self.state == HALF_OPEN:
+            self._open()
+            return
+        self._record(True)
+
+    def release(self) -> None:
+        """Give back a call that ended without an outcome, such as a cancelled one.
+
+        A probe cut short says nothing about the dependency, so the next
+        caller may probe instead.
+        """
+        if self.state == HALF_OPEN:
+            self.probe_in_flight = False
+
+    def _record(self, bad: bool) -> None:
+        self.outcomes.append(bad)
+        if len(self.outcomes) >= self.min_calls and self.failure_rate >= self.failure_rate_threshold:
+            self._open()
+
+    @property
+    def failure_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return sum(self.outcomes) / len(self.outcomes)
+
+    def _open(self) -> None:
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.probe_in_flight = False
+
+    def _close(self) -> None:
+        self.state = CLOSED
+        self.opened_at = None
+        self.probe_in_flight = False
+        self.outcomes.clear()
+
+    def snapshot(self) -> Dict:
+        """Current state for health reporting."""
+        retry_in = None
+        if self.state == OPEN:
+            retry_in = max(0.0, self.open_seconds - (time.monotonic() - self.opened_at))
+        return {
+            "state": self.state,
+            "failure_rate": round(self.failure_rate, 4),
+            "window_calls": len(self.outcomes),
+            "total_failures": self.total_failures,
+            "total_rejected": self.total_rejected,
+            "retry_in_seconds": round(retry_in, 1) if retry_in is not None else None
+        }
+
+
+llm_breaker = CircuitBreaker("ollama_llm", slow_call_seconds=settings.llm_slow_call_seconds)
+embedding_breaker = CircuitBreaker("ollama_embeddings", slow_call_seconds=settings.embedding_slow_call_seconds)
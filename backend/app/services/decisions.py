@@ -0,0 +1,147 @@
+import hashlib
+from typing import Any, Dict, Iterable, List, Sequence
+from sqlalchemy import select, and_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import MatchDecision, MatchResult, UsageRecord
+from app.services.normalization import normalize_text
+
+DECISION_CHUNK_SIZE = 1000
+
+
+def usage_fingerprint(usage_record: UsageRecord) -> str:
+    """Hash the normalized recording title, artist, work title and songwriter of a usage line."""
+    raw = "\x1f".join(
+        normalize_text(value)
+        for value in (
+            usage_record.recording_title,
+            usage_record.recording_artist,
+            usage_record.work_title,
+            usage_record.songwriter,
+        )
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _upsert(values: List[dict]):
+    """Insert decisions, letting a later review of the same pair win over an earlier one."""
+    statement = insert(MatchDecision).values(values)
+    return statement.on_conflict_do_update(
+        constraint="uq_match_decision_key",
+        set_={
+            "is_confirmed": statement.excluded.is_confirmed,
+            "match_result_id": statement.excluded.match_result_id,
+            "decided_at": statement.excluded.decided_at,
+        },
+        where=MatchDecision.decided_at <= statement.excluded.decided_at
+    )
+
+
+def _decision_values(usage_record: UsageRecord, match: MatchResult) -> dict:
+    # Rows with the same attribute names stand in for either model
+    return {
+        "fingerprint": usage_fingerprint(usage_record),
+        "work_id": match.work_id,
+        "is_confirmed": bool(match.is_confirmed),
+        "match_result_id": match.id,
+        "decided_at": match.reviewed_at,
+    }
+
+
+def _latest_per_pair(values: Iterable[dict]) -> List[dict]:
+    """One decision per pair, as a statement may not upsert the same row twice; the latest review wins."""
+    latest: Dict[tuple, dict] = {}
+    for value in values:
+        key = (value["fingerprint"], value["work_id"])
+        if key not in latest or latest[key]["decided_at"] <= value["decided_at"]:
+            latest[key] = value
+    return list(latest.values())
+
+
+async def load_decisions(db: AsyncSession, fingerprints: Iterable[str]) -> Dict[str, Dict[int, bool]]:
+    """Decisions for the given usage lines: fingerprint -> {work_id: is_confirmed}."""
+    fingerprints = list(set(fingerprints))
+    if not fingerprints:
+        return {}
+
+    result = await db.execute(
+        select(MatchDecision.fingerprint, MatchDecision.work_id, MatchDecision.is_confirmed)
+        .where(MatchDecision.fingerprint.in_(fingerprints))
+    )
+    decisions: Dict[str, Dict[int, bool]] = {}
+    for fingerprint, work_id, is_confirmed in result.all():
+        decisions.setdefault(fingerprint, {})[work_id] = is_confirmed
+    return decisions
+
+
+async def record_decision(db: AsyncSession, usage_record: UsageRecord, match: MatchResult) -> None:
+    """Store the review of ``match``, which must be confirmed or rejected and have reviewed_at set."""
+    await db.execute(_upsert([_decision_values(usage_record, match)]))
+
+
+async def record_decisions(db: AsyncSession, reviews: Sequence[Any]) -> None:
+    """Store many reviews at once.
+
+    ``reviews`` are rows of reviewed matches with their ``id``,
+    ``batch_id``, ``usage_record_id``, ``work_id``, ``is_confirmed`` and
+    ``reviewed_at``, as returned by a bulk UPDATE.
+    """
+    for start in range(0, len(reviews), DECISION_CHUNK_SIZE):
+        chunk = reviews[start:start + DECISION_CHUNK_SIZE]
+        result = await db.execute(
+            select(
+                UsageRecord.id,
+                UsageRecord.recording_title,
+                UsageRecord.recording_artist,
+                UsageRecord.work_title,
+                UsageRecord.songwriter
+            )
+            .where(
+                UsageRecord.batch_id.in_({review.batch_id for review in chunk}),
+                UsageRecord.id.in_({review.usage_record_id for review in chunk})
+            )
+        )
+        usage_records = {row.id: row for row in result.all()}
+        await db.execute(_upsert(_latest_per_pair(
+            _decision_values(usage_records[review.usage_record_id], review) for review in chunk
+        )))
+
+
+async def rebuild_decisions(db: AsyncSession) -> int:
+    """Load every reviewed match into the decision table, skipping auto-confirmed ones.
+
+    Newer stored decisions are kept. Returns the number of reviews read.
+    """
+    reviews = 0
+    last_id = 0
+    while True:
+        result = await db.execute(
+            select(MatchResult, UsageRecord)
+            .join(UsageRecord, and_(
+                MatchResult.usage_record_id == UsageRecord.id,
+                MatchResult.batch_id == UsageRecord.batch_id
+            ))
+            .where(
+                MatchResult.id > last_id,
+                MatchResult.reviewed_at.isnot(None),
+                MatchResult.auto_confirm_rule.is_(None),
+                (MatchResult.is_confirmed == True) | (MatchResult.is_rejected == True)
+            )
+            .order_by(MatchResult.id)
+            .limit(DECISION_CHUNK_SIZE)
+        )
+        rows = result.all()
+        if not rows:
+            break
+
+        await db.execute(_upsert(_latest_per_pair(
+            _decision_values(usage_record, match) for match, usage_record in rows
+        )))
+
+        reviews += len(rows)
+        last_id = rows[-1][0].id
+        # Drop the loaded rows so memory stays flat
+        db.expunge_all()
+
+    await db.commit()
+    return reviews
@@ -1,7 +1,11 @@
+import asyncio
+import time
 import httpx
 import numpy as np
 from typing import List, Optional
 from app.core.config import get_settings
+from app.services.cascade import Deadline
+from app.services.circuit_breaker import embedding_breaker
 
 settings = get_settings()
 
@@ -11,13 +15,31 @@ class EmbeddingService:
         self.ollama_host = settings.ollama_host
         self.model = settings.embedding_model
 
-    async def get_embedding(self, text: str) -> Optional[List[float]]:
-        """Generate embedding for a single text using Ollama."""
+    @staticmethod
+    def _record_failure(error: Exception, timeout: float) -> None:
+        """Count a failed request against the breaker, unless only the deadline cut it short."""
+        if isinstance(error, httpx.TimeoutException) and timeout < settings.embedding_timeout_seconds:
+            embedding_breaker.release()
+        else:
+            embedding_breaker.record_failure()
+
+    async def get_embedding(self, text: str, deadline: Optional[Deadline] = None) -> Optional[List[float]]:
+        """Generate embedding for a single text using Ollama, giving up at ``deadline``."""
         if not text or not text.strip():
             return None
 
+        deadline = deadline or Deadline()
+        if deadline.expired():
+            return None
+
+        # Fail fast while Ollama is known to be down or overloaded
+        if not embedding_breaker.allow_request():
+            return None
+
+        timeout = deadline.timeout(settings.embedding_timeout_seconds)
+        started = time.monotonic()
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
+            async with httpx.AsyncClient(timeout=timeout) as client:
                 response = await client.post(
                     f"{self.ollama_host}/api/embeddings",
                     json={
@@ -27,17 +49,65 @@ class EmbeddingService:
                 )
                 response.raise_for_status()
                 data = response.json()
-                return data.get("embedding")
+            embedding_breaker.record_success(time.monotonic() - started)
+            return data.get("embedding")
+        except asyncio.CancelledError:
+            embedding_breaker.release()
+            raise
         except Exception as e:
+            self._record_failure(e, timeout)
             print(f"Error generating embedding: {e}")
             return None
 
-    async def get_embeddings_batch(self, texts: List[str]) -> List[Optional[List[float]]]:
-        """Generate embeddings for a batch of texts."""
-        embeddings = []
-        for text in texts:
-            embedding = await self.get_embedding(text)
-            embeddings.append(embedding)
+    async def get_embeddings_batch(
+        self,
+        texts: List[str],
+        deadline: Optional[Deadline] = None
+    ) -> List[Optional[List[float]]]:
+        """Generate embeddings for a batch of texts in a single Ollama request, giving up at ``deadline``."""
+        embeddings: List[Optional[List[float]]] = [None] * len(texts)
+        indexed = [(i, t.strip()) for i, t in enumerate(texts) if t and t.strip()]
+        if not indexed:
+            return embeddings
+
+        deadline = deadline or Deadline()
+        if deadline.expired():
+            return embeddings
+
+        if not embedding_breaker.allow_request():
+            return embeddings
+
+        timeout = deadline.timeout(settings.embedding_timeout_seconds)
+        started = time.monotonic()
+        try:
+            async with httpx.AsyncClient(timeout=timeout) as client:
+                response = await client.post(
+                    f"{self.ollama_host}/api/embed",
+                    json={
+                        "model": self.model,
+                        "input": [t for _, t in indexed]
+                    }
+                )
+                response.raise_for_status()
+                data = response.json()
+                vectors = data.get("embeddings") or []
+                if len(vectors) != len(indexed):
+                    raise ValueError(
+                        f"expected {len(indexed)} embeddings, got {len(vectors)}"
+                    )
+                for (i, _), vector in zip(indexed, vectors):
+                    embeddings[i] = vector
+            embedding_breaker.record_success(time.monotonic() - started)
+            return embeddings
+        except asyncio.CancelledError:
+            embedding_breaker.release()
+            raise
+        except Exception as e:
+            self._record_failure(e, timeout)
+            print(f"Batch embedding failed, falling back to single requests: {e}")
+
+        for i, text in indexed:
+            embeddings[i] = await self.get_embedding(text, deadline)
         return embeddings
 
     def normalize_for_embedding(self, title: str, songwriter: str = "") -> str:
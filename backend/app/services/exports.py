@@ -0,0 +1,160 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, AsyncIterator, Callable, Iterable, List, Sequence
+from uuid import UUID
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import Row, Select, tuple_
+from app.core.database import AsyncSessionLocal
+
+EXPORT_CHUNK_SIZE = 1000
+# Rows per Parquet row group; larger groups compress and scan better
+PARQUET_ROW_GROUP_SIZE = 10000
+PARQUET_COMPRESSION = "zstd"
+
+
+async def stream_rows(
+    query: Select,
+    sort_columns: Sequence[Any],
+    chunk_size: int = EXPORT_CHUNK_SIZE,
+    descending: bool = False
+) -> AsyncIterator[Sequence[Row]]:
+    """Rows of ``query`` in ``sort_columns`` order, a chunk at a time.
+
+    Each chunk is read by keyset in a transaction of its own rather than
+    from one cursor held open for the whole download, so partition DDL
+    isn't held up behind it (see app/services/partitions.py). The sort
+    columns must be selected by ``query``, under the name they are looked
+    up by, and end in a unique column. Runs in a session of its own: a
+    streamed response body is sent after the endpoint has returned and
+    its request session has been closed.
+    """
+    if descending:
+        ordered = query.order_by(*(column.desc() for column in sort_columns))
+    else:
+        ordered = query.order_by(*sort_columns)
+    key = tuple_(*sort_columns)
+
+    async with AsyncSessionLocal() as db:
+        last = None
+        while True:
+            chunk = ordered
+            if last is not None:
+                chunk = chunk.where(key < tuple_(*last) if descending else key > tuple_(*last))
+            result = await db.execute(chunk.limit(chunk_size))
+            rows = result.all()
+            await db.commit()
+            if not rows:
+                return
+            yield rows
+            if len(rows) < chunk_size:
+                return
+            last = [rows[-1]._mapping[column.key] for column in sort_columns]
+
+
+def _drain(buffer: io.StringIO) -> str:
+    text = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate(0)
+    return text
+
+
+async def stream_csv(
+    query: Select,
+    sort_columns: Sequence[Any],
+    header: List[str],
+    format_row: Callable[[Row], List],
+    descending: bool = False
+) -> AsyncIterator[str]:
+    """CSV text for ``query``, one chunk of rows at a time, starting with the header."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    yield _drain(buffer)
+
+    async for rows in stream_rows(query, sort_columns, descending=descending):
+        writer.writerows(format_row(row) for row in rows)
+        yield _drain(buffer)
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def ndjson_lines(records: Iterable[dict]) -> str:
+    """Records as newline-delimited JSON, dates in ISO format."""
+    return "".join(
+        json.dumps(record, default=_json_default, separators=(",", ":")) + "\n"
+        for record in records
+    )
+
+
+async def stream_ndjson(
+    query: Select,
+    sort_columns: Sequence[Any],
+    format_row: Callable[[Row], dict],
+    descending: bool = False
+) -> AsyncIterator[str]:
+    """Newline-delimited JSON for ``query``, one object per row, a chunk of rows at a time."""
+    async for rows in stream_rows(query, sort_columns, descending=descending):
+        yield ndjson_lines(format_row(row) for row in rows)
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands over what has been written since the last drain.
+
+    ``tell`` keeps counting across drains, as the Parquet footer records
+    the absolute offset of every column chunk.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def stream_parquet(
+    query: Select,
+    sort_columns: Sequence[Any],
+    schema,
+    format_row: Callable[[Row], dict],
+    row_group_size: int = PARQUET_ROW_GROUP_SIZE,
+    descending: bool = False
+) -> AsyncIterator[bytes]:
+    """Parquet file for ``query`` with the given pyarrow ``schema``, one row group per chunk of rows."""
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression=PARQUET_COMPRESSION)
+    try:
+        async for rows in stream_rows(query, sort_columns, row_group_size, descending):
+            table = pa.Table.from_pylist([format_row(row) for row in rows], schema=schema)
+            writer.write_table(table, row_group_size=len(rows))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
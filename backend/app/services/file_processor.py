@@ -3,17 +3,30 @@ import io
 import uuid
 from typing import List, Dict, AsyncGenerator, Optional
 from datetime import datetime
+from sqlalchemy import update
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.models import UsageRecord, ProcessingBatch
+from app.services.auto_confirm import apply_auto_confirm_rules
+from app.services.batch_stats import BatchStatsCollector
 from app.services.embedding import EmbeddingService
+from app.services.identifiers import normalize_iswc
 from app.services.matching import MatchingService
+from app.services.partitions import create_batch_partitions
+from app.services.progress import FINAL_STAGES, BatchProgress, progress_bus
+from app.core.config import get_settings
+
+settings = get_settings()
+
+WORK_CODE_MAX_LENGTH = UsageRecord.__table__.c.work_code.type.length
 
 EXPECTED_COLUMNS = ["recording_title", "recording_artist", "work_title", "songwriter"]
 COLUMN_ALIASES = {
     "recording_title": ["recording title", "track title", "track", "song title", "song"],
     "recording_artist": ["recording artist", "artist", "performer", "singer"],
     "work_title": ["work title", "composition", "composition title", "title"],
-    "songwriter": ["songwriter", "writer", "composer", "author", "writers", "songwriters"]
+    "songwriter": ["songwriter", "writer", "composer", "author", "writers", "songwriters"],
+    "iswc": ["iswc", "iswc code", "iswc number", "iswc no"],
+    "work_code": ["work code", "work id", "work number", "publisher work code", "song code", "song id"]
 }
 
 
@@ -93,10 +106,19 @@ class FileProcessorService:
             status="pending"
         )
         self.db.add(batch)
+        await create_batch_partitions(self.db, batch.id)
         await self.db.commit()
         await self.db.refresh(batch)
         return batch
 
+    @staticmethod
+    def usable_work_code(value: Optional[str]) -> Optional[str]:
+        """The work code trimmed, or None if it is too long to be one."""
+        value = (value or "").strip()
+        if not value or len(value) > WORK_CODE_MAX_LENGTH:
+            return None
+        return value
+
     async def create_usage_records(
         self,
         batch_id: uuid.UUID,
@@ -112,6 +134,10 @@ class FileProcessorService:
                 recording_artist=record.get("recording_artist"),
                 work_title=record.get("work_title"),
                 songwriter=record.get("songwriter"),
+                # Only well-formed identifiers are kept; the cells as given
+                # stay in original_row_data
+                iswc=normalize_iswc(record.get("iswc")),
+                work_code=self.usable_work_code(record.get("work_code")),
                 original_row_data=record.get("original_data"),
                 row_number=record.get("row_number")
             )
@@ -172,102 +198,116 @@ class FileProcessorService:
         batch.started_at = datetime.utcnow()
         await self.db.commit()
 
-        yield {
-            "stage": "parsed",
-            "batch_id": str(batch.id),
-            "total_records": len(records),
-            "message": f"Found {len(records)} records"
-        }
+        finished = False
+
+        def publish(event: Dict) -> Dict:
+            # Also sent to clients following the batch at /batches/{id}/progress
+            nonlocal finished
+            finished = event["stage"] in FINAL_STAGES
+            progress_bus.publish(batch.id, event)
+            return event
 
         try:
+            yield publish({
+                "stage": "parsed",
+                "batch_id": str(batch.id),
+                "total_records": len(records),
+                "message": f"Found {len(records)} records"
+            })
+
             # Create usage records
-            yield {"stage": "creating_records", "message": "Creating usage records..."}
+            yield publish({"stage": "creating_records", "message": "Creating usage records..."})
             usage_records = await self.create_usage_records(batch.id, records)
 
-            # Generate embeddings
-            yield {"stage": "generating_embeddings", "message": "Generating embeddings..."}
+            # Generate embeddings up front unless matching embeds lazily
+            if not settings.lazy_usage_embeddings:
+                yield publish({"stage": "generating_embeddings", "message": "Generating embeddings..."})
 
-            async def embedding_progress(stage, current, total):
-                pass  # Handled by matching progress
+                async def embedding_progress(stage, current, total):
+                    pass  # Handled by matching progress
 
-            await self.generate_embeddings(usage_records, embedding_progress)
+                await self.generate_embeddings(usage_records, embedding_progress)
 
-            yield {
-                "stage": "embeddings_complete",
-                "message": "Embeddings generated"
-            }
+                yield publish({
+                    "stage": "embeddings_complete",
+                    "message": "Embeddings generated"
+                })
 
             # Run matching
-            yield {"stage": "matching", "message": "Running matching algorithm..."}
+            yield publish({"stage": "matching", "message": "Running matching algorithm..."})
             matching_service = MatchingService(self.db)
 
-            async def match_progress(current, results):
-                yield_data = {
-                    "stage": "matching_progress",
-                    "processed": current,
-                    "total": len(usage_records),
-                    "matched": results["matched"],
-                    "unmatched": results["unmatched"],
-                    "flagged": results["flagged"],
-                    "percentage": round((current / len(usage_records)) * 100, 1)
-                }
-                # This callback can't yield, so we update batch instead
-                batch.processed_records = current
-                batch.matched_records = results["matched"]
-                batch.unmatched_records = results["unmatched"]
-                batch.flagged_records = results["flagged"]
-
-            # Process in smaller batches for progress updates
+            # Counters are kept in memory and written with the matches every
+            # few hundred records or seconds, rather than committed per sub-batch
             batch_size = 10
-            total_results = {"matched": 0, "unmatched": 0, "flagged": 0}
+            progress = BatchProgress(batch.id, len(usage_records))
+            stats = BatchStatsCollector(batch.id)
 
             for i in range(0, len(usage_records), batch_size):
                 sub_batch = usage_records[i:i + batch_size]
-                results = await matching_service.process_batch(sub_batch)
-
-                total_results["matched"] += results["matched"]
-                total_results["unmatched"] += results["unmatched"]
-                total_results["flagged"] += results["flagged"]
-
-                processed = min(i + batch_size, len(usage_records))
-                batch.processed_records = processed
-                batch.matched_records = total_results["matched"]
-                batch.unmatched_records = total_results["unmatched"]
-                batch.flagged_records = total_results["flagged"]
-                await self.db.commit()
-
-                yield {
-                    "stage": "matching_progress",
-                    "processed": processed,
-                    "total": len(usage_records),
-                    "matched": total_results["matched"],
-                    "unmatched": total_results["unmatched"],
-                    "flagged": total_results["flagged"],
-                    "percentage": round((processed / len(usage_records)) * 100, 1)
-                }
+                await matching_service.process_batch(sub_batch, stats=stats, progress=progress)
+
+                event = progress.report()
+                if event is not None:
+                    yield publish(event)
+
+            # Confirm whole classes of matches the configured rules vouch for
+            auto_confirmed = await apply_auto_confirm_rules(
+                self.db, batch.id, settings.auto_confirm_rules
+            )
+            batch.auto_confirmed_records = sum(auto_confirmed.values())
 
             # Complete
+            await progress.flush(self.db)
+            await stats.flush(self.db)
             batch.status = "completed"
             batch.completed_at = datetime.utcnow()
             await self.db.commit()
 
-            yield {
+            # Record counts come from the batch row, which also has the
+            # records auto-confirmation moved from flagged to matched
+            await self.db.refresh(batch)
+            totals = progress.totals
+            yield publish({
                 "stage": "complete",
                 "batch_id": str(batch.id),
                 "total_records": len(usage_records),
-                "matched": total_results["matched"],
-                "unmatched": total_results["unmatched"],
-                "flagged": total_results["flagged"],
+                "matched": batch.matched_records,
+                "unmatched": batch.unmatched_records,
+                "flagged": batch.flagged_records,
+                "embeddings_skipped": totals["embeddings_skipped"],
+                "ai_cache_hits": totals["ai_cache_hits"],
+                "ai_cache_misses": totals["ai_cache_misses"],
+                "ai_reviews_queued": totals["ai_reviews_queued"],
+                "ai_skipped": totals["ai_skipped"],
+                "degraded": totals["degraded"],
+                "auto_confirmed": auto_confirmed,
                 "message": "Processing complete"
-            }
+            })
 
         except Exception as e:
-            batch.status = "failed"
-            batch.error_message = str(e)
-            await self.db.commit()
+            await self.fail_batch(batch.id, str(e))
 
-            yield {
+            yield publish({
                 "stage": "error",
                 "batch_id": str(batch.id),
                 "message": f"Processing failed: {str(e)}"
-            }
+            })
+        finally:
+            if not finished:
+                # The client went away mid-upload (GeneratorExit or
+                # CancelledError): nothing more can be sent to it, but
+                # followers must still see the batch end
+                message = "Upload interrupted before processing finished"
+                publish({"stage": "error", "batch_id": str(batch.id), "message": message})
+                await self.fail_batch(batch.id, message)
+
+    async def fail_batch(self, batch_id: uuid.UUID, message: str) -> None:
+        """Mark a batch failed, discarding whatever its processing left uncommitted."""
+        await self.db.rollback()
+        await self.db.execute(
+            update(ProcessingBatch)
+            .where(ProcessingBatch.id == batch_id)
+            .values(status="failed", error_message=message)
+        )
+        await self.db.commit()
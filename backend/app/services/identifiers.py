@@ -0,0 +1,38 @@
+import re
+from typing import Optional
+
+# Separators allowed in written ISWCs: "T-034.524.680-1", "T 034 524 680 1"
+ISWC_SEPARATOR_RE = re.compile(r'[\s.\-]')
+ISWC_RE = re.compile(r'^T\d{10}$')
+
+
+def normalize_iswc(value: Optional[str]) -> Optional[str]:
+    """Canonical form of an ISWC ("T" followed by ten digits), or None if it isn't shaped like one.
+
+    Mirrors the ``works.iswc_normalized`` generated column.
+    """
+    if not value:
+        return None
+    normalized = ISWC_SEPARATOR_RE.sub('', value).upper()
+    return normalized if ISWC_RE.match(normalized) else None
+
+
+def iswc_check_digit(digits: str) -> int:
+    """Check digit of the nine digit work identifier of an ISWC (ISO 15707)."""
+    total = 1 + sum(position * int(digit) for position, digit in enumerate(digits, start=1))
+    return (10 - total % 10) % 10
+
+
+def valid_iswc(value: Optional[str]) -> Optional[str]:
+    """Normalized ISWC if ``value`` is well formed and its check digit is right, else None."""
+    normalized = normalize_iswc(value)
+    if normalized is None or iswc_check_digit(normalized[1:10]) != int(normalized[10]):
+        return None
+    return normalized
+
+
+def normalize_work_code(value: Optional[str]) -> Optional[str]:
+    """Work codes compare trimmed and case-insensitively, as ``upper(works.work_code)`` is indexed."""
+    if not value or not value.strip():
+        return None
+    return value.strip().upper()
@@ -1,52 +1,85 @@
-import re
-from typing import List, Dict, Optional, Tuple
-from sqlalchemy import text, select
+from typing import List, Dict, Optional, Sequence, Tuple
+from sqlalchemy import text, select, delete, func, or_
 from sqlalchemy.ext.asyncio import AsyncSession
 from rapidfuzz import fuzz
-from app.models import Work, UsageRecord, MatchResult
+from app.models import Work, UsageRecord, MatchResult, AIReviewTask
 from app.services.embedding import EmbeddingService
 from app.services.ollama import OllamaService
+from app.services.verdict_cache import VerdictCache
+from app.services.circuit_breaker import llm_breaker
+from app.services.cascade import Deadline, MatchCascade, MatchContext
+from app.services.normalization import TextFeatures, build_features, normalize_text, work_title_features
+from app.services.minhash import title_index, title_keys
+from app.services.identifiers import normalize_iswc, normalize_work_code, valid_iswc
+from app.services.decisions import load_decisions, usage_fingerprint
+from app.services.batch_stats import BatchStatsCollector
+from app.services.progress import BatchProgress
 from app.core.config import get_settings
 
 settings = get_settings()
 
+WORK_FEATURES_CACHE_SIZE = 50_000
+
 
 class MatchingService:
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, enforce_deadlines: bool = True):
         self.db = db
+        self.enforce_deadlines = enforce_deadlines
         self.embedding_service = EmbeddingService()
         self.ollama_service = OllamaService()
+        self.ai_skipped = 0
+        # Similarity features of each title of a work, by work id, built once per batch
+        self.work_features: Dict[int, Tuple[TextFeatures, ...]] = {}
+        # Shared by every record matched through this service (one per upload)
+        self.batch_deadline = Deadline(settings.batch_deadline_seconds if enforce_deadlines else None)
+        self.verdict_cache = VerdictCache(
+            db,
+            model=self.ollama_service.model,
+            prompt_version=self.ollama_service.prompt_version
+        )
+        self.cascade = MatchCascade(
+            stages={
+                "known": self._run_known_stage,
+                "identifier": self._run_identifier_stage,
+                "exact_key": self._run_exact_key_stage,
+                "minhash": self._run_minhash_stage,
+                "trigram": self._run_trigram_stage,
+                "phonetic": self._run_phonetic_stage,
+                "songwriter": self._run_songwriter_stage,
+                "vector": self._run_vector_stage,
+                "llm": self._run_llm_stage,
+            },
+            scorer=self.score_candidates
+        )
 
     @staticmethod
     def normalize_text(text: str) -> str:
         """Normalize text for matching - lowercase, remove punctuation, collapse whitespace."""
-        if not text:
-            return ""
-        # Convert to lowercase
-        text = text.lower()
-        # Remove punctuation except spaces
-        text = re.sub(r'[^\w\s]', '', text)
-        # Collapse whitespace
-        text = re.sub(r'\s+', ' ', text).strip()
-        return text
+        return normalize_text(text)
 
     @staticmethod
     def calculate_title_similarity(title1: str, title2: str) -> float:
         """Calculate similarity between two titles using multiple methods."""
-        if not title1 or not title2:
-            return 0.0
+        return MatchingService.title_similarity(build_features(title1), build_features(title2))
 
-        norm1 = MatchingService.normalize_text(title1)
-        norm2 = MatchingService.normalize_text(title2)
+    @staticmethod
+    def title_similarity(query: TextFeatures, work: TextFeatures) -> float:
+        """Title similarity between precomputed features."""
+        if not query.title or not work.title:
+            return 0.0
 
-        if norm1 == norm2:
+        if query.title == work.title:
             return 1.0
 
-        # Use multiple fuzzy matching algorithms and take the best
-        ratio = fuzz.ratio(norm1, norm2) / 100
-        partial = fuzz.partial_ratio(norm1, norm2) / 100
-        token_sort = fuzz.token_sort_ratio(norm1, norm2) / 100
-        token_set = fuzz.token_set_ratio(norm1, norm2) / 100
+        # Use multiple fuzzy matching algorithms and take the best. Sorting
+        # tokens up front makes a plain ratio equal to token_sort_ratio.
+        ratio = fuzz.ratio(query.title, work.title) / 100
+        partial = fuzz.partial_ratio(query.title, work.title) / 100
+        token_sort = fuzz.ratio(query.sorted_tokens, work.sorted_tokens) / 100
+        if query.token_set == work.token_set:
+            token_set = 1.0
+        else:
+            token_set = fuzz.token_set_ratio(query.sorted_tokens, work.sorted_tokens) / 100
 
         # Weighted average favoring token-based matches
         return max(ratio, partial * 0.95, token_sort, token_set)
@@ -56,13 +89,19 @@ class MatchingService:
         """Calculate similarity between songwriter strings."""
         if not songwriter1 or not songwriters2:
             return 0.0
+        return MatchingService.songwriter_similarity(
+            normalize_text(songwriter1),
+            [normalize_text(sw) for sw in songwriters2]
+        )
 
-        norm1 = MatchingService.normalize_text(songwriter1)
+    @staticmethod
+    def songwriter_similarity(norm1: str, normalized_songwriters: Sequence[str]) -> float:
+        """Songwriter similarity between a normalized usage songwriter and normalized catalog names."""
+        if not norm1 or not normalized_songwriters:
+            return 0.0
 
         best_score = 0.0
-        for sw in songwriters2:
-            norm2 = MatchingService.normalize_text(sw)
-
+        for norm2 in normalized_songwriters:
             if norm1 == norm2:
                 return 1.0
 
@@ -81,30 +120,254 @@ class MatchingService:
 
         return best_score
 
-    async def find_candidates_by_text(
+    @staticmethod
+    def calculate_confidence(
+        title_sim: float,
+        songwriter_sim: float,
+        vector_sim: Optional[float] = None
+    ) -> float:
+        """Combine similarity scores into a single confidence score.
+
+        Weights are title 40%, songwriter 30%, vector 30%. When no vector
+        similarity is available (the usage row was never embedded), the text
+        weights are rescaled so the score stays on the same 0-1 scale.
+        """
+        if vector_sim is None:
+            confidence = (title_sim * 0.4 + songwriter_sim * 0.3) / 0.7
+        else:
+            confidence = (
+                title_sim * 0.4 +
+                songwriter_sim * 0.3 +
+                vector_sim * 0.3
+            )
+
+        # Boost if both title and songwriter match well
+        if title_sim > 0.8 and songwriter_sim > 0.7:
+            confidence = min(1.0, confidence * 1.1)
+
+        return confidence
+
+    @staticmethod
+    def apply_ai_verdict(
+        match_type: str,
+        confidence: float,
+        ai_result: Optional[Dict]
+    ) -> Tuple[str, float]:
+        """Promote a candidate to ai_matched when the LLM is confident it matches."""
+        if ai_result and ai_result["is_match"] and ai_result["confidence"] > 0.7:
+            return "ai_matched", max(confidence, ai_result["confidence"])
+        return match_type, confidence
+
+    @staticmethod
+    def get_usage_query(usage_record: UsageRecord) -> Tuple[str, str]:
+        """Return the (title, songwriter) pair used to match a usage record."""
+        title = usage_record.work_title or usage_record.recording_title
+        songwriter = usage_record.songwriter or ""
+        return title, songwriter
+
+    @staticmethod
+    def get_usage_identifiers(usage_record: UsageRecord) -> Tuple[Optional[str], Optional[str]]:
+        """Return the normalized (iswc, work_code) of a usage record; None where missing or malformed."""
+        if settings.iswc_verify_check_digit:
+            iswc = valid_iswc(usage_record.iswc)
+        else:
+            iswc = normalize_iswc(usage_record.iswc)
+        return iswc, normalize_work_code(usage_record.work_code)
+
+    @staticmethod
+    def classify_outcome(best_match_type: Optional[str]) -> str:
+        """Batch counter a record falls under given the type of its best match."""
+        if best_match_type is None:
+            return "unmatched"
+        if best_match_type in ["exact", "high_confidence", "ai_matched"]:
+            return "matched"
+        return "flagged"
+
+    @staticmethod
+    def classify_confidence(confidence: float) -> Optional[str]:
+        """Map a confidence score to a match type, or None if it is too low to keep."""
+        if confidence >= settings.exact_match_threshold:
+            return "exact"
+        if confidence >= settings.high_confidence_threshold:
+            return "high_confidence"
+        if confidence >= settings.medium_confidence_threshold:
+            return "medium_confidence"
+        if confidence >= settings.low_confidence_threshold:
+            return "low_confidence"
+        return None
+
+    @staticmethod
+    def is_text_conclusive(ctx: MatchContext) -> bool:
+        """Whether the stages so far found a candidate above the high confidence threshold."""
+        return ctx.best is not None and ctx.best["confidence"] >= settings.high_confidence_threshold
+
+    async def embed_usage_records(
+        self,
+        usage_records: List[UsageRecord],
+        deadline: Optional[Deadline] = None
+    ) -> int:
+        """Generate title embeddings for usage records in one batched request, giving up at ``deadline``."""
+        pending = []
+        texts = []
+        for record in usage_records:
+            title, songwriter = self.get_usage_query(record)
+            if record.title_embedding is not None or not title:
+                continue
+            pending.append(record)
+            texts.append(self.embedding_service.normalize_for_embedding(title, songwriter))
+
+        if not pending:
+            return 0
+
+        embeddings = await self.embedding_service.get_embeddings_batch(texts, deadline)
+
+        generated = 0
+        for record, embedding in zip(pending, embeddings):
+            if embedding:
+                record.title_embedding = embedding
+                generated += 1
+        return generated
+
+    async def load_works(self, work_ids: List[int]) -> Dict[int, Work]:
+        """Works by id, fetched in one query."""
+        if not work_ids:
+            return {}
+        result = await self.db.execute(select(Work).where(Work.id.in_(work_ids)))
+        return {work.id: work for work in result.scalars().all()}
+
+    async def find_candidates_by_identifier(
+        self,
+        iswc: Optional[str],
+        work_code: Optional[str],
+        limit: int = 20
+    ) -> List[Tuple[Work, str]]:
+        """Find works by normalized ISWC or work code (index lookups).
+
+        Returns (work, identifier) pairs, where identifier names the field
+        that matched: "iswc" or "work_code".
+        """
+        conditions = []
+        if iswc:
+            conditions.append(Work.iswc_normalized == iswc)
+        if work_code:
+            conditions.append(func.upper(Work.work_code) == work_code)
+        if not conditions:
+            return []
+
+        result = await self.db.execute(select(Work).where(or_(*conditions)).limit(limit))
+        return [
+            (work, "iswc" if iswc and work.iswc_normalized == iswc else "work_code")
+            for work in result.scalars().all()
+        ]
+
+    async def find_candidates_by_exact_title(
         self,
         title: str,
         songwriter: str,
         limit: int = 20
     ) -> List[Tuple[Work, Dict[str, float]]]:
-        """Find candidate matches using trigram similarity."""
+        """Find works with a primary or alternative title equal to the usage title (btree index lookup)."""
         normalized_title = self.normalize_text(title)
+        if not normalized_title:
+            return []
 
-        # Use PostgreSQL trigram similarity
         query = text("""
-            SELECT w.*,
-                   similarity(w.title_normalized, :title) as title_sim,
+            SELECT w.id,
                    (
                        SELECT MAX(similarity(sw, :songwriter))
                        FROM unnest(w.songwriters_normalized) as sw
                    ) as songwriter_sim
             FROM works w
-            WHERE similarity(w.title_normalized, :title) > 0.3
-               OR w.title_normalized LIKE :title_pattern
-            ORDER BY similarity(w.title_normalized, :title) DESC
+            WHERE w.id IN (
+                SELECT wt.work_id FROM work_titles wt
+                WHERE wt.title_normalized = :title
+            )
             LIMIT :limit
         """)
 
+        result = await self.db.execute(
+            query,
+            {
+                "title": normalized_title,
+                "songwriter": self.normalize_text(songwriter),
+                "limit": limit
+            }
+        )
+        rows = result.fetchall()
+        works = await self.load_works([row.id for row in rows])
+
+        return [
+            (works[row.id], {
+                "title": 1.0,
+                "songwriter": float(row.songwriter_sim or 0)
+            })
+            for row in rows
+            if row.id in works
+        ]
+
+    async def find_candidates_by_minhash(
+        self,
+        title: str,
+        limit: int = 20
+    ) -> List[Work]:
+        """Find works with similar title shingles via the in-process MinHash LSH index.
+
+        The title is looked up both as is and without version suffixes, so
+        "Hotel California (Live)" still reaches "Hotel California", against
+        primary and alternative titles alike.
+        """
+        index = await title_index.get(self.db)
+        best: Dict[int, float] = {}
+        for key in title_keys(title):
+            results = index.query(key, min_similarity=settings.minhash_min_similarity)
+            for work_id, similarity in title_index.work_ids(results):
+                best[work_id] = max(best.get(work_id, 0.0), similarity)
+
+        work_ids = sorted(best, key=best.get, reverse=True)[:limit]
+        if not work_ids:
+            return []
+
+        works = await self.load_works(work_ids)
+        return [works[work_id] for work_id in work_ids if work_id in works]
+
+    async def find_candidates_by_text(
+        self,
+        title: str,
+        songwriter: str,
+        limit: int = 20
+    ) -> List[Tuple[Work, Dict[str, float]]]:
+        """Find candidate matches using trigram similarity.
+
+        Primary and alternative titles are searched together through
+        work_titles; a work scores its best matching title.
+        """
+        normalized_title = self.normalize_text(title)
+
+        # Use PostgreSQL trigram similarity. The % operator is
+        # similarity() > pg_trgm.similarity_threshold (0.3 by default) and,
+        # unlike the function call, can use the trigram index.
+        query = text("""
+            WITH matched AS (
+                SELECT wt.work_id,
+                       MAX(similarity(wt.title_normalized, :title)) as title_sim
+                FROM work_titles wt
+                WHERE wt.title_normalized % :title
+                   OR wt.title_normalized LIKE :title_pattern
+                GROUP BY wt.work_id
+                ORDER BY title_sim DESC
+                LIMIT :limit
+            )
+            SELECT w.id,
+                   m.title_sim,
+                   (
+                       SELECT MAX(similarity(sw, :songwriter))
+                       FROM unnest(w.songwriters_normalized) as sw
+                   ) as songwriter_sim
+            FROM matched m
+            JOIN works w ON w.id = m.work_id
+            ORDER BY m.title_sim DESC
+        """)
+
         result = await self.db.execute(
             query,
             {
@@ -116,16 +379,134 @@ class MatchingService:
         )
         rows = result.fetchall()
 
-        candidates = []
-        for row in rows:
-            work = await self.db.get(Work, row.id)
-            if work:
-                candidates.append((work, {
-                    "title": float(row.title_sim or 0),
-                    "songwriter": float(row.songwriter_sim or 0)
-                }))
+        works = await self.load_works([row.id for row in rows])
+
+        return [
+            (works[row.id], {
+                "title": float(row.title_sim or 0),
+                "songwriter": float(row.songwriter_sim or 0)
+            })
+            for row in rows
+            if row.id in works
+        ]
+
+    async def find_candidates_by_phonetic(
+        self,
+        title: str,
+        surnames: List[str],
+        limit: int = 20
+    ) -> List[Work]:
+        """Find works sharing Double Metaphone codes with the title words or writer surnames.
+
+        Catches misspellings that sound alike ("Macartney", "Beyonce") but
+        fall below the trigram similarity cut-off. Works matching on both
+        title and writer codes rank first, then those sharing the most
+        title codes. Codes found on more than ``phonetic_code_max_works``
+        works are ignored as too common to narrow anything down; each code
+        reads at most one work past that limit.
+        """
+        normalized_title = self.normalize_text(title)
+        if not normalized_title and not surnames:
+            return []
+
+        query = text("""
+            WITH q AS (
+                SELECT phonetic_keys(regexp_split_to_array(:title, '\\s+')) AS title_keys,
+                       phonetic_keys(CAST(:surnames AS TEXT[])) AS writer_keys
+            ),
+            title_hits AS (
+                SELECT k.code, w.id, w.title_normalized
+                FROM q, unnest(q.title_keys) AS k(code)
+                CROSS JOIN LATERAL (
+                    SELECT id, title_normalized FROM works
+                    WHERE title_phonetic @> ARRAY[k.code]
+                    LIMIT :max_works + 1
+                ) w
+            ),
+            writer_hits AS (
+                SELECT k.code, w.id, w.title_normalized
+                FROM q, unnest(q.writer_keys) AS k(code)
+                CROSS JOIN LATERAL (
+                    SELECT id, title_normalized FROM works
+                    WHERE songwriter_phonetic @> ARRAY[k.code]
+                    LIMIT :max_works + 1
+                ) w
+            ),
+            hits AS (
+                SELECT id, title_normalized, 1 AS title_hit, 0 AS writer_hit
+                FROM title_hits
+                WHERE code IN (SELECT code FROM title_hits GROUP BY code HAVING COUNT(*) <= :max_works)
+                UNION ALL
+                SELECT id, title_normalized, 0, 1
+                FROM writer_hits
+                WHERE code IN (SELECT code FROM writer_hits GROUP BY code HAVING COUNT(*) <= :max_works)
+            )
+            SELECT id
+            FROM hits
+            GROUP BY id, title_normalized
+            ORDER BY (SUM(title_hit) > 0 AND SUM(writer_hit) > 0) DESC,
+                     SUM(title_hit) DESC,
+                     similarity(title_normalized, :title) DESC
+            LIMIT :limit
+        """)
+
+        result = await self.db.execute(
+            query,
+            {
+                "title": normalized_title,
+                "surnames": surnames,
+                "max_works": settings.phonetic_code_max_works,
+                "limit": limit
+            }
+        )
+        work_ids = [row.id for row in result.fetchall()]
+        works = await self.load_works(work_ids)
+        return [works[work_id] for work_id in work_ids if work_id in works]
+
+    async def find_candidates_by_songwriter(
+        self,
+        title: str,
+        keys: List[str],
+        limit: int = 20
+    ) -> List[Work]:
+        """Find works credited to any of the given surnames, via the surname index.
+
+        Works sharing the most surnames come first, then the most similar
+        titles. Surnames credited on more than ``songwriter_key_max_works``
+        works are ignored as too common to narrow anything down.
+        """
+        if not keys:
+            return []
+
+        query = text("""
+            WITH usable_keys AS (
+                SELECT surname_key
+                FROM work_songwriter_keys
+                WHERE surname_key = ANY(:keys)
+                GROUP BY surname_key
+                HAVING COUNT(*) <= :max_works
+            )
+            SELECT k.work_id, COUNT(*) as key_hits
+            FROM work_songwriter_keys k
+            JOIN usable_keys USING (surname_key)
+            JOIN works w ON w.id = k.work_id
+            GROUP BY k.work_id, w.title_normalized
+            ORDER BY key_hits DESC, similarity(w.title_normalized, :title) DESC
+            LIMIT :limit
+        """)
 
-        return candidates
+        result = await self.db.execute(
+            query,
+            {
+                "keys": keys,
+                "max_works": settings.songwriter_key_max_works,
+                "title": self.normalize_text(title),
+                "limit": limit
+            }
+        )
+        work_ids = [row.work_id for row in result.fetchall()]
+        works = await self.load_works(work_ids)
+        return [works[work_id] for work_id in work_ids if work_id in works]
 
     async def find_candidates_by_vector(
         self,
@@ -154,166 +535,524 @@ class MatchingService:
         )
         rows = result.fetchall()
 
-        candidates = []
-        for row in rows:
-            work = await self.db.get(Work, row.id)
-            if work:
-                candidates.append((work, float(row.similarity)))
+        works = await self.load_works([row.id for row in rows])
 
-        return candidates
-
-    async def match_usage_record(
-        self,
-        usage_record: UsageRecord
-    ) -> List[MatchResult]:
-        """Match a single usage record against the works database."""
-        title = usage_record.work_title or usage_record.recording_title
-        songwriter = usage_record.songwriter or ""
+        return [(works[row.id], float(row.similarity)) for row in rows if row.id in works]
 
-        # Get candidates from text-based search
-        text_candidates = await self.find_candidates_by_text(title, songwriter)
+    def features_for(self, work: Work) -> Tuple[TextFeatures, ...]:
+        """Similarity features of a candidate work's titles (primary first), built on first use."""
+        features = self.work_features.get(work.id)
+        if features is None:
+            if len(self.work_features) >= WORK_FEATURES_CACHE_SIZE:
+                self.work_features.clear()
+            features = work_title_features(work)
+            self.work_features[work.id] = features
+        return features
 
-        # Get candidates from vector search
-        vector_candidates = await self.find_candidates_by_vector(usage_record)
+    def create_context(
+        self,
+        usage_record: UsageRecord,
+        deadline: Optional[Deadline] = None
+    ) -> MatchContext:
+        """Start a cascade run for a usage record.
 
-        # Merge candidates
-        work_scores: Dict[int, Dict] = {}
+        The record must finish by ``deadline`` (default: the per-record
+        deadline from now) and by the batch deadline, whichever comes first.
+        """
+        title, songwriter = self.get_usage_query(usage_record)
+        iswc, work_code = self.get_usage_identifiers(usage_record)
+        if deadline is None and self.enforce_deadlines:
+            deadline = Deadline(settings.record_deadline_seconds)
+        return MatchContext(
+            usage_record,
+            title,
+            songwriter,
+            deadline=Deadline.earliest(deadline, self.batch_deadline),
+            iswc=iswc,
+            work_code=work_code,
+            fingerprint=usage_fingerprint(usage_record)
+        )
 
-        for work, scores in text_candidates:
-            work_scores[work.id] = {
+    @staticmethod
+    def add_candidate(
+        ctx: MatchContext,
+        work: Work,
+        title_sim: float,
+        songwriter_sim: float
+    ) -> Dict:
+        """Add a candidate to the context, keeping the best scores seen for each work."""
+        candidate = ctx.candidates.get(work.id)
+        if candidate is None:
+            candidate = {
                 "work": work,
-                "title_sim": scores["title"],
-                "songwriter_sim": scores["songwriter"],
-                "vector_sim": 0.0
+                "title_sim": title_sim,
+                "songwriter_sim": songwriter_sim,
+                "vector_sim": None,
+                "ai_result": None,
+                "ai_pending": False,
+                "identifier": None,  # "iswc" or "work_code" when found by identifier
+                "known": False  # Confirmed by a reviewer for this usage line before
             }
+            ctx.candidates[work.id] = candidate
+        else:
+            candidate["title_sim"] = max(candidate["title_sim"], title_sim)
+            candidate["songwriter_sim"] = max(candidate["songwriter_sim"], songwriter_sim)
+        return candidate
+
+    def score_candidates(self, ctx: MatchContext) -> None:
+        """Score and classify every candidate in the context, best first."""
+        scored = []
+        for work_id, candidate in ctx.candidates.items():
+            if ctx.decisions and ctx.decisions.get(work_id) is False:
+                continue  # Rejected by a reviewer for this usage line
+            confidence = self.calculate_confidence(
+                candidate["title_sim"],
+                candidate["songwriter_sim"],
+                candidate["vector_sim"]
+            )
+            if candidate["known"] or (
+                candidate["identifier"] is not None
+                and candidate["title_sim"] >= settings.identifier_min_title_similarity
+            ):
+                # Confirmed before, or same ISWC / work code and a title that agrees
+                confidence = 1.0
+            match_type = self.classify_confidence(confidence)
+            if match_type is None:
+                continue  # Skip low confidence matches
+
+            if candidate["ai_result"] is not None:
+                match_type, confidence = self.apply_ai_verdict(
+                    match_type, confidence, candidate["ai_result"]
+                )
+            elif candidate["ai_pending"] and match_type == "medium_confidence":
+                match_type = "pending_ai"
+
+            scored.append({**candidate, "confidence": confidence, "match_type": match_type})
+
+        scored.sort(key=lambda c: c["confidence"], reverse=True)
+        ctx.scored = scored
+
+    async def load_known_decisions(self, contexts: List[MatchContext]) -> None:
+        """Fetch reviewer decisions for every context still ahead of the known stage in one query."""
+        pending = [ctx for ctx in contexts if ctx.decisions is None and self.cascade.is_pending(ctx, "known")]
+        if not pending:
+            return
+        decisions = await load_decisions(self.db, [ctx.fingerprint for ctx in pending])
+        for ctx in pending:
+            ctx.decisions = decisions.get(ctx.fingerprint, {})
+
+    async def _run_known_stage(self, ctx: MatchContext) -> None:
+        """Reviewer decisions on this usage line: confirmed works decide it, rejected ones are dropped."""
+        if ctx.decisions is None:
+            await self.load_known_decisions([ctx])
+        confirmed = [work_id for work_id, is_confirmed in ctx.decisions.items() if is_confirmed]
+        if not confirmed:
+            return
+        result = await self.db.execute(select(Work).where(Work.id.in_(confirmed)))
+        for work in result.scalars().all():
+            self.add_scored_candidate(ctx, work)["known"] = True
+
+    async def _run_identifier_stage(self, ctx: MatchContext) -> None:
+        """ISWC / work code lookup, scored in Python so a mismatched title can't ride on a typo'd code."""
+        if not ctx.iswc and not ctx.work_code:
+            return
+        for work, identifier in await self.find_candidates_by_identifier(ctx.iswc, ctx.work_code):
+            candidate = self.add_scored_candidate(ctx, work)
+            candidate["identifier"] = identifier
+
+    async def _run_exact_key_stage(self, ctx: MatchContext) -> None:
+        """Exact normalized title lookup."""
+        for work, scores in await self.find_candidates_by_exact_title(ctx.title, ctx.songwriter):
+            self.add_candidate(ctx, work, scores["title"], scores["songwriter"])
+
+    async def _run_minhash_stage(self, ctx: MatchContext) -> None:
+        """MinHash LSH lookup on title shingles, scored in Python."""
+        for work in await self.find_candidates_by_minhash(ctx.title):
+            self.add_scored_candidate(ctx, work)
+
+    async def _run_trigram_stage(self, ctx: MatchContext) -> None:
+        """Trigram similarity search on titles."""
+        for work, scores in await self.find_candidates_by_text(ctx.title, ctx.songwriter):
+            self.add_candidate(ctx, work, scores["title"], scores["songwriter"])
+
+    def add_scored_candidate(self, ctx: MatchContext, work: Work) -> Dict:
+        """Add a candidate found without SQL scores, scoring it in Python."""
+        titles = self.features_for(work)
+        return self.add_candidate(
+            ctx,
+            work,
+            max(self.title_similarity(ctx.features, title) for title in titles),
+            self.score_songwriters(ctx, titles[0])
+        )
+
+    def score_songwriters(self, ctx: MatchContext, features: TextFeatures) -> float:
+        """Songwriter similarity of a candidate, crediting composite fields name by name.
+
+        "Jimmy Page, Robert Plant" compared as one string scores poorly
+        against ["Page, Jimmy", "Plant, Robert"]; compared per parsed name
+        and averaged it matches fully. The better of the two is used.
+        """
+        score = self.songwriter_similarity(normalize_text(ctx.songwriter), features.songwriters)
+        if len(ctx.songwriter_names) > 1:
+            per_name = sum(
+                self.songwriter_similarity(parsed.name, features.songwriters)
+                for parsed in ctx.songwriter_names
+            ) / len(ctx.songwriter_names)
+            score = max(score, per_name)
+        return score
+
+    async def _run_phonetic_stage(self, ctx: MatchContext) -> None:
+        """Phonetic (Double Metaphone) blocking on title words and writer surnames."""
+        surnames = sorted({key for parsed in ctx.songwriter_names for key in parsed.surname_keys})
+        for work in await self.find_candidates_by_phonetic(ctx.title, surnames):
+            self.add_scored_candidate(ctx, work)
+
+    async def _run_songwriter_stage(self, ctx: MatchContext) -> None:
+        """Candidates credited to the usage songwriters' surnames, whatever their title."""
+        keys = sorted({key for parsed in ctx.songwriter_names for key in parsed.surname_keys})
+        for work in await self.find_candidates_by_songwriter(ctx.title, keys):
+            self.add_scored_candidate(ctx, work)
+
+    async def _run_vector_stage(self, ctx: MatchContext) -> None:
+        """Vector similarity search, with fuzzy scoring of vector-only candidates."""
+        usage_record = ctx.usage_record
+        if usage_record.title_embedding is None and not ctx.embedding_requested:
+            ctx.embedding_requested = True
+            await self.embed_usage_records([usage_record], ctx.deadline)
+
+        if usage_record.title_embedding is None:
+            return
+
+        vector_candidates = await self.find_candidates_by_vector(usage_record)
+
+        # Text candidates the vector search didn't return score zero on it
+        for candidate in ctx.candidates.values():
+            if candidate["vector_sim"] is None:
+                candidate["vector_sim"] = 0.0
 
         for work, vector_sim in vector_candidates:
-            if work.id in work_scores:
-                work_scores[work.id]["vector_sim"] = vector_sim
-            else:
-                work_scores[work.id] = {
-                    "work": work,
-                    "title_sim": self.calculate_title_similarity(title, work.title),
-                    "songwriter_sim": self.calculate_songwriter_similarity(songwriter, work.songwriters),
-                    "vector_sim": vector_sim
-                }
+            if work.id not in ctx.candidates:
+                # Fuzzy scoring of new candidates is optional work
+                if ctx.deadline.expired():
+                    ctx.degraded = True
+                    continue
+                self.add_scored_candidate(ctx, work)
+            ctx.candidates[work.id]["vector_sim"] = vector_sim
 
-        # Score and classify candidates
-        matches = []
-        ambiguous_candidates = []
+    def llm_budget_exhausted(self) -> bool:
+        """Whether this service has used up the per-batch LLM call or time budget."""
+        if settings.ai_max_calls_per_batch and self.ollama_service.calls >= settings.ai_max_calls_per_batch:
+            return True
+        if settings.ai_max_seconds_per_batch and self.ollama_service.call_seconds >= settings.ai_max_seconds_per_batch:
+            return True
+        return False
 
-        for work_id, data in work_scores.items():
-            work = data["work"]
-            title_sim = data["title_sim"]
-            songwriter_sim = data["songwriter_sim"]
-            vector_sim = data["vector_sim"]
+    async def _run_llm_stage(self, ctx: MatchContext) -> None:
+        """Ask the LLM about medium confidence candidates."""
+        await self.adjudicate([ctx])
 
-            # Calculate combined confidence score
-            # Weight: title 40%, songwriter 30%, vector 30%
-            confidence = (
-                title_sim * 0.4 +
-                songwriter_sim * 0.3 +
-                vector_sim * 0.3
+    async def adjudicate(self, contexts: List[MatchContext]) -> None:
+        """Get LLM verdicts for the ambiguous candidates of several records at once.
+
+        Cached verdicts are applied directly; the rest go to the model in as
+        few prompts as the ranking mode allows. Candidates that already have
+        a verdict are left alone, so calling this ahead of the llm stage
+        makes the stage itself a no-op.
+
+        With ``ai_review_async`` the model is not called here: uncached
+        candidates are marked ``pending_ai`` and queued by ``process_batch``
+        for the review workers.
+        """
+        if not settings.use_ai_for_ambiguous:
+            return
+
+        wanted = []
+        for ctx in contexts:
+            usage_key = self.verdict_cache.make_usage_key(
+                self.normalize_text(ctx.title),
+                self.normalize_text(ctx.songwriter)
             )
+            # Only candidates that can survive the retention cut are worth a verdict
+            ambiguous = [
+                c for c in self.retained_candidates(ctx) if c["match_type"] == "medium_confidence"
+            ]
+            for scored in ambiguous[:settings.ai_batch_size]:
+                candidate = ctx.candidates[scored["work"].id]
+                if candidate["ai_result"] is None and not candidate["ai_pending"]:
+                    wanted.append((ctx, usage_key, scored))
 
-            # Boost if both title and songwriter match well
-            if title_sim > 0.8 and songwriter_sim > 0.7:
-                confidence = min(1.0, confidence * 1.1)
-
-            # Determine match type
-            if confidence >= settings.exact_match_threshold:
-                match_type = "exact"
-            elif confidence >= settings.high_confidence_threshold:
-                match_type = "high_confidence"
-            elif confidence >= settings.medium_confidence_threshold:
-                match_type = "medium_confidence"
-                # Add to ambiguous for AI review
-                if settings.use_ai_for_ambiguous:
-                    ambiguous_candidates.append({
-                        "work": work,
-                        "confidence": confidence,
-                        "title_sim": title_sim,
-                        "songwriter_sim": songwriter_sim,
-                        "vector_sim": vector_sim
-                    })
-            elif confidence >= settings.low_confidence_threshold:
-                match_type = "low_confidence"
+        cached = await self.verdict_cache.get_many(
+            [(usage_key, scored["work"]) for _, usage_key, scored in wanted]
+        )
+        pending = []
+        for ctx, usage_key, scored in wanted:
+            work = scored["work"]
+            if (usage_key, work.id) in cached:
+                ctx.candidates[work.id]["ai_result"] = cached[(usage_key, work.id)]
             else:
-                continue  # Skip low confidence matches
+                pending.append((ctx, usage_key, scored))
 
-            match = MatchResult(
-                usage_record_id=usage_record.id,
-                work_id=work.id,
-                confidence_score=round(confidence, 4),
-                match_type=match_type,
-                title_similarity=round(title_sim, 4),
-                songwriter_similarity=round(songwriter_sim, 4),
-                vector_similarity=round(vector_sim, 4)
-            )
-            matches.append(match)
-
-        # Use AI to review ambiguous matches
-        if ambiguous_candidates and settings.use_ai_for_ambiguous:
-            for candidate in ambiguous_candidates[:settings.ai_batch_size]:
-                work = candidate["work"]
-                ai_result = await self.ollama_service.reason_about_match(
-                    usage_title=title,
-                    usage_songwriter=songwriter,
-                    work_title=work.title,
-                    work_songwriters=work.songwriters,
-                    similarity_scores={
-                        "title": candidate["title_sim"],
-                        "songwriter": candidate["songwriter_sim"],
-                        "vector": candidate["vector_sim"]
-                    }
-                )
+        if not pending:
+            return
 
-                # Update match with AI reasoning
-                for match in matches:
-                    if match.work_id == work.id:
-                        if ai_result["is_match"] and ai_result["confidence"] > 0.7:
-                            match.match_type = "ai_matched"
-                            match.confidence_score = max(
-                                float(match.confidence_score),
-                                ai_result["confidence"]
-                            )
-                        match.ai_reasoning = ai_result["reasoning"]
-                        break
+        if settings.ai_review_async:
+            for ctx, _, scored in pending:
+                ctx.candidates[scored["work"].id]["ai_pending"] = True
+            return
+
+        # Ollama degraded or this batch's LLM budget spent: keep the
+        # deterministic classification
+        if not llm_breaker.available or self.llm_budget_exhausted():
+            self.ai_skipped += len(pending)
+            return
+
+        deadline = Deadline.earliest(*(ctx.deadline for ctx, _, _ in pending))
+        verdicts = await self.ollama_service.analyze_batch_matches([
+            {
+                "usage_record_id": ctx.usage_record.id,
+                "usage_title": ctx.title,
+                "usage_songwriter": ctx.songwriter,
+                "work_id": scored["work"].id,
+                "work_title": scored["work"].title,
+                "work_songwriters": scored["work"].songwriters,
+                "similarity_scores": {
+                    "title": scored["title_sim"],
+                    "songwriter": scored["songwriter_sim"],
+                    "vector": scored["vector_sim"]
+                }
+            }
+            for ctx, _, scored in pending
+        ], deadline)
+
+        for (ctx, usage_key, scored), verdict in zip(pending, verdicts):
+            work = scored["work"]
+            ai_result = {
+                key: verdict[key]
+                for key in ("is_match", "confidence", "reasoning", "error")
+                if key in verdict
+            }
+            ctx.candidates[work.id]["ai_result"] = ai_result
+            if ai_result.get("error") and deadline.expired():
+                # Cut short by the deadline rather than refused by the model
+                ctx.degraded = True
+            await self.verdict_cache.put(usage_key, work, ai_result)
+
+    @staticmethod
+    def set_best_match(usage_record: UsageRecord, match: Optional[MatchResult]) -> None:
+        """Point the usage record at its best match. The match must have an id."""
+        usage_record.best_match_id = match.id if match is not None else None
+        usage_record.best_confidence = match.confidence_score if match is not None else None
+
+    @staticmethod
+    def retained_candidates(ctx: MatchContext) -> List[Dict]:
+        """The scored candidates kept as matches: the top ``max_matches_per_record``, best first."""
+        if settings.max_matches_per_record > 0:
+            return ctx.scored[:settings.max_matches_per_record]
+        return ctx.scored
 
+    def finish_context(self, ctx: MatchContext) -> List[MatchResult]:
+        """Turn the top scored candidates of a finished cascade run into match results."""
+        usage_record = ctx.usage_record
+        usage_record.match_stage = ctx.decided_by
+        usage_record.is_degraded = ctx.degraded
+
+        matches = []
+        for scored in self.retained_candidates(ctx):
+            vector_sim = scored["vector_sim"]
+            ai_result = scored["ai_result"]
+            matches.append(MatchResult(
+                usage_record_id=usage_record.id,
+                batch_id=usage_record.batch_id,
+                work_id=scored["work"].id,
+                confidence_score=round(scored["confidence"], 4),
+                match_type=scored["match_type"],
+                title_similarity=round(scored["title_sim"], 4),
+                songwriter_similarity=round(scored["songwriter_sim"], 4),
+                vector_similarity=round(vector_sim, 4) if vector_sim is not None else None,
+                ai_reasoning=ai_result["reasoning"] if ai_result else None,
+                is_confirmed=scored["known"]
+            ))
         return matches
 
+    async def match_usage_record(
+        self,
+        usage_record: UsageRecord
+    ) -> List[MatchResult]:
+        """Match a single usage record against the works database."""
+        ctx = self.create_context(usage_record)
+        await self.cascade.run(ctx)
+        return self.finish_context(ctx)
+
     async def process_batch(
         self,
         usage_records: List[UsageRecord],
-        progress_callback=None
+        progress_callback=None,
+        stats: Optional[BatchStatsCollector] = None,
+        progress: Optional[BatchProgress] = None,
+        previous: Optional[Dict] = None
     ) -> Dict:
-        """Process a batch of usage records."""
+        """Process a batch of usage records.
+
+        With ``stats`` the matches and cascade runs are counted into it, and
+        with ``progress`` the results; each is flushed with the batch's
+        writes once its interval has passed. ``previous`` counters, from
+        records that had been matched before, are subtracted from the results.
+        """
         results = {
             "matched": 0,
             "unmatched": 0,
             "flagged": 0,
+            "embeddings_skipped": 0,
+            "ai_cache_hits": 0,
+            "ai_cache_misses": 0,
+            "ai_reviews_queued": 0,
+            "ai_skipped": 0,
+            "ai_calls": 0,
+            "ai_seconds": 0.0,
+            "degraded": 0,
             "total": len(usage_records)
         }
+        cache_hits_before = self.verdict_cache.hits
+        cache_misses_before = self.verdict_cache.misses
+        ai_skipped_before = self.ai_skipped
+        ai_calls_before = self.ollama_service.calls
+        ai_seconds_before = self.ollama_service.call_seconds
+
+        # Stages run sub-batch wide, so the records share their time budget
+        deadline = None
+        if settings.record_deadline_seconds and self.enforce_deadlines:
+            deadline = Deadline(settings.record_deadline_seconds * len(usage_records))
+        contexts = [self.create_context(record, deadline) for record in usage_records]
+        await self.load_known_decisions(contexts)
 
-        for i, record in enumerate(usage_records):
-            matches = await self.match_usage_record(record)
+        # In lazy mode run the stages cheaper than vector search for the whole
+        # sub-batch first, then embed only the records that are still
+        # undecided in a single batched request.
+        if settings.lazy_usage_embeddings and "vector" in self.cascade.order:
+            needs_embedding = []
+            embedding_deadlines = []
+            for ctx in contexts:
+                await self.cascade.run(ctx, until="vector")
+                if ctx.usage_record.title_embedding is not None:
+                    continue
+                if not self.cascade.is_pending(ctx, "vector") or self.is_text_conclusive(ctx):
+                    # Text already found a high confidence match, even if
+                    # its runner-up is too close for the cascade to stop
+                    if self.cascade.is_pending(ctx, "vector"):
+                        ctx.skipped_stages.append("vector")
+                    results["embeddings_skipped"] += 1
+                elif not self.cascade.skip_if_late(ctx, "vector"):
+                    # Records out of time are counted as degraded instead
+                    ctx.embedding_requested = True
+                    needs_embedding.append(ctx.usage_record)
+                    embedding_deadlines.append(ctx.deadline)
+            await self.embed_usage_records(needs_embedding, Deadline.earliest(*embedding_deadlines))
+
+        # Likewise collect the ambiguous candidates of the whole sub-batch
+        # so the LLM sees them in as few prompts as possible.
+        if "llm" in self.cascade.order:
+            for ctx in contexts:
+                await self.cascade.run(ctx, until="llm")
+            await self.adjudicate([
+                ctx for ctx in contexts
+                if not self.cascade.skip_if_late(ctx, "llm") and self.cascade.is_pending(ctx, "llm")
+            ])
+
+        pending_reviews = []
+        best_matches = []
+        for i, ctx in enumerate(contexts):
+            await self.cascade.run(ctx)
+            matches = self.finish_context(ctx)
+            if ctx.degraded:
+                results["degraded"] += 1
+            if stats is not None:
+                stats.add_context(ctx)
+                for match in matches:
+                    stats.add_match(match.match_type, match.confidence_score)
 
             if matches:
                 # Save all matches
                 for match in matches:
                     self.db.add(match)
+                    if match.match_type == "pending_ai":
+                        pending_reviews.append((match, ctx.usage_record))
 
                 best_match = max(matches, key=lambda m: float(m.confidence_score))
-
-                if best_match.match_type in ["exact", "high_confidence", "ai_matched"]:
-                    results["matched"] += 1
-                else:
-                    results["flagged"] += 1
             else:
-                results["unmatched"] += 1
+                best_match = None
+            outcome = self.classify_outcome(best_match.match_type if best_match else None)
+            ctx.usage_record.match_status = outcome
+            results[outcome] += 1
+            best_matches.append((ctx.usage_record, best_match))
 
             if progress_callback:
                 await progress_callback(i + 1, results)
 
+        # Best-match pointers and review tasks need match ids
+        await self.db.flush()
+        for usage_record, best_match in best_matches:
+            self.set_best_match(usage_record, best_match)
+
+        # Queue deferred LLM reviews
+        if pending_reviews:
+            for match, usage_record in pending_reviews:
+                self.db.add(AIReviewTask(
+                    match_result_id=match.id,
+                    usage_record_id=usage_record.id,
+                    batch_id=usage_record.batch_id
+                ))
+        results["ai_reviews_queued"] = len(pending_reviews)
+
+        results["ai_skipped"] = self.ai_skipped - ai_skipped_before
+        results["ai_calls"] = self.ollama_service.calls - ai_calls_before
+        results["ai_seconds"] = self.ollama_service.call_seconds - ai_seconds_before
+        results["ai_cache_hits"] = self.verdict_cache.hits - cache_hits_before
+        results["ai_cache_misses"] = self.verdict_cache.misses - cache_misses_before
+        for key, count in (previous or {}).items():
+            results[key] -= count
+
+        if stats is not None and stats.due():
+            await stats.flush(self.db)
+        if progress is not None:
+            progress.add(results)
+            if progress.due():
+                await progress.flush(self.db)
         await self.db.commit()
         return results
+
+    async def rematch_records(
+        self,
+        usage_records: List[UsageRecord],
+        stats: Optional[BatchStatsCollector] = None,
+        progress: Optional[BatchProgress] = None
+    ) -> Dict:
+        """Discard the matches of already matched records and match them again.
+
+        Used to re-run degraded records once there is time. Returns the
+        ``process_batch`` counters as changes against the records' previous
+        outcome; ``progress`` adds them to the batch totals in the same
+        transaction as the new matches.
+        """
+        record_ids = [record.id for record in usage_records]
+        # The records were already counted as processed
+        previous = {"matched": 0, "flagged": 0, "unmatched": 0, "total": len(usage_records)}
+        for record in usage_records:
+            previous[record.match_status or "unmatched"] += 1
+        previous["degraded"] = sum(1 for record in usage_records if record.is_degraded)
+
+        # Queued AI reviews go with their matches (ON DELETE CASCADE)
+        deleted = await self.db.execute(
+            delete(MatchResult)
+            .where(
+                MatchResult.batch_id.in_({record.batch_id for record in usage_records}),
+                MatchResult.usage_record_id.in_(record_ids)
+            )
+            .returning(MatchResult.match_type, MatchResult.confidence_score)
+        )
+        if stats is not None:
+            for match_type, confidence in deleted.all():
+                stats.remove_match(match_type, confidence)
+            for record in usage_records:
+                stats.remove_decision(record.match_stage)
+
+        return await self.process_batch(usage_records, stats=stats, progress=progress, previous=previous)
@@ -0,0 +1,211 @@
+import asyncio
+import time
+import zlib
+from typing import Dict, Hashable, List, Optional, Set, Tuple
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import Work
+from app.services.normalization import normalize_text, strip_version_suffix
+from app.core.config import get_settings
+
+settings = get_settings()
+
+MERSENNE_PRIME = (1 << 31) - 1
+SHINGLE_SIZE = 3
+BUILD_CHUNK_SIZE = 5000
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> Set[str]:
+    """Character n-grams of a normalized title, padded so short words still shingle."""
+    if not text:
+        return set()
+    padded = f" {text} "
+    if len(padded) <= size:
+        return {padded}
+    return {padded[i:i + size] for i in range(len(padded) - size + 1)}
+
+
+class MinHashLSH:
+    """In-memory MinHash index with banded locality sensitive hashing.
+
+    Each text is reduced to ``num_perm`` min-hashes of its character
+    shingles; the signature is cut into ``bands`` bands and texts sharing
+    any band land in the same bucket. A query only looks at its own
+    buckets, so lookups don't grow with the catalog, and pairs with a
+    Jaccard similarity above roughly ``(1 / bands) ** (1 / rows)`` are found
+    with high probability.
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, MERSENNE_PRIME, size=num_perm, dtype=np.int64)
+        self._b = rng.randint(0, MERSENNE_PRIME, size=num_perm, dtype=np.int64)
+
+        self.buckets: List[Dict[bytes, Set[Hashable]]] = [{} for _ in range(bands)]
+        self.signatures: Dict[Hashable, np.ndarray] = {}
+        self.built_at: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self.signatures)
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """MinHash signature of a normalized text, or None if it has no shingles."""
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode("utf-8")) for s in shingles(text)), dtype=np.int64
+        )
+        if not hashes.size:
+            return None
+        # (a * h + b) mod p for every permutation and shingle; fits in int64
+        # because a < 2^31 and h < 2^32
+        permuted = (np.outer(hashes, self._a) + self._b) % MERSENNE_PRIME
+        return permuted.min(axis=0).astype(np.uint32)
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [
+            signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            for band in range(self.bands)
+        ]
+
+    def add(self, key: Hashable, text: str) -> None:
+        """Index ``text`` under ``key``, replacing any previous entry for the key."""
+        if key in self.signatures:
+            self.remove(key)
+        signature = self.signature(text)
+        if signature is None:
+            return
+        self.signatures[key] = signature
+        for buckets, band_key in zip(self.buckets, self._band_keys(signature)):
+            buckets.setdefault(band_key, set()).add(key)
+
+    def remove(self, key: Hashable) -> None:
+        signature = self.signatures.pop(key, None)
+        if signature is None:
+            return
+        for buckets, band_key in zip(self.buckets, self._band_keys(signature)):
+            bucket = buckets.get(band_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del buckets[band_key]
+
+    def query(
+        self,
+        text: str,
+        limit: Optional[int] = None,
+        min_similarity: float = 0.0
+    ) -> List[Tuple[Hashable, float]]:
+        """Keys sharing a band with ``text``, with estimated Jaccard similarity, best first."""
+        signature = self.signature(text)
+        if signature is None:
+            return []
+
+        candidates: Set[Hashable] = set()
+        for buckets, band_key in zip(self.buckets, self._band_keys(signature)):
+            candidates.update(buckets.get(band_key, ()))
+
+        scored = []
+        for key in candidates:
+            similarity = float(np.mean(self.signatures[key] == signature))
+            if similarity >= min_similarity:
+                scored.append((key, similarity))
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return scored[:limit] if limit else scored
+
+
+def title_keys(title: Optional[str]) -> List[str]:
+    """Normalized forms of a raw title worth indexing or querying: as is and without version suffix."""
+    keys = []
+    for variant in (title, strip_version_suffix(title)):
+        normalized = normalize_text(variant)
+        if normalized and normalized not in keys:
+            keys.append(normalized)
+    return keys
+
+
+def work_title_texts(title: Optional[str], alternative_titles: Optional[List[str]]) -> List[str]:
+    """Normalized texts to index for a work: each of its titles without version suffix."""
+    texts = []
+    for raw in [title, *(alternative_titles or ())]:
+        keys = title_keys(raw)
+        if keys and keys[-1] not in texts:
+            texts.append(keys[-1])
+    return texts
+
+
+class TitleIndex:
+    """Process-wide MinHash index of work titles, built lazily from the works table.
+
+    Each title of a work (primary and alternative) is indexed under the key
+    ``(work_id, n)``; ``work_ids`` maps query results back to works.
+    """
+
+    def __init__(self):
+        self.index: Optional[MinHashLSH] = None
+        self._lock = asyncio.Lock()
+
+    def _is_stale(self) -> bool:
+        if self.index is None:
+            return True
+        max_age = settings.minhash_refresh_seconds
+        return bool(max_age) and time.monotonic() - self.index.built_at > max_age
+
+    async def get(self, db: AsyncSession) -> MinHashLSH:
+        """The current index, (re)building it first if missing or older than the refresh interval."""
+        if self._is_stale():
+            async with self._lock:
+                if self._is_stale():
+                    self.index = await self.build(db)
+        return self.index
+
+    @staticmethod
+    async def build(db: AsyncSession) -> MinHashLSH:
+        index = MinHashLSH(num_perm=settings.minhash_num_perm, bands=settings.minhash_bands)
+        last_id = 0
+        while True:
+            result = await db.execute(
+                select(Work.id, Work.title, Work.alternative_titles)
+                .where(Work.id > last_id)
+                .order_by(Work.id)
+                .limit(BUILD_CHUNK_SIZE)
+            )
+            rows = result.all()
+            if not rows:
+                break
+            for work_id, title, alternative_titles in rows:
+                # Titles are indexed without version suffixes; they are rare
+                # in the catalog but shouldn't hide the work
+                for n, text in enumerate(work_title_texts(title, alternative_titles)):
+                    index.add((work_id, n), text)
+            last_id = rows[-1].id
+            # Let other requests run between chunks of a large catalog
+            await asyncio.sleep(0)
+        index.built_at = time.monotonic()
+        return index
+
+    @staticmethod
+    def work_ids(results: List[Tuple[Hashable, float]]) -> List[Tuple[int, float]]:
+        """Collapse ``(work_id, n)`` query results to the best similarity per work."""
+        best: Dict[int, float] = {}
+        for (work_id, _), similarity in results:
+            best[work_id] = max(best.get(work_id, 0.0), similarity)
+        return sorted(best.items(), key=lambda item: item[1], reverse=True)
+
+    def add_work(self, work: Work) -> None:
+        """Index a new or changed work if the index has been built."""
+        if self.index is None:
+            return
+        stale = [key for key in self.index.signatures if key[0] == work.id]
+        for key in stale:
+            self.index.remove(key)
+        for n, text in enumerate(work_title_texts(work.title, work.alternative_titles)):
+            self.index.add((work.id, n), text)
+
+
+title_index = TitleIndex()
@@ -0,0 +1,90 @@
+import re
+from functools import lru_cache
+from typing import FrozenSet, Iterable, NamedTuple, Optional, Tuple
+
+PUNCTUATION_RE = re.compile(r'[^\w\s]')
+WHITESPACE_RE = re.compile(r'\s+')
+# "(Live)", "[Remastered 2011]", " - Live at Wembley", " feat. Sia"
+VERSION_SUFFIX_RE = re.compile(
+    r'\s*[(\[][^)\]]*[)\]]|\s+-\s+.*$|\s+(?:feat\.?|ft\.?|featuring)\s+.*$',
+    re.IGNORECASE
+)
+
+
+@lru_cache(maxsize=65536)
+def _normalize(text: str) -> str:
+    text = text.lower()
+    text = PUNCTUATION_RE.sub('', text)
+    return WHITESPACE_RE.sub(' ', text).strip()
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """Normalize text for matching - lowercase, remove punctuation, collapse whitespace.
+
+    Results are memoized, so repeated titles and songwriter names within
+    and across batches are only normalized once.
+    """
+    if not text:
+        return ""
+    return _normalize(text)
+
+
+def strip_version_suffix(title: Optional[str]) -> str:
+    """Drop version and featuring suffixes from a raw title: "Hotel California (Live)" -> "Hotel California"."""
+    if not title:
+        return ""
+    return VERSION_SUFFIX_RE.sub('', title).strip()
+
+
+class TextFeatures(NamedTuple):
+    """Precomputed forms of a title and its songwriters used by the similarity functions."""
+    title: str  # Normalized title
+    sorted_tokens: str  # Title tokens sorted and joined, as token_sort_ratio compares them
+    token_set: FrozenSet[str]
+    songwriters: Tuple[str, ...]  # Normalized songwriter names
+
+
+def build_features(
+    title: Optional[str],
+    songwriters: Iterable[str] = (),
+    normalized: bool = False
+) -> TextFeatures:
+    """Build features from a title and songwriters.
+
+    With ``normalized`` the inputs are taken as already normalized (e.g.
+    ``works.title_normalized``) and only trimmed.
+    """
+    if normalized:
+        norm_title = (title or "").strip()
+        norm_songwriters = tuple(sw.strip() for sw in songwriters if sw and sw.strip())
+    else:
+        norm_title = normalize_text(title)
+        norm_songwriters = tuple(n for n in (normalize_text(sw) for sw in songwriters) if n)
+
+    tokens = norm_title.split()
+    return TextFeatures(
+        title=norm_title,
+        sorted_tokens=" ".join(sorted(tokens)),
+        token_set=frozenset(tokens),
+        songwriters=norm_songwriters
+    )
+
+
+def work_features(work) -> TextFeatures:
+    """Features of a catalog work from its stored normalized columns."""
+    if work.title_normalized is not None and work.songwriters_normalized is not None:
+        return build_features(work.title_normalized, work.songwriters_normalized, normalized=True)
+    return build_features(work.title, work.songwriters or ())
+
+
+def work_title_features(work) -> Tuple[TextFeatures, ...]:
+    """Features for each title of a work: the primary title first, then its alternative titles."""
+    primary = work_features(work)
+    titles = [primary]
+    seen = {primary.title}
+    for alternative in work.alternative_titles or ():
+        features = build_features(alternative)._replace(songwriters=primary.songwriters)
+        if features.title and features.title not in seen:
+            seen.add(features.title)
+            titles.append(features)
+    return tuple(titles)
@@ -1,15 +1,64 @@
+import asyncio
+import hashlib
 import httpx
 import json
+import time
 from typing import Dict, List, Optional
 from app.core.config import get_settings
+from app.services.cascade import Deadline, DeadlineExceeded
+from app.services.circuit_breaker import llm_breaker
 
 settings = get_settings()
 
+MATCH_PROMPT_TEMPLATE = """You are an expert at matching music works. Analyze if these two entries refer to the same musical work.
+
+USAGE FILE ENTRY:
+- Title: "{usage_title}"
+- Songwriter: "{usage_songwriter}"
+
+DATABASE WORK:
+- Title: "{work_title}"
+- Songwriters: {work_songwriters}
+
+SIMILARITY SCORES:
+- Title similarity: {title_sim:.2%}
+- Songwriter similarity: {songwriter_sim:.2%}{vector_line}
+
+Consider:
+1. Title variations (abbreviations, punctuation, "the", etc.)
+2. Songwriter name variations (initials, order, spelling)
+3. Common music industry data entry patterns
+
+Respond with ONLY valid JSON in this exact format:
+{{"is_match": true/false, "confidence": 0.0-1.0, "reasoning": "brief explanation"}}"""
+
+# Changes whenever the prompt wording changes, so cached verdicts from an
+# older prompt are never reused.
+PROMPT_VERSION = hashlib.sha256(MATCH_PROMPT_TEMPLATE.encode("utf-8")).hexdigest()[:16]
+
+RANKING_PROMPT_TEMPLATE = """You are an expert at matching music works. For each usage file entry below, decide which of its candidate database works refer to the same musical work.
+
+{entries}
+
+Consider:
+1. Title variations (abbreviations, punctuation, "the", etc.)
+2. Songwriter name variations (initials, order, spelling)
+3. Common music industry data entry patterns
+
+Give a verdict for every candidate of every entry. Respond with ONLY valid JSON in this exact format:
+{{"entries": [{{"entry": 1, "verdicts": [{{"candidate": 1, "is_match": true/false, "confidence": 0.0-1.0, "reasoning": "brief explanation"}}]}}]}}"""
+
+RANKING_PROMPT_VERSION = hashlib.sha256(RANKING_PROMPT_TEMPLATE.encode("utf-8")).hexdigest()[:16]
+
 
 class OllamaService:
     def __init__(self):
         self.ollama_host = settings.ollama_host
         self.model = settings.ollama_model
+        self.ranking_mode = settings.ai_ranking_mode
+        # LLM usage by this instance, used for per-batch budgets
+        self.calls = 0
+        self.call_seconds = 0.0
 
     async def check_connection(self) -> bool:
         """Check if Ollama is available."""
@@ -33,103 +82,312 @@ class OllamaService:
             print(f"Error pulling model: {e}")
             return False
 
-    async def reason_about_match(
-        self,
-        usage_title: str,
-        usage_songwriter: str,
-        work_title: str,
-        work_songwriters: List[str],
-        similarity_scores: Dict[str, float]
-    ) -> Dict:
-        """Use LLM to reason about whether two works match."""
-
-        prompt = f"""You are an expert at matching music works. Analyze if these two entries refer to the same musical work.
+    @property
+    def prompt_version(self) -> str:
+        """Version of the prompt verdicts are currently produced with."""
+        return RANKING_PROMPT_VERSION if self.ranking_mode else PROMPT_VERSION
 
-USAGE FILE ENTRY:
-- Title: "{usage_title}"
-- Songwriter: "{usage_songwriter}"
-
-DATABASE WORK:
-- Title: "{work_title}"
-- Songwriters: {', '.join(work_songwriters)}
+    async def _generate(
+        self,
+        prompt: str,
+        num_predict: int = 200,
+        num_ctx: Optional[int] = None,
+        deadline: Optional[Deadline] = None
+    ) -> str:
+        """Run a single non-streaming generation and return the response text.
 
-SIMILARITY SCORES:
-- Title similarity: {similarity_scores.get('title', 0):.2%}
-- Songwriter similarity: {similarity_scores.get('songwriter', 0):.2%}
-- Vector similarity: {similarity_scores.get('vector', 0):.2%}
+        Waits at most ``llm_timeout_seconds``, or until ``deadline`` if that
+        comes sooner, and raises DeadlineExceeded without calling Ollama
+        once the deadline has passed. A call timed out by the deadline
+        rather than by the configured timeout says nothing about Ollama's
+        health, so the breaker doesn't count it as a failure.
+        """
+        deadline = deadline or Deadline()
+        if deadline.expired():
+            raise DeadlineExceeded("No time left for an LLM call")
 
-Consider:
-1. Title variations (abbreviations, punctuation, "the", etc.)
-2. Songwriter name variations (initials, order, spelling)
-3. Common music industry data entry patterns
+        options = {
+            "temperature": 0.1,
+            "num_predict": num_predict
+        }
+        if num_ctx:
+            options["num_ctx"] = num_ctx
 
-Respond with ONLY valid JSON in this exact format:
-{{"is_match": true/false, "confidence": 0.0-1.0, "reasoning": "brief explanation"}}"""
+        # Raises CircuitOpenError without touching the network while Ollama is degraded
+        llm_breaker.check()
 
+        timeout = deadline.timeout(settings.llm_timeout_seconds)
+        started = time.monotonic()
         try:
-            async with httpx.AsyncClient(timeout=120.0) as client:
+            async with httpx.AsyncClient(timeout=timeout) as client:
                 response = await client.post(
                     f"{self.ollama_host}/api/generate",
                     json={
                         "model": self.model,
                         "prompt": prompt,
                         "stream": False,
-                        "options": {
-                            "temperature": 0.1,
-                            "num_predict": 200
-                        }
+                        "options": options
                     }
                 )
                 response.raise_for_status()
                 data = response.json()
-                response_text = data.get("response", "").strip()
-
-                # Try to parse JSON from response
-                try:
-                    # Find JSON in response
-                    start = response_text.find("{")
-                    end = response_text.rfind("}") + 1
-                    if start >= 0 and end > start:
-                        json_str = response_text[start:end]
-                        result = json.loads(json_str)
-                        return {
-                            "is_match": result.get("is_match", False),
-                            "confidence": float(result.get("confidence", 0)),
-                            "reasoning": result.get("reasoning", "")
-                        }
-                except json.JSONDecodeError:
-                    pass
-
-                return {
-                    "is_match": False,
-                    "confidence": 0,
-                    "reasoning": f"Failed to parse AI response: {response_text[:100]}"
-                }
+        except asyncio.CancelledError:
+            llm_breaker.release()
+            raise
+        except httpx.TimeoutException:
+            if timeout < settings.llm_timeout_seconds:
+                llm_breaker.release()
+            else:
+                llm_breaker.record_failure()
+            raise
+        except Exception:
+            llm_breaker.record_failure()
+            raise
+        finally:
+            self.calls += 1
+            self.call_seconds += time.monotonic() - started
+
+        llm_breaker.record_success(time.monotonic() - started)
+        return data.get("response", "").strip()
+
+    @staticmethod
+    def _extract_json(response_text: str) -> Optional[Dict]:
+        """Find and parse the outermost JSON object in a model response."""
+        start = response_text.find("{")
+        end = response_text.rfind("}") + 1
+        if start >= 0 and end > start:
+            try:
+                return json.loads(response_text[start:end])
+            except json.JSONDecodeError:
+                return None
+        return None
 
+    @staticmethod
+    def _verdict(result: Dict) -> Dict:
+        return {
+            "is_match": bool(result.get("is_match", False)),
+            "confidence": float(result.get("confidence", 0) or 0),
+            "reasoning": result.get("reasoning", "")
+        }
+
+    async def reason_about_match(
+        self,
+        usage_title: str,
+        usage_songwriter: str,
+        work_title: str,
+        work_songwriters: List[str],
+        similarity_scores: Dict[str, float],
+        deadline: Optional[Deadline] = None
+    ) -> Dict:
+        """Use LLM to reason about whether two works match."""
+        vector_sim = similarity_scores.get('vector')
+        vector_line = (
+            f"\n- Vector similarity: {vector_sim:.2%}" if vector_sim is not None else ""
+        )
+
+        prompt = MATCH_PROMPT_TEMPLATE.format(
+            usage_title=usage_title,
+            usage_songwriter=usage_songwriter,
+            work_title=work_title,
+            work_songwriters=', '.join(work_songwriters),
+            title_sim=similarity_scores.get('title', 0),
+            songwriter_sim=similarity_scores.get('songwriter', 0),
+            vector_line=vector_line
+        )
+
+        try:
+            response_text = await self._generate(prompt, deadline=deadline)
         except Exception as e:
             return {
                 "is_match": False,
                 "confidence": 0,
-                "reasoning": f"AI matching error: {str(e)}"
+                "reasoning": f"AI matching error: {str(e)}",
+                "error": True
             }
 
+        try:
+            result = self._extract_json(response_text)
+            if result is not None:
+                return self._verdict(result)
+        except (TypeError, ValueError):
+            pass
+
+        return {
+            "is_match": False,
+            "confidence": 0,
+            "reasoning": f"Failed to parse AI response: {response_text[:100]}",
+            "error": True
+        }
+
+    @staticmethod
+    def render_ranking_entry(number: int, entry: Dict) -> str:
+        """Render one usage entry and its candidate works for the ranking prompt."""
+        lines = [
+            f"ENTRY {number}:",
+            f"- Title: \"{entry['usage_title']}\"",
+            f"- Songwriter: \"{entry['usage_songwriter']}\"",
+            "CANDIDATES:"
+        ]
+        for i, candidate in enumerate(entry["candidates"], start=1):
+            scores = candidate["similarity_scores"]
+            line = (
+                f"  [{i}] Title: \"{candidate['work_title']}\""
+                f" | Songwriters: {', '.join(candidate['work_songwriters'])}"
+                f" | Title similarity: {scores.get('title', 0):.2%}"
+                f" | Songwriter similarity: {scores.get('songwriter', 0):.2%}"
+            )
+            if scores.get("vector") is not None:
+                line += f" | Vector similarity: {scores['vector']:.2%}"
+            lines.append(line)
+        return "\n".join(lines)
+
+    @staticmethod
+    def estimate_tokens(text: str) -> int:
+        """Rough token count (about four characters per token for English text)."""
+        return len(text) // 4 + 1
+
+    async def rank_candidates(
+        self,
+        entries: List[Dict],
+        deadline: Optional[Deadline] = None
+    ) -> List[List[Dict]]:
+        """Ask for verdicts on every candidate of several usage entries in one prompt.
+
+        Each entry is ``{"usage_title", "usage_songwriter", "candidates": [...]}``
+        where candidates carry ``work_title``, ``work_songwriters`` and
+        ``similarity_scores``. Returns, per entry, a list of verdicts in
+        candidate order. Candidates the model left out, or every candidate
+        if the prompt failed, get an error verdict.
+        """
+        prompt = RANKING_PROMPT_TEMPLATE.format(
+            entries="\n\n".join(
+                self.render_ranking_entry(i, entry) for i, entry in enumerate(entries, start=1)
+            )
+        )
+        candidate_count = sum(len(entry["candidates"]) for entry in entries)
+        num_predict = min(4096, 80 * candidate_count + 50)
+
+        verdicts: List[List[Optional[Dict]]] = [
+            [None] * len(entry["candidates"]) for entry in entries
+        ]
+        try:
+            response_text = await self._generate(
+                prompt,
+                num_predict=num_predict,
+                num_ctx=self.estimate_tokens(prompt) + num_predict + 64,
+                deadline=deadline
+            )
+        except Exception as e:
+            print(f"AI ranking error: {e}")
+            return self._fill_unresolved(verdicts, f"AI ranking error: {str(e)}")
+
+        result = self._extract_json(response_text) or {}
+        for entry_result in result.get("entries") or []:
+            try:
+                entry_index = int(entry_result.get("entry")) - 1
+                if not 0 <= entry_index < len(entries):
+                    continue
+                for verdict in entry_result.get("verdicts") or []:
+                    candidate_index = int(verdict.get("candidate")) - 1
+                    if 0 <= candidate_index < len(entries[entry_index]["candidates"]):
+                        verdicts[entry_index][candidate_index] = self._verdict(verdict)
+            except (AttributeError, TypeError, ValueError):
+                continue
+
+        return self._fill_unresolved(verdicts, "No verdict in AI ranking response")
+
+    @staticmethod
+    def _fill_unresolved(verdicts: List[List[Optional[Dict]]], reason: str) -> List[List[Dict]]:
+        """Give every candidate without a verdict an error verdict carrying ``reason``."""
+        return [
+            [
+                verdict if verdict is not None else {
+                    "is_match": False,
+                    "confidence": 0,
+                    "reasoning": reason,
+                    "error": True
+                }
+                for verdict in entry_verdicts
+            ]
+            for entry_verdicts in verdicts
+        ]
+
+    def pack_ranking_entries(self, entries: List[Dict]) -> List[List[int]]:
+        """Group entry indexes into prompts that stay within the prompt token budget."""
+        overhead = self.estimate_tokens(RANKING_PROMPT_TEMPLATE.format(entries=""))
+        budget = settings.ai_prompt_token_budget
+
+        packs: List[List[int]] = []
+        current: List[int] = []
+        used = overhead
+        for i, entry in enumerate(entries):
+            cost = self.estimate_tokens(self.render_ranking_entry(len(current) + 1, entry)) + 1
+            if current and used + cost > budget:
+                packs.append(current)
+                current = []
+                used = overhead
+            current.append(i)
+            used += cost
+        if current:
+            packs.append(current)
+        return packs
+
     async def analyze_batch_matches(
         self,
-        candidates: List[Dict]
+        candidates: List[Dict],
+        deadline: Optional[Deadline] = None
     ) -> List[Dict]:
-        """Analyze multiple potential matches at once."""
-        results = []
-        for candidate in candidates:
-            result = await self.reason_about_match(
-                usage_title=candidate["usage_title"],
-                usage_songwriter=candidate["usage_songwriter"],
-                work_title=candidate["work_title"],
-                work_songwriters=candidate["work_songwriters"],
-                similarity_scores=candidate["similarity_scores"]
-            )
-            results.append({
+        """Analyze multiple potential matches at once.
+
+        In ranking mode candidates are grouped by usage record, every
+        candidate of a record goes into one prompt and records are packed
+        into prompts up to ``ai_prompt_token_budget``. Candidates the model
+        skipped, or whose prompt failed, come back as error verdicts rather
+        than costing a prompt each, so one bad response can't multiply the
+        calls made against the breaker and the batch budget; queued reviews
+        retry them. Otherwise each candidate gets a prompt of its own.
+        Prompts are cut short at ``deadline``, and those it leaves no time
+        for are not sent. Results are returned in input order.
+        """
+        results: List[Optional[Dict]] = [None] * len(candidates)
+
+        if self.ranking_mode:
+            # Group candidate indexes by usage record, keeping first-seen order
+            groups: Dict[object, List[int]] = {}
+            for i, candidate in enumerate(candidates):
+                groups.setdefault(candidate["usage_record_id"], []).append(i)
+            group_indexes = list(groups.values())
+
+            entries = [
+                {
+                    "usage_title": candidates[indexes[0]]["usage_title"],
+                    "usage_songwriter": candidates[indexes[0]]["usage_songwriter"],
+                    "candidates": [candidates[i] for i in indexes]
+                }
+                for indexes in group_indexes
+            ]
+
+            for pack in self.pack_ranking_entries(entries):
+                verdicts = await self.rank_candidates([entries[i] for i in pack], deadline)
+                for entry_number, entry_verdicts in zip(pack, verdicts):
+                    for candidate_index, verdict in zip(group_indexes[entry_number], entry_verdicts):
+                        results[candidate_index] = verdict
+
+        for i, candidate in enumerate(candidates):
+            result = results[i]
+            if result is None:
+                # Single-candidate mode
+                result = await self.reason_about_match(
+                    usage_title=candidate["usage_title"],
+                    usage_songwriter=candidate["usage_songwriter"],
+                    work_title=candidate["work_title"],
+                    work_songwriters=candidate["work_songwriters"],
+                    similarity_scores=candidate["similarity_scores"],
+                    deadline=deadline
+                )
+            results[i] = {
                 "usage_record_id": candidate["usage_record_id"],
                 "work_id": candidate["work_id"],
                 **result
-            })
+            }
         return results
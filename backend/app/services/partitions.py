@@ -0,0 +1,49 @@
+import asyncio
+from uuid import UUID
+from sqlalchemy import func, select
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import get_settings
+
+settings = get_settings()
+
+# usage_records and match_results are partitioned by batch; the SQL
+# functions called here are defined in 017_partition_by_batch.sql.
+#
+# Creating or detaching a partition takes an ACCESS EXCLUSIVE lock on the
+# parent table, so it waits for every open transaction that has read it,
+# and every query arriving after it waits in turn. The application keeps
+# those transactions short: exports and archives read a chunk per
+# transaction (exports.stream_rows) and AI reviews commit before asking
+# the LLM. A lock_timeout makes DDL stuck behind a longer one (an ad-hoc
+# query, say) give up instead of stalling every query queued after it,
+# and it is retried here.
+
+LOCK_NOT_AVAILABLE = "55P03"
+
+
+def _lock_timed_out(error: DBAPIError) -> bool:
+    return getattr(error.orig, "sqlstate", None) == LOCK_NOT_AVAILABLE
+
+
+async def _call_with_lock_retry(db: AsyncSession, statement) -> None:
+    """Run partition DDL in a savepoint, retrying after a pause when it times out on a lock."""
+    for attempt in range(settings.partition_lock_retries + 1):
+        try:
+            async with db.begin_nested():
+                await db.execute(statement)
+            return
+        except DBAPIError as e:
+            if not _lock_timed_out(e) or attempt == settings.partition_lock_retries:
+                raise
+        await asyncio.sleep(settings.partition_lock_retry_seconds * (attempt + 1))
+
+
+async def create_batch_partitions(db: AsyncSession, batch_id: UUID) -> None:
+    """Create the partitions a batch's usage records and matches are written to."""
+    await _call_with_lock_retry(db, select(func.create_batch_partitions(batch_id)))
+
+
+async def drop_batch_partitions(db: AsyncSession, batch_id: UUID) -> None:
+    """Drop a batch's partitions, and with them all its usage records, matches and queued AI reviews."""
+    await _call_with_lock_retry(db, select(func.drop_batch_partitions(batch_id)))
@@ -0,0 +1,163 @@
+import asyncio
+import time
+from typing import AsyncIterator, Dict, Optional, Set
+from uuid import UUID
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import ProcessingBatch
+from app.core.config import get_settings
+
+settings = get_settings()
+
+# process_batch result key -> processing_batches counter column
+BATCH_COUNTERS = {
+    "matched": "matched_records",
+    "unmatched": "unmatched_records",
+    "flagged": "flagged_records",
+    "embeddings_skipped": "embeddings_skipped",
+    "ai_cache_hits": "ai_cache_hits",
+    "ai_cache_misses": "ai_cache_misses",
+    "ai_reviews_queued": "ai_reviews_queued",
+    "ai_skipped": "ai_skipped",
+    "ai_calls": "ai_calls",
+    "ai_seconds": "ai_seconds",
+    "degraded": "degraded_records",
+}
+
+# Stages after which a batch sends no more progress
+FINAL_STAGES = ("complete", "error")
+
+# Events held for a subscriber that isn't reading; older progress is dropped first
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+class BatchProgress:
+    """Matching counters of a batch being processed, kept in memory.
+
+    ``flush`` adds what was counted since the last flush to the
+    ``processing_batches`` row in the caller's transaction, so progress is
+    written with the matches it describes instead of in commits of its
+    own. A flush is due every ``progress_flush_rows`` records or
+    ``progress_flush_seconds``, whichever comes first.
+    """
+
+    def __init__(
+        self,
+        batch_id: UUID,
+        total: int,
+        flush_seconds: Optional[float] = None,
+        flush_rows: Optional[int] = None
+    ):
+        self.batch_id = batch_id
+        self.total = total
+        self.flush_seconds = settings.progress_flush_seconds if flush_seconds is None else flush_seconds
+        self.flush_rows = settings.progress_flush_rows if flush_rows is None else flush_rows
+        self.totals: Dict[str, float] = {key: 0 for key in BATCH_COUNTERS}
+        self.pending: Dict[str, float] = dict(self.totals)
+        self.processed = 0
+        self.flushed_processed = 0
+        self.reported_processed = 0
+        self.flushed_at = time.monotonic()
+
+    def add(self, results: Dict) -> None:
+        """Count the results of one ``process_batch`` call."""
+        for key in BATCH_COUNTERS:
+            self.totals[key] += results[key]
+            self.pending[key] += results[key]
+        self.processed += results["total"]
+
+    def due(self) -> bool:
+        return (
+            self.processed - self.flushed_processed >= self.flush_rows
+            or time.monotonic() - self.flushed_at >= self.flush_seconds
+        )
+
+    async def flush(self, db: AsyncSession) -> None:
+        """Add the counts gathered since the last flush to the batch, in the caller's transaction.
+
+        Rematching adds changes to counters without processing new
+        records, so ``processed_records`` is only written when it moved.
+        """
+        if self.processed != self.flushed_processed or any(self.pending.values()):
+            # Incremented in SQL rather than overwritten because AI review
+            # workers adjust the same counters concurrently
+            values = {
+                column: getattr(ProcessingBatch, column) + self.pending[key]
+                for key, column in BATCH_COUNTERS.items()
+            }
+            if self.processed != self.flushed_processed:
+                values["processed_records"] = self.processed
+            await db.execute(
+                update(ProcessingBatch)
+                .where(ProcessingBatch.id == self.batch_id)
+                .values(**values)
+            )
+            self.pending = {key: 0 for key in BATCH_COUNTERS}
+            self.flushed_processed = self.processed
+        self.flushed_at = time.monotonic()
+
+    def report(self) -> Optional[Dict]:
+        """A progress event for the last flush, if it hasn't been reported yet."""
+        if self.flushed_processed == self.reported_processed:
+            return None
+        self.reported_processed = self.flushed_processed
+        return {
+            "stage": "matching_progress",
+            "batch_id": str(self.batch_id),
+            "processed": self.flushed_processed,
+            "total": self.total,
+            "matched": self.totals["matched"],
+            "unmatched": self.totals["unmatched"],
+            "flagged": self.totals["flagged"],
+            "percentage": round((self.flushed_processed / self.total) * 100, 1) if self.total else 100.0
+        }
+
+
+class ProgressBus:
+    """In-process fan-out of batch progress events to any number of subscribers.
+
+    The last event of each batch is kept so that a subscriber joining
+    mid-batch starts from the current state. A subscriber that falls
+    behind loses its oldest events rather than holding up processing;
+    as progress events carry running totals, the latest one is enough.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[UUID, Set[asyncio.Queue]] = {}
+        self._latest: Dict[UUID, Dict] = {}
+
+    def active(self, batch_id: UUID) -> bool:
+        """Whether this process is publishing progress for the batch."""
+        return batch_id in self._latest
+
+    def publish(self, batch_id: UUID, event: Dict) -> None:
+        if event.get("stage") in FINAL_STAGES:
+            self._latest.pop(batch_id, None)
+        else:
+            self._latest[batch_id] = event
+        for queue in self._subscribers.get(batch_id, ()):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    async def subscribe(self, batch_id: UUID) -> AsyncIterator[Dict]:
+        """Events of a batch from now until it completes or fails."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        if batch_id in self._latest:
+            queue.put_nowait(self._latest[batch_id])
+        self._subscribers.setdefault(batch_id, set()).add(queue)
+        try:
+            while True:
+                event = await queue.get()
+                yield event
+                if event.get("stage") in FINAL_STAGES:
+                    return
+        finally:
+            subscribers = self._subscribers.get(batch_id)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[batch_id]
+
+
+progress_bus = ProgressBus()
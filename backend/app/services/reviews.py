@@ -0,0 +1,82 @@
+from collections import Counter
+from typing import Dict, Iterable, Tuple
+from uuid import UUID
+from sqlalchemy import text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import ProcessingBatch
+from app.services.progress import BATCH_COUNTERS
+
+# Recompute the best match and status of the given usage records from their
+# matches: rejected matches are passed over and a confirmed one wins. The
+# status follows MatchingService.classify_outcome, except that a confirmed
+# match always counts as matched. The usage_records joined as "old" are
+# read before the update, so each row returns its status before and after.
+REFRESH_STATUS_SQL = text("""
+    WITH records AS (
+        SELECT * FROM unnest(CAST(:batch_ids AS UUID[]), CAST(:record_ids AS INTEGER[])) AS r(batch_id, id)
+    ),
+    best AS (
+        SELECT DISTINCT ON (m.batch_id, m.usage_record_id)
+               m.batch_id, m.usage_record_id, m.id, m.confidence_score,
+               CASE
+                   WHEN m.is_confirmed OR m.match_type IN ('exact', 'high_confidence', 'ai_matched') THEN 'matched'
+                   ELSE 'flagged'
+               END AS status
+        FROM match_results m
+        JOIN records r ON r.batch_id = m.batch_id AND r.id = m.usage_record_id
+        WHERE m.is_rejected IS NOT TRUE
+        ORDER BY m.batch_id, m.usage_record_id, m.is_confirmed IS TRUE DESC, m.confidence_score DESC, m.id
+    )
+    UPDATE usage_records u
+    SET best_match_id = best.id,
+        best_confidence = best.confidence_score,
+        match_status = COALESCE(best.status, 'unmatched')
+    FROM records r
+    JOIN usage_records old ON old.batch_id = r.batch_id AND old.id = r.id
+    LEFT JOIN best ON best.batch_id = r.batch_id AND best.usage_record_id = r.id
+    WHERE u.batch_id = r.batch_id AND u.id = r.id
+    RETURNING u.batch_id, old.match_status AS old_status, u.match_status AS new_status
+""")
+
+
+async def refresh_match_status(db: AsyncSession, records: Iterable[Tuple[UUID, int]]) -> Dict[str, int]:
+    """Bring reviewed usage records and their batch counters in step with their matches.
+
+    ``records`` are (batch_id, usage_record_id) pairs whose matches were
+    confirmed or rejected, in the caller's transaction. Returns the net
+    change per status, e.g. {"flagged": -2, "matched": 2}.
+    """
+    records = sorted(set(records))
+    if not records:
+        return {}
+
+    result = await db.execute(
+        REFRESH_STATUS_SQL,
+        {
+            "batch_ids": [batch_id for batch_id, _ in records],
+            "record_ids": [record_id for _, record_id in records]
+        }
+    )
+    moves: Dict[UUID, Counter] = {}
+    for batch_id, old_status, new_status in result.all():
+        if old_status != new_status:
+            counter = moves.setdefault(batch_id, Counter())
+            counter[old_status] -= 1
+            counter[new_status] += 1
+
+    # Incremented in SQL, as matching and AI review workers adjust the same counters
+    total: Counter = Counter()
+    for batch_id, counter in moves.items():
+        changes = {status: change for status, change in counter.items() if change}
+        if not changes:
+            continue
+        await db.execute(
+            update(ProcessingBatch)
+            .where(ProcessingBatch.id == batch_id)
+            .values(**{
+                BATCH_COUNTERS[status]: getattr(ProcessingBatch, BATCH_COUNTERS[status]) + change
+                for status, change in changes.items()
+            })
+        )
+        total.update(changes)
+    return {status: change for status, change in total.items() if change}
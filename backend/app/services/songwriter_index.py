@@ -0,0 +1,31 @@
+from typing import Tuple
+from sqlalchemy import select, delete, func, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import WorkSongwriterKey
+
+
+async def rebuild_songwriter_index(db: AsyncSession) -> Tuple[int, int]:
+    """Recompute the surname index for the whole catalog.
+
+    A trigger on works keeps the index current (009_songwriter_keys.sql);
+    this repairs it after loads that bypass triggers. Keys come from the same
+    songwriter_surname_keys() SQL function. Returns (works indexed, keys written).
+    """
+    await db.execute(delete(WorkSongwriterKey))
+    await db.execute(text(
+        "INSERT INTO work_songwriter_keys (surname_key, work_id) "
+        "SELECT key, w.id FROM works w, unnest(songwriter_surname_keys(w.songwriters)) AS key "
+        "ON CONFLICT DO NOTHING"
+    ))
+    result = await db.execute(
+        select(func.count(func.distinct(WorkSongwriterKey.work_id)), func.count())
+        .select_from(WorkSongwriterKey)
+    )
+    works_indexed, keys_written = result.one()
+    await db.commit()
+    return works_indexed, keys_written
+
+
+async def count_indexed_works(db: AsyncSession) -> int:
+    result = await db.execute(select(func.count(func.distinct(WorkSongwriterKey.work_id))))
+    return result.scalar() or 0
@@ -0,0 +1,84 @@
+import re
+from typing import FrozenSet, Iterable, List, NamedTuple, Optional, Set
+from app.services.normalization import normalize_text
+
+# Separators that always delimit names in a composite credit
+NAME_SEPARATOR_RE = re.compile(
+    r'\s*[/;&+|]\s*|\s+(?:and|feat\.?|ft\.?|featuring)\s+',
+    re.IGNORECASE
+)
+SUFFIXES = {"jr", "sr", "ii", "iii", "iv"}
+MIN_KEY_LENGTH = 2
+
+
+class ParsedName(NamedTuple):
+    name: str  # Normalized, given name(s) first
+    surname_keys: FrozenSet[str]
+
+
+def _split_commas(part: str) -> List[str]:
+    """Split a comma separated credit into names, reordering "Surname, Given" pairs."""
+    pieces = [p.strip() for p in part.split(",") if p.strip()]
+    if len(pieces) < 2:
+        return pieces
+
+    # "McCartney, Paul" / "Page, Jimmy Lee"
+    if len(pieces) == 2 and len(pieces[0].split()) == 1:
+        return [f"{pieces[1]} {pieces[0]}"]
+
+    # "Lennon, John, McCartney, Paul"
+    if len(pieces) % 2 == 0 and all(len(p.split()) == 1 for p in pieces):
+        return [f"{pieces[i + 1]} {pieces[i]}" for i in range(0, len(pieces), 2)]
+
+    # "Jimmy Page, Robert Plant"
+    return pieces
+
+
+def split_songwriters(raw: Optional[str]) -> List[str]:
+    """Split a composite songwriter field into individual (raw) names."""
+    if not raw:
+        return []
+    names = []
+    for part in NAME_SEPARATOR_RE.split(raw):
+        if part and part.strip():
+            names.extend(_split_commas(part))
+    return names
+
+
+def parse_name(name: str) -> Optional[ParsedName]:
+    """Normalize a single name and extract its surname keys.
+
+    The surname is the last word that isn't a suffix such as "Jr". Double
+    barrelled surnames ("Lennon-McCartney") also yield a key per part.
+    """
+    words = [w for w in name.split() if normalize_text(w) not in SUFFIXES]
+    normalized = normalize_text(" ".join(words))
+    if not normalized:
+        return None
+
+    surname = words[-1]
+    keys = {normalize_text(surname)}
+    keys.update(normalize_text(part) for part in surname.split("-"))
+    return ParsedName(
+        name=normalized,
+        surname_keys=frozenset(k for k in keys if len(k) >= MIN_KEY_LENGTH)
+    )
+
+
+def parse_songwriters(raw: Optional[str]) -> List[ParsedName]:
+    """Parse a songwriter field into individual names with surname keys."""
+    parsed = (parse_name(name) for name in split_songwriters(raw))
+    return [p for p in parsed if p is not None]
+
+
+def surname_keys(songwriters: Iterable[str]) -> Set[str]:
+    """All surname keys of a list of songwriter credits (e.g. ``works.songwriters``).
+
+    The work side of the index is built in SQL by songwriter_surname_keys()
+    (009_songwriter_keys.sql), which must stay in step with this parser.
+    """
+    keys: Set[str] = set()
+    for songwriter in songwriters or ():
+        for parsed in parse_songwriters(songwriter):
+            keys.update(parsed.surname_keys)
+    return keys
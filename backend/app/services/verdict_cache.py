@@ -0,0 +1,110 @@
+import hashlib
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Sequence, Tuple
+from sqlalchemy import select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import AIVerdict, Work
+from app.services.ollama import PROMPT_VERSION
+from app.core.config import get_settings
+
+settings = get_settings()
+
+
+class VerdictCache:
+    """Persistent cache of LLM verdicts keyed by usage text, work, model and prompt version."""
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        model: Optional[str] = None,
+        prompt_version: Optional[str] = None
+    ):
+        self.db = db
+        self.model = model or settings.ollama_model
+        self.prompt_version = prompt_version or PROMPT_VERSION
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_usage_key(normalized_title: str, normalized_songwriter: str) -> str:
+        """Hash the normalized usage title and songwriter into a fixed-size key."""
+        raw = f"{normalized_title}\x1f{normalized_songwriter}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def work_fingerprint(work: Work) -> str:
+        """Hash the work title and songwriters, the parts of a work a verdict depends on."""
+        raw = "\x1f".join([work.title or "", *(work.songwriters or [])])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _is_fresh(self, verdict: AIVerdict, work: Work) -> bool:
+        """A verdict is stale once it outlives the TTL or the work's title or songwriters have changed."""
+        if settings.ai_cache_ttl_days > 0 and verdict.created_at is not None:
+            expires_at = verdict.created_at + timedelta(days=settings.ai_cache_ttl_days)
+            if expires_at < datetime.utcnow():
+                return False
+        return verdict.work_fingerprint == self.work_fingerprint(work)
+
+    async def get(self, usage_key: str, work: Work) -> Optional[Dict]:
+        """Return a cached verdict in the reason_about_match format, or None."""
+        return (await self.get_many([(usage_key, work)])).get((usage_key, work.id))
+
+    async def get_many(self, pairs: Sequence[Tuple[str, Work]]) -> Dict[Tuple[str, int], Dict]:
+        """Cached verdicts for (usage_key, work) pairs in one query, keyed by (usage_key, work_id)."""
+        if not settings.ai_cache_enabled or not pairs:
+            return {}
+
+        result = await self.db.execute(
+            select(AIVerdict).where(
+                tuple_(AIVerdict.usage_key, AIVerdict.work_id).in_(
+                    list({(usage_key, work.id) for usage_key, work in pairs})
+                ),
+                AIVerdict.model == self.model,
+                AIVerdict.prompt_version == self.prompt_version
+            )
+        )
+        stored = {(verdict.usage_key, verdict.work_id): verdict for verdict in result.scalars().all()}
+
+        verdicts: Dict[Tuple[str, int], Dict] = {}
+        for usage_key, work in pairs:
+            verdict = stored.get((usage_key, work.id))
+            if verdict is None or not self._is_fresh(verdict, work):
+                self.misses += 1
+                continue
+            self.hits += 1
+            verdicts[(usage_key, work.id)] = {
+                "is_match": verdict.is_match,
+                "confidence": float(verdict.confidence),
+                "reasoning": verdict.reasoning or ""
+            }
+        return verdicts
+
+    async def put(self, usage_key: str, work: Work, ai_result: Dict) -> None:
+        """Store a verdict, replacing any stale one. Failed LLM calls are not cached."""
+        if not settings.ai_cache_enabled or ai_result.get("error"):
+            return
+
+        values = {
+            "usage_key": usage_key,
+            "work_id": work.id,
+            "model": self.model,
+            "prompt_version": self.prompt_version,
+            "is_match": bool(ai_result["is_match"]),
+            "confidence": round(min(max(float(ai_result["confidence"]), 0.0), 1.0), 4),
+            "reasoning": ai_result.get("reasoning"),
+            "work_fingerprint": self.work_fingerprint(work),
+            "created_at": datetime.utcnow()
+        }
+        statement = insert(AIVerdict).values(**values)
+        statement = statement.on_conflict_do_update(
+            constraint="uq_ai_verdict_key",
+            set_={
+                "is_match": statement.excluded.is_match,
+                "confidence": statement.excluded.confidence,
+                "reasoning": statement.excluded.reasoning,
+                "work_fingerprint": statement.excluded.work_fingerprint,
+                "created_at": statement.excluded.created_at
+            }
+        )
+        await self.db.execute(statement)
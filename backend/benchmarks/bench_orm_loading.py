@@ -0,0 +1,123 @@
+"""
+Latency and loaded payload of the /works and /matches/batch/{id} queries,
+with embeddings loaded (as before they were deferred) and with the
+endpoints' load_only projections.
+
+Needs the database with migrations applied, works seeded (with embeddings
+generated for a representative result) and at least one processed batch.
+Run from the backend directory:
+
+    python -m benchmarks.bench_orm_loading --runs 20 --page-size 100
+"""
+
+import argparse
+import asyncio
+import time
+from sqlalchemy import inspect, select
+from sqlalchemy.orm import load_only, selectinload, undefer
+from app.api.matches import MATCH_LOAD_OPTIONS
+from app.api.works import HAS_EMBEDDING, WORK_RESPONSE_COLUMNS
+from app.core.database import AsyncSessionLocal
+from app.models import MatchResult, ProcessingBatch, UsageRecord, Work
+
+UNDEFER_WORK = (
+    undefer(Work.title_embedding), undefer(Work.songwriter_embedding), undefer(Work.combined_embedding)
+)
+
+
+def loaded_bytes(obj) -> int:
+    """Rough size of the attribute values an ORM instance holds, as text."""
+    return sum(
+        len(str(value))
+        for key, value in inspect(obj).dict.items()
+        if not key.startswith("_") and not hasattr(value, "__table__")
+    )
+
+
+def works_before(page_size: int):
+    return select(Work).options(*UNDEFER_WORK).order_by(Work.title).limit(page_size)
+
+
+def works_after(page_size: int):
+    return (
+        select(Work, HAS_EMBEDDING)
+        .options(load_only(*WORK_RESPONSE_COLUMNS))
+        .order_by(Work.title)
+        .limit(page_size)
+    )
+
+
+def matches_before(batch_id, page_size: int):
+    return (
+        select(MatchResult)
+        .join(UsageRecord)
+        .where(UsageRecord.batch_id == batch_id)
+        .options(
+            selectinload(MatchResult.usage_record).undefer(UsageRecord.songwriter_embedding),
+            selectinload(MatchResult.work).options(*UNDEFER_WORK)
+        )
+        .order_by(MatchResult.confidence_score.desc())
+        .limit(page_size)
+    )
+
+
+def matches_after(batch_id, page_size: int):
+    return (
+        select(MatchResult)
+        .join(UsageRecord)
+        .where(UsageRecord.batch_id == batch_id)
+        .options(*MATCH_LOAD_OPTIONS)
+        .order_by(MatchResult.confidence_score.desc())
+        .limit(page_size)
+    )
+
+
+async def measure(query, runs: int):
+    """Mean seconds per run and loaded bytes per page, each run in a fresh session."""
+    seconds = 0.0
+    size = 0
+    for _ in range(runs):
+        async with AsyncSessionLocal() as db:
+            started = time.perf_counter()
+            result = await db.execute(query)
+            rows = result.all()
+            seconds += time.perf_counter() - started
+            size = sum(loaded_bytes(obj) for obj in db.identity_map.values())
+    return seconds / runs, size, len(rows)
+
+
+def report(name: str, before, after):
+    (before_s, before_bytes, rows), (after_s, after_bytes, _) = before, after
+    print(f"{name} ({rows} rows)")
+    print(f"  latency  {before_s * 1000:8.2f} ms -> {after_s * 1000:8.2f} ms  ({before_s / max(after_s, 1e-9):.1f}x)")
+    print(f"  payload  {before_bytes / 1024:8.1f} KB -> {after_bytes / 1024:8.1f} KB  ({before_bytes / max(after_bytes, 1):.1f}x)")
+
+
+async def main(runs: int, page_size: int):
+    report(
+        "/works",
+        await measure(works_before(page_size), runs),
+        await measure(works_after(page_size), runs)
+    )
+
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(ProcessingBatch.id).order_by(ProcessingBatch.total_records.desc()).limit(1)
+        )
+        batch_id = result.scalar()
+    if batch_id is None:
+        print("/matches/batch/{id}: no batches to measure")
+        return
+    report(
+        f"/matches/batch/{batch_id}",
+        await measure(matches_before(batch_id, page_size), runs),
+        await measure(matches_after(batch_id, page_size), runs)
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--page-size", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(main(args.runs, args.page_size))
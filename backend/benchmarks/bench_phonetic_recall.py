@@ -0,0 +1,120 @@
+"""
+Recall and query cost of phonetic blocking on a synthetic noisy usage set.
+
+Samples works from the database, corrupts their titles and writer names the
+way usage files do (dropped, doubled and swapped letters, sound-alike
+spellings, accents, surname misspellings) and checks, per retrieval method,
+whether the source work comes back among the candidates.
+
+Needs the database with migrations applied and works seeded. Run from the
+backend directory:
+
+    python -m benchmarks.bench_phonetic_recall --samples 500
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from sqlalchemy import select, func
+from app.core.database import AsyncSessionLocal
+from app.models import Work
+from app.services.matching import MatchingService
+from app.services.songwriters import parse_songwriters
+
+SOUND_ALIKES = [
+    ("ph", "f"), ("ck", "k"), ("c", "k"), ("ee", "ea"), ("y", "ie"),
+    ("s", "z"), ("ou", "ow"), ("mc", "mac"), ("e", "é"), ("a", "á"),
+]
+
+
+def corrupt_word(word: str, rng: random.Random) -> str:
+    if len(word) < 4:
+        return word
+    lower = word.lower()
+    choice = rng.random()
+    if choice < 0.35:
+        for source, target in rng.sample(SOUND_ALIKES, len(SOUND_ALIKES)):
+            if source in lower:
+                return lower.replace(source, target, 1)
+    i = rng.randrange(1, len(word) - 1)
+    if choice < 0.55:
+        return word[:i] + word[i + 1:]  # Dropped letter
+    if choice < 0.75:
+        return word[:i] + word[i] + word[i:]  # Doubled letter
+    return word[:i - 1] + word[i] + word[i - 1] + word[i + 1:]  # Swapped letters
+
+
+def corrupt(text: str, rng: random.Random, rate: float) -> str:
+    return " ".join(
+        corrupt_word(word, rng) if rng.random() < rate else word
+        for word in text.split()
+    )
+
+
+def usage_songwriter(songwriters, rng: random.Random, rate: float) -> str:
+    """Render catalog credits as a usage file might: "Given Surname" joined with slashes."""
+    names = []
+    for credit in songwriters[:2]:
+        if "," in credit:
+            surname, given = [p.strip() for p in credit.split(",", 1)]
+            credit = f"{given} {surname}"
+        names.append(corrupt(credit, rng, rate))
+    return " / ".join(names)
+
+
+async def timed(coro):
+    started = time.perf_counter()
+    result = await coro
+    return result, time.perf_counter() - started
+
+
+async def main(samples: int, rate: float, seed: int):
+    rng = random.Random(seed)
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(Work).order_by(func.random()).limit(samples)
+        )
+        works = result.scalars().all()
+        service = MatchingService(db)
+
+        hits = {"trigram": 0, "phonetic": 0, "trigram+phonetic": 0}
+        seconds = {"trigram": 0.0, "phonetic": 0.0}
+
+        for work in works:
+            title = corrupt(work.title, rng, rate)
+            songwriter = usage_songwriter(work.songwriters, rng, rate)
+            surnames = sorted({
+                key for parsed in parse_songwriters(songwriter) for key in parsed.surname_keys
+            })
+
+            text_candidates, text_time = await timed(
+                service.find_candidates_by_text(title, songwriter)
+            )
+            phonetic_candidates, phonetic_time = await timed(
+                service.find_candidates_by_phonetic(title, surnames)
+            )
+
+            in_text = any(w.id == work.id for w, _ in text_candidates)
+            in_phonetic = any(w.id == work.id for w in phonetic_candidates)
+            hits["trigram"] += in_text
+            hits["phonetic"] += in_phonetic
+            hits["trigram+phonetic"] += in_text or in_phonetic
+            seconds["trigram"] += text_time
+            seconds["phonetic"] += phonetic_time
+
+    total = len(works) or 1
+    print(f"samples: {len(works)}  noise rate: {rate}  seed: {seed}")
+    for method, count in hits.items():
+        print(f"  recall {method:<18} {count / total:6.1%}")
+    for method, spent in seconds.items():
+        print(f"  mean query {method:<14} {spent / total * 1000:7.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--samples", type=int, default=500)
+    parser.add_argument("--rate", type=float, default=0.5, help="Share of words corrupted")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    asyncio.run(main(args.samples, args.rate, args.seed))
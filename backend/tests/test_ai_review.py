@@ -0,0 +1,348 @@
+"""
+Unit tests for the background AI review queue.
+"""
+
+import asyncio
+import uuid
+from collections import namedtuple
+from types import SimpleNamespace
+from decimal import Decimal
+import pytest
+from sqlalchemy.dialects import postgresql
+from app.services import ai_review
+from app.services.ai_review import AIReviewWorker
+
+Row = namedtuple("Row", ["AIReviewTask", "MatchResult", "UsageRecord", "Work"])
+
+
+class FakeResult:
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+
+    def fetchall(self):
+        return self.rows
+
+    def all(self):
+        return self.rows
+
+
+class FakeDB:
+    """Session stand-in answering queued results in order and recording statements."""
+
+    def __init__(self, results=(), batch=None):
+        self.results = list(results)
+        self.batch = batch
+        self.statements = []
+        self.commits = 0
+        self.rollbacks = 0
+
+    async def execute(self, statement, params=None):
+        self.statements.append(statement)
+        return self.results.pop(0) if self.results else FakeResult()
+
+    async def get(self, model, key):
+        return self.batch
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        self.rollbacks += 1
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeCache:
+    def __init__(self, db):
+        self.db = db
+
+    @staticmethod
+    def make_usage_key(title, songwriter):
+        return f"{title}|{songwriter}"
+
+    async def get_many(self, pairs):
+        return {}
+
+    async def put(self, usage_key, work, verdict):
+        pass
+
+
+class FakeOllama:
+    """Counts one call per candidate, like single-candidate prompts."""
+
+    model = "test"
+    prompt_version = "test"
+
+    def __init__(self, calls=0, delay=0.0):
+        self.calls = calls
+        self.call_seconds = 0.0
+        self.delay = delay
+
+    async def analyze_batch_matches(self, candidates):
+        for _ in candidates:
+            await asyncio.sleep(self.delay)
+            self.calls += 1
+            self.call_seconds += 0.5
+        return [{"is_match": True, "confidence": 0.9, "reasoning": "same work"} for _ in candidates]
+
+
+def make_row(task_id=1, batch_id=None, attempts=1, match_status="flagged", is_confirmed=False):
+    batch_id = batch_id or uuid.uuid4()
+    task = SimpleNamespace(id=task_id, batch_id=batch_id, attempts=attempts, status="processing", last_error=None)
+    match = SimpleNamespace(
+        id=task_id, batch_id=batch_id, match_type="pending_ai", confidence_score=Decimal("0.7500"),
+        title_similarity=Decimal("0.8"), songwriter_similarity=Decimal("0.6"), vector_similarity=None,
+        ai_reasoning=None, is_confirmed=is_confirmed, is_rejected=False
+    )
+    usage = SimpleNamespace(
+        id=task_id, batch_id=batch_id, work_title="Yesterdy", recording_title=None, songwriter="McCartney",
+        match_status=match_status, best_match_id=None, best_confidence=None
+    )
+    work = SimpleNamespace(id=7, title="Yesterday", songwriters=["McCartney, Paul"])
+    return Row(task, match, usage, work)
+
+
+def compiled_params(statement):
+    return statement.compile(dialect=postgresql.dialect()).params
+
+
+class TestClaim:
+    """Tests for claiming queued reviews."""
+
+    async def test_claims_with_skip_locked_and_commits(self):
+        db = FakeDB([FakeResult([SimpleNamespace(id=3), SimpleNamespace(id=4)])])
+        task_ids = await AIReviewWorker(claim_size=5)._claim(db)
+
+        assert task_ids == [3, 4]
+        assert "FOR UPDATE SKIP LOCKED" in str(db.statements[0])
+        assert "attempts = attempts + 1" in str(db.statements[0])
+        assert db.commits == 1
+
+
+class TestClaimedTasks:
+    """Tests for what becomes of claimed tasks."""
+
+    def use(self, monkeypatch, db):
+        monkeypatch.setattr(ai_review, "AsyncSessionLocal", lambda: db)
+        monkeypatch.setattr(ai_review, "VerdictCache", lambda db, model, prompt_version: FakeCache(db))
+
+    async def test_error_hands_claim_back(self, monkeypatch):
+        db = FakeDB([FakeResult([SimpleNamespace(id=3), SimpleNamespace(id=4)])])
+        self.use(monkeypatch, db)
+
+        async def broken(db, task_ids, ollama_service):
+            raise RuntimeError("connection reset")
+        worker = AIReviewWorker()
+        monkeypatch.setattr(worker, "_process_claimed", broken)
+
+        with pytest.raises(RuntimeError):
+            await worker.process_next(FakeOllama())
+
+        assert db.rollbacks == 1
+        release = db.statements[-1].compile(dialect=postgresql.dialect())
+        assert str(release).startswith("UPDATE ai_review_queue SET status=CASE WHEN")
+        assert "ai_review_queue.status = " in str(release)
+        assert release.params["last_error"] == "connection reset"
+        assert db.commits == 2
+
+    async def test_vanished_match_fails_task(self, monkeypatch):
+        row = make_row(task_id=1)
+        db = FakeDB([
+            FakeResult([SimpleNamespace(id=1), SimpleNamespace(id=2)]),
+            FakeResult([row]),
+            FakeResult([SimpleNamespace(id=row.MatchResult.id)]),
+        ])
+        self.use(monkeypatch, db)
+
+        assert await AIReviewWorker().process_next(FakeOllama()) == 1
+
+        failed = db.statements[2].compile(dialect=postgresql.dialect())
+        assert str(failed).startswith("UPDATE ai_review_queue")
+        assert failed.params["status"] == "failed"
+        assert [2] in failed.params.values()
+
+    async def test_reviewed_match_not_sent_to_llm(self, monkeypatch):
+        row = make_row(is_confirmed=True)
+        db = FakeDB([FakeResult([SimpleNamespace(id=1)]), FakeResult([row])])
+        self.use(monkeypatch, db)
+        ollama = FakeOllama()
+
+        await AIReviewWorker().process_next(ollama)
+
+        assert ollama.calls == 0
+        assert row.AIReviewTask.status == "done"
+        assert row.MatchResult.match_type == "pending_ai"
+
+    async def test_match_reviewed_during_llm_call_kept(self, monkeypatch):
+        row = make_row()
+        # The lock query finds the match no longer unreviewed
+        db = FakeDB([FakeResult([SimpleNamespace(id=1)]), FakeResult([row]), FakeResult([])])
+        self.use(monkeypatch, db)
+        ollama = FakeOllama()
+
+        await AIReviewWorker().process_next(ollama)
+
+        assert ollama.calls == 1
+        assert "FOR UPDATE" in str(db.statements[-1].compile(dialect=postgresql.dialect()))
+        assert row.AIReviewTask.status == "done"
+        assert row.MatchResult.match_type == "pending_ai"
+        assert row.UsageRecord.match_status == "flagged"
+
+    async def test_unreviewed_match_gets_verdict(self, monkeypatch):
+        row = make_row()
+        db = FakeDB([
+            FakeResult([SimpleNamespace(id=1)]),
+            FakeResult([row]),
+            FakeResult([SimpleNamespace(id=row.MatchResult.id)]),
+        ])
+        self.use(monkeypatch, db)
+
+        await AIReviewWorker().process_next(FakeOllama())
+
+        assert row.MatchResult.match_type == "ai_matched"
+        assert row.UsageRecord.match_status == "matched"
+
+    async def test_no_transaction_open_during_llm_call(self, monkeypatch):
+        row = make_row()
+        db = FakeDB([
+            FakeResult([SimpleNamespace(id=1)]),
+            FakeResult([row]),
+            FakeResult([SimpleNamespace(id=row.MatchResult.id)]),
+        ])
+        self.use(monkeypatch, db)
+        seen = []
+
+        class WatchingOllama(FakeOllama):
+            async def analyze_batch_matches(self, candidates):
+                seen.append((db.commits, len(db.statements)))
+                return await super().analyze_batch_matches(candidates)
+
+        await AIReviewWorker().process_next(WatchingOllama())
+
+        # Claim, load and cache lookup are all committed before the prompt
+        assert seen == [(3, 2)]
+        lock = db.statements[2].compile(dialect=postgresql.dialect())
+        assert "FOR UPDATE" in str(lock)
+        assert row.MatchResult.match_type == "ai_matched"
+
+
+class TestApplyVerdict:
+    """Tests for writing verdicts back to matches."""
+
+    async def test_match_moves_record_from_flagged_to_matched(self):
+        db = FakeDB()
+        task, match, usage, _ = make_row()
+        verdict = {"is_match": True, "confidence": 0.92, "reasoning": "same work"}
+
+        await AIReviewWorker()._apply_verdict(db, task, match, usage, verdict)
+
+        assert task.status == "done"
+        assert match.match_type == "ai_matched"
+        assert match.confidence_score == 0.92
+        assert usage.match_status == "matched"
+        assert usage.best_match_id == match.id
+        sql = str(db.statements[0].compile(dialect=postgresql.dialect()))
+        assert "matched_records=(processing_batches.matched_records +" in sql
+        assert "flagged_records=(processing_batches.flagged_records -" in sql
+
+    async def test_no_match_keeps_counters(self):
+        db = FakeDB()
+        task, match, usage, _ = make_row()
+        verdict = {"is_match": False, "confidence": 0.9, "reasoning": "different song"}
+
+        await AIReviewWorker()._apply_verdict(db, task, match, usage, verdict)
+
+        assert task.status == "done"
+        assert match.match_type == "medium_confidence"
+        assert usage.match_status == "flagged"
+        assert db.statements == []
+
+    async def test_error_retried_while_attempts_remain(self, monkeypatch):
+        monkeypatch.setattr(ai_review.settings, "ai_review_max_attempts", 3)
+        task, match, usage, _ = make_row(attempts=1)
+
+        await AIReviewWorker()._apply_verdict(FakeDB(), task, match, usage, {"error": True, "reasoning": "timeout"})
+
+        assert task.status == "pending"
+        assert task.last_error == "timeout"
+        assert match.match_type == "pending_ai"
+
+    async def test_error_fails_after_last_attempt(self, monkeypatch):
+        monkeypatch.setattr(ai_review.settings, "ai_review_max_attempts", 3)
+        task, match, usage, _ = make_row(attempts=3)
+
+        await AIReviewWorker()._apply_verdict(FakeDB(), task, match, usage, None)
+
+        assert task.status == "failed"
+        assert task.last_error == "No verdict returned"
+        assert match.match_type == "medium_confidence"
+
+    async def test_open_circuit_requeues_without_using_attempt(self, monkeypatch):
+        monkeypatch.setattr(ai_review, "llm_breaker", SimpleNamespace(available=False))
+        task, match, usage, _ = make_row(attempts=2)
+
+        await AIReviewWorker()._apply_verdict(FakeDB(), task, match, usage, {"error": True, "reasoning": "open"})
+
+        assert task.status == "pending"
+        assert task.attempts == 1
+
+
+class TestBudget:
+    """Tests for the per-batch LLM budget."""
+
+    def test_budget_exhausted(self, monkeypatch):
+        monkeypatch.setattr(ai_review.settings, "ai_max_calls_per_batch", 10)
+        monkeypatch.setattr(ai_review.settings, "ai_max_seconds_per_batch", 0)
+        assert AIReviewWorker._budget_exhausted(SimpleNamespace(ai_calls=10, ai_seconds=0))
+        assert not AIReviewWorker._budget_exhausted(SimpleNamespace(ai_calls=9, ai_seconds=1e6))
+
+    async def test_exhausted_batch_skipped_without_llm(self, monkeypatch):
+        monkeypatch.setattr(ai_review.settings, "ai_max_calls_per_batch", 1)
+        row = make_row()
+        db = FakeDB(
+            [FakeResult([SimpleNamespace(id=1)]), FakeResult([row])],
+            batch=SimpleNamespace(id=row.AIReviewTask.batch_id, ai_calls=1, ai_seconds=0)
+        )
+        monkeypatch.setattr(ai_review, "AsyncSessionLocal", lambda: db)
+        ollama = FakeOllama()
+
+        assert await AIReviewWorker().process_next(ollama) == 1
+
+        assert ollama.calls == 0
+        assert row.AIReviewTask.status == "skipped"
+        assert row.MatchResult.match_type == "medium_confidence"
+
+
+class TestUsageAccounting:
+    """Tests for charging LLM usage to the batch it was spent on."""
+
+    async def test_charges_only_own_calls(self):
+        db = FakeDB()
+        batch = SimpleNamespace(id=uuid.uuid4())
+        ollama = FakeOllama(calls=100)
+
+        await AIReviewWorker()._adjudicate(ollama, FakeCache(db), [make_row(1), make_row(2)], batch)
+
+        params = compiled_params(db.statements[0])
+        assert params["ai_calls_1"] == 2
+        assert params["ai_seconds_1"] == 1.0
+
+    async def test_concurrent_workers_do_not_mix_batches(self):
+        worker = AIReviewWorker()
+        first_db, second_db = FakeDB(), FakeDB()
+        first = SimpleNamespace(id=uuid.uuid4())
+        second = SimpleNamespace(id=uuid.uuid4())
+
+        await asyncio.gather(
+            worker._adjudicate(FakeOllama(delay=0.01), FakeCache(first_db), [make_row(1)], first),
+            worker._adjudicate(
+                FakeOllama(delay=0.001), FakeCache(second_db), [make_row(2), make_row(3), make_row(4)], second
+            ),
+        )
+
+        assert compiled_params(first_db.statements[0])["ai_calls_1"] == 1
+        assert compiled_params(second_db.statements[0])["ai_calls_1"] == 3
@@ -0,0 +1,80 @@
+"""
+Unit tests for rule-based auto-confirmation.
+"""
+
+import uuid
+from types import SimpleNamespace
+from sqlalchemy.dialects import postgresql
+from app.core.config import AutoConfirmRule
+from app.services.auto_confirm import apply_auto_confirm_rules, rule_condition
+
+
+class FakeDB:
+    """Session stand-in recording statements; the first returns fixed confirmations."""
+
+    def __init__(self, confirmed=()):
+        self.results = [list(confirmed)]
+        self.statements = []
+
+    async def execute(self, statement, params=None):
+        self.statements.append((statement, params))
+        rows = self.results.pop(0) if self.results else []
+        return SimpleNamespace(all=lambda: rows)
+
+
+def confirmed(rule, usage_record_id, batch_id):
+    return SimpleNamespace(auto_confirm_rule=rule, batch_id=batch_id, usage_record_id=usage_record_id)
+
+
+def render(condition) -> str:
+    return str(condition.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+class TestRuleCondition:
+    """Tests for turning rules into SQL conditions."""
+
+    def test_only_set_thresholds_apply(self):
+        sql = render(rule_condition(AutoConfirmRule(name="writer_exact", min_confidence=0.8, min_songwriter_similarity=1.0)))
+        assert "match_results.confidence_score >= 0.8" in sql
+        assert "match_results.songwriter_similarity >= 1.0" in sql
+        assert "title_similarity" not in sql
+        assert "match_type" not in sql
+
+    def test_match_types(self):
+        sql = render(rule_condition(AutoConfirmRule(name="exact", match_types=["exact", "ai_matched"])))
+        assert "match_results.match_type IN ('exact', 'ai_matched')" in sql
+
+
+class TestApplyRules:
+    """Tests for applying rules to a batch."""
+
+    async def test_no_rules_touches_nothing(self):
+        assert await apply_auto_confirm_rules(None, None, []) == {}
+
+    async def test_one_update_attributes_first_rule(self):
+        batch_id = uuid.uuid4()
+        db = FakeDB([
+            confirmed("exact", 1, batch_id), confirmed("exact", 2, batch_id), confirmed("writer_exact", 3, batch_id)
+        ])
+        rules = [
+            AutoConfirmRule(name="exact", match_types=["exact"]),
+            AutoConfirmRule(name="writer_exact", min_confidence=0.8, min_songwriter_similarity=1.0),
+        ]
+
+        counts = await apply_auto_confirm_rules(db, batch_id, rules)
+
+        assert counts == {"exact": 2, "writer_exact": 1}
+        sql = render(db.statements[0][0])
+        assert sql.startswith("UPDATE match_results SET")
+        # The first rule a match meets is the one recorded
+        assert "auto_confirm_rule=CASE WHEN (match_results.confidence_score >= 0" in sql
+        assert sql.index("THEN 'exact'") < sql.index("THEN 'writer_exact'")
+        assert "match_results.id = usage_records.best_match_id" in sql
+        assert "match_results.match_type != 'pending_ai'" in sql
+        assert "match_results.is_confirmed = false AND match_results.is_rejected = false" in sql
+        assert "RETURNING match_results.auto_confirm_rule" in sql
+
+        # The confirmed records' status and the batch counters follow in the same transaction
+        refresh, params = db.statements[1]
+        assert "UPDATE usage_records" in str(refresh)
+        assert params == {"batch_ids": [batch_id] * 3, "record_ids": [1, 2, 3]}
@@ -0,0 +1,272 @@
+"""
+Unit tests for background batch archival.
+"""
+
+import gzip
+import json
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+from app.api import batches
+from app.models import BatchJob, MatchResult, ProcessingBatch, UsageRecord
+from app.services import batch_jobs
+
+
+class FakeDB:
+    """Session stand-in answering the archive's count queries and lookups."""
+
+    def __init__(self, batch, count):
+        self.batch = batch
+        self.count = count
+        self.commits = 0
+
+    async def get(self, model, key):
+        return self.batch
+
+    async def execute(self, statement, params=None):
+        return SimpleNamespace(scalar=lambda: self.count)
+
+    async def commit(self):
+        self.commits += 1
+
+
+class JobDB:
+    """Session stand-in holding one batch and one job, noting the job's phase at each commit."""
+
+    def __init__(self, batch=None, job=None, active=None, pending_reviews=()):
+        self.batch = batch
+        self.job = job
+        self.active = active
+        self.pending_reviews = list(pending_reviews)
+        self.statements = []
+        self.phases = []
+        self.added = []
+
+    async def get(self, model, key):
+        return self.job if model is BatchJob else self.batch
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    async def execute(self, statement, params=None):
+        self.statements.append(statement)
+        return SimpleNamespace(
+            scalar_one_or_none=lambda: self.active, scalar=lambda: 0, all=lambda: self.pending_reviews
+        )
+
+    async def commit(self):
+        if self.job is not None:
+            self.phases.append(self.job.phase)
+
+    async def rollback(self):
+        pass
+
+    async def refresh(self, obj):
+        obj.id = obj.id or uuid.uuid4()
+        obj.created_at = datetime.utcnow()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+def make_job(archive=False, archive_path=None):
+    return BatchJob(
+        id=uuid.uuid4(), batch_id=uuid.uuid4(), archive=archive, status="pending",
+        rows_total=0, rows_done=0, archive_path=archive_path
+    )
+
+
+def compiled_params(statement):
+    return statement.compile(dialect=postgresql.dialect()).params
+
+
+class TestArchiveColumns:
+    """Tests for the columns written to archives."""
+
+    def test_embeddings_left_out(self):
+        names = {column.name for column in batch_jobs.archive_columns(UsageRecord)}
+        assert "title_embedding" not in names
+        assert "songwriter_embedding" not in names
+        assert {"id", "batch_id", "recording_title", "match_status"} <= names
+
+
+class TestArchive:
+    """Tests for writing a batch to a compressed file."""
+
+    async def test_writes_tagged_rows_and_progress(self, monkeypatch, tmp_path):
+        batch_id = uuid.uuid4()
+        rows = {
+            UsageRecord: [[{"id": 1, "batch_id": batch_id}, {"id": 2, "batch_id": batch_id}]],
+            MatchResult: [[{"id": 7, "batch_id": batch_id, "usage_record_id": 1}]],
+        }
+
+        def fake_stream_rows(query, sort_columns, chunk_size):
+            table = query.get_final_froms()[0].name
+            model = UsageRecord if table == "usage_records" else MatchResult
+
+            async def chunks():
+                for chunk in rows[model]:
+                    yield [SimpleNamespace(_mapping=row) for row in chunk]
+            return chunks()
+
+        monkeypatch.setattr(batch_jobs, "stream_rows", fake_stream_rows)
+        monkeypatch.setattr(batch_jobs.settings, "archive_dir", str(tmp_path))
+        batch = ProcessingBatch(id=batch_id, filename="usage.csv", total_records=2, status="completed")
+        job = SimpleNamespace(batch_id=batch_id, rows_total=0, rows_done=0)
+
+        path = await batch_jobs.BatchJobRunner().archive(FakeDB(batch, 3), job)
+
+        with gzip.open(path, "rt", encoding="utf-8") as archive:
+            lines = [json.loads(line) for line in archive]
+        assert [line["table"] for line in lines] == [
+            "processing_batches", "usage_records", "usage_records", "match_results"
+        ]
+        assert lines[0]["filename"] == "usage.csv"
+        assert lines[3]["batch_id"] == str(batch_id)
+        assert job.rows_total == 6  # the fake answers 3 to both counts
+        assert job.rows_done == 3
+        assert not list(tmp_path.glob("*.partial"))
+
+    async def test_partial_file_removed_on_error(self, monkeypatch, tmp_path):
+        def failing_stream_rows(query, sort_columns, chunk_size):
+            async def chunks():
+                yield [SimpleNamespace(_mapping={"id": 1})]
+                raise ConnectionError("connection lost")
+            return chunks()
+
+        monkeypatch.setattr(batch_jobs, "stream_rows", failing_stream_rows)
+        monkeypatch.setattr(batch_jobs.settings, "archive_dir", str(tmp_path))
+        job = SimpleNamespace(batch_id=uuid.uuid4(), rows_total=0, rows_done=0)
+
+        with pytest.raises(ConnectionError):
+            await batch_jobs.BatchJobRunner().archive(FakeDB(None, 1), job)
+
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestJobEndpoints:
+    """Tests for starting a deletion and reading its progress."""
+
+    async def test_delete_creates_and_launches_job(self, monkeypatch):
+        launched = []
+        monkeypatch.setattr(batches.batch_job_runner, "launch", launched.append)
+        batch_id = uuid.uuid4()
+        db = JobDB(batch=SimpleNamespace(id=batch_id, status="completed"))
+
+        response = await batches.delete_batch(batch_id, archive=True, db=db)
+
+        job = db.added[0]
+        assert launched == [job.id]
+        assert response.id == str(job.id)
+        assert response.batch_id == str(batch_id)
+        assert response.archive is True
+        assert response.status == "pending"
+
+    async def test_delete_refused_while_job_active(self, monkeypatch):
+        monkeypatch.setattr(batches.batch_job_runner, "launch", lambda job_id: None)
+        db = JobDB(batch=SimpleNamespace(status="completed"), active=make_job())
+
+        with pytest.raises(HTTPException) as error:
+            await batches.delete_batch(uuid.uuid4(), archive=False, db=db)
+        assert error.value.status_code == 409
+
+    async def test_archive_refused_while_reviews_pending(self, monkeypatch):
+        launched = []
+        monkeypatch.setattr(batches.batch_job_runner, "launch", launched.append)
+        batch_id = uuid.uuid4()
+        db = JobDB(batch=SimpleNamespace(status="completed"), pending_reviews=[(batch_id, 3)])
+
+        with pytest.raises(HTTPException) as error:
+            await batches.delete_batch(batch_id, archive=True, db=db)
+        assert error.value.status_code == 409
+        assert launched == []
+
+    async def test_status_reports_phase_and_progress(self):
+        job = make_job(archive=True)
+        job.status, job.phase, job.rows_total, job.rows_done = "running", "archiving", 10, 4
+        job.created_at = datetime.utcnow()
+
+        response = await batches.get_batch_job(job.id, db=JobDB(job=job))
+
+        assert (response.status, response.phase, response.rows_done, response.rows_total) == (
+            "running", "archiving", 4, 10
+        )
+
+    async def test_unknown_job(self):
+        with pytest.raises(HTTPException) as error:
+            await batches.get_batch_job(uuid.uuid4(), db=JobDB())
+        assert error.value.status_code == 404
+
+
+class TestRun:
+    """Tests for running a deletion job through its phases."""
+
+    def use(self, monkeypatch, db, drop=None):
+        dropped = []
+
+        async def drop_batch_partitions(session, batch_id):
+            if drop is not None:
+                raise drop
+            dropped.append(batch_id)
+
+        async def archive(self, session, job):
+            job.rows_done = 3
+            return "/archive/batch.ndjson.gz"
+
+        monkeypatch.setattr(batch_jobs, "AsyncSessionLocal", lambda: db)
+        monkeypatch.setattr(batch_jobs, "drop_batch_partitions", drop_batch_partitions)
+        monkeypatch.setattr(batch_jobs.BatchJobRunner, "archive", archive)
+        return dropped
+
+    async def test_reports_each_phase(self, monkeypatch):
+        job = make_job(archive=True)
+        db = JobDB(job=job)
+        dropped = self.use(monkeypatch, db)
+
+        await batch_jobs.BatchJobRunner().run(job.id)
+
+        assert db.phases == [None, "archiving", "dropping_partitions", "deleting_batch", "deleting_batch"]
+        assert dropped == [job.batch_id]
+        assert job.status == "completed"
+        assert job.archive_path == "/archive/batch.ndjson.gz"
+        assert "DELETE FROM processing_batches" in str(db.statements[-1])
+
+    async def test_resume_skips_finished_archive(self, monkeypatch):
+        job = make_job(archive=True, archive_path="/archive/batch.ndjson.gz")
+        job.phase = "dropping_partitions"
+        db = JobDB(job=job)
+        self.use(monkeypatch, db)
+
+        await batch_jobs.BatchJobRunner().run(job.id)
+
+        assert "archiving" not in db.phases
+        assert job.rows_done == 0
+        assert job.status == "completed"
+
+    async def test_failure_leaves_failed_job(self, monkeypatch):
+        job = make_job()
+        db = JobDB(job=job)
+        self.use(monkeypatch, db, drop=RuntimeError("lock timeout"))
+
+        await batch_jobs.BatchJobRunner().run(job.id)
+
+        failed = compiled_params(db.statements[-1])
+        assert failed["status"] == "failed"
+        assert failed["error_message"] == "lock timeout"
+        assert job.phase == "dropping_partitions"
+        assert not any("processing_batches" in str(statement) for statement in db.statements)
+
+    async def test_missing_job_ignored(self, monkeypatch):
+        db = JobDB()
+        dropped = self.use(monkeypatch, db)
+
+        await batch_jobs.BatchJobRunner().run(uuid.uuid4())
+
+        assert dropped == []
+        assert db.statements == []
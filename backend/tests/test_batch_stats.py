@@ -0,0 +1,96 @@
+"""
+Unit tests for incrementally kept batch statistics.
+"""
+
+import uuid
+from decimal import Decimal
+from sqlalchemy.dialects import postgresql
+from app.services.batch_stats import BatchStatsCollector, confidence_bucket
+from app.services.cascade import MatchCascade, MatchContext
+
+
+class FakeDB:
+    """Session stand-in recording the statements it is given."""
+
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+
+
+class TestConfidenceBucket:
+    """Tests for histogram bucketing."""
+
+    def test_lower_bound(self):
+        assert confidence_bucket(0.87) == "0.85"
+        assert confidence_bucket(Decimal("0.8500")) == "0.85"
+        assert confidence_bucket(0) == "0.00"
+
+    def test_top_bucket_holds_one(self):
+        assert confidence_bucket(1.0) == "0.95"
+
+
+class TestBatchStatsCollector:
+    """Tests for counting and flushing statistics."""
+
+    def test_rematch_moves_counts(self):
+        stats = BatchStatsCollector(uuid.uuid4(), flush_seconds=60)
+        stats.add_match("high_confidence", 0.97)
+        stats.remove_match("high_confidence", 0.97)
+        stats.add_match("medium_confidence", 0.82)
+
+        assert +stats.counts["match_types"] == {"medium_confidence": 1}
+        assert stats.counts["confidence_histogram"]["0.95"] == 0
+        assert stats.counts["confidence_histogram"]["0.80"] == 1
+
+    def test_context_counts_stages(self):
+        stats = BatchStatsCollector(uuid.uuid4(), flush_seconds=60)
+        ctx = MatchContext(usage_record=None, title="t", songwriter="s")
+        ctx.stage_seconds = {"known": 0.001, "identifier": 0.002}
+        ctx.decided_by = "identifier"
+        stats.add_context(ctx)
+
+        assert stats.counts["stage_runs"] == {"known": 1, "identifier": 1}
+        assert stats.counts["decided_by"] == {"identifier": 1}
+        stats.remove_decision("identifier")
+        stats.remove_decision(None)
+        assert +stats.counts["decided_by"] == {}
+        assert stats.counts["decided_by"]["identifier"] == 0
+
+    async def test_undecided_record_counted_against_no_stage(self):
+        async def stage(ctx):
+            pass
+
+        def scorer(ctx):
+            ctx.scored = [{"confidence": 0.75, "match_type": "medium_confidence"}]
+
+        cascade = MatchCascade({"trigram": stage, "vector": stage}, scorer, enabled=["trigram", "vector"])
+        ctx = await cascade.run(MatchContext(usage_record=None, title="Yesterdy", songwriter=""))
+        stats = BatchStatsCollector(uuid.uuid4(), flush_seconds=60)
+        stats.add_context(ctx)
+
+        assert ctx.decided_by is None
+        assert stats.counts["stage_runs"] == {"trigram": 1, "vector": 1}
+        assert stats.counts["decided_by"] == {}
+
+    def test_due_after_interval(self):
+        assert BatchStatsCollector(uuid.uuid4(), flush_seconds=0).due()
+        assert not BatchStatsCollector(uuid.uuid4(), flush_seconds=60).due()
+
+    async def test_flush_upserts_and_resets(self):
+        db = FakeDB()
+        stats = BatchStatsCollector(uuid.uuid4(), flush_seconds=60)
+        stats.add_match("exact", 1.0)
+        await stats.flush(db)
+
+        assert len(db.statements) == 1
+        sql = str(db.statements[0].compile(dialect=postgresql.dialect()))
+        assert "ON CONFLICT (batch_id) DO UPDATE" in sql
+        assert "jsonb_add_counts" in sql
+        assert not stats.pending
+
+    async def test_flush_skipped_without_counts(self):
+        db = FakeDB()
+        await BatchStatsCollector(uuid.uuid4()).flush(db)
+        assert db.statements == []
@@ -0,0 +1,173 @@
+"""
+Unit tests for the matching cascade.
+"""
+
+import pytest
+from app.services.cascade import STAGE_COSTS, Deadline, MatchCascade, MatchContext, parse_stage_list
+
+
+CORE_STAGES = ["exact_key", "trigram", "vector", "llm"]
+
+
+def make_scorer(scores_by_stage):
+    """Build a scorer that sets fixed (confidence, match_type) pairs after each stage."""
+    def scorer(ctx):
+        ctx.scored = [
+            {"confidence": confidence, "match_type": match_type}
+            for confidence, match_type in scores_by_stage.get(ctx.stages_run[-1], [])
+        ]
+    return scorer
+
+
+def make_stages(calls):
+    """Build stage handlers that record the order they were called in."""
+    def build(name):
+        async def handler(ctx):
+            calls.append(name)
+        return handler
+
+    return {name: build(name) for name in STAGE_COSTS}
+
+
+class TestCascadeOrdering:
+    """Tests for stage ordering and configuration."""
+
+    async def test_runs_cheapest_first(self):
+        calls = []
+        cascade = MatchCascade(
+            make_stages(calls),
+            make_scorer({}),
+            enabled=["llm", "vector", "trigram", "exact_key"]
+        )
+        await cascade.run(MatchContext(None, "Yesterday", ""))
+        assert calls == ["exact_key", "trigram", "vector", "llm"]
+
+    async def test_disabled_stage_not_run(self):
+        calls = []
+        cascade = MatchCascade(make_stages(calls), make_scorer({}), enabled=["trigram", "llm"])
+        await cascade.run(MatchContext(None, "Yesterday", ""))
+        assert calls == ["trigram", "llm"]
+
+    def test_unknown_stage(self):
+        with pytest.raises(ValueError):
+            MatchCascade(make_stages([]), make_scorer({}), enabled=["trigram", "magic"])
+
+    def test_parse_stage_list(self):
+        assert parse_stage_list(" trigram, vector ,,llm") == ["trigram", "vector", "llm"]
+
+
+class TestEarlyTermination:
+    """Tests for stop conditions."""
+
+    async def test_stops_on_exact(self):
+        calls = []
+        cascade = MatchCascade(
+            make_stages(calls),
+            make_scorer({"exact_key": [(1.0, "exact")]}),
+            enabled=["exact_key", "trigram", "vector", "llm"]
+        )
+        ctx = await cascade.run(MatchContext(None, "Yesterday", ""))
+        assert calls == ["exact_key"]
+        assert ctx.decided_by == "exact_key"
+
+    async def test_stops_on_clear_margin(self):
+        calls = []
+        cascade = MatchCascade(
+            make_stages(calls),
+            make_scorer({"trigram": [(0.9, "high_confidence"), (0.6, "low_confidence")]}),
+            enabled=["exact_key", "trigram", "vector", "llm"],
+            stop_margin=0.15
+        )
+        ctx = await cascade.run(MatchContext(None, "Yesterday", ""))
+        assert calls == ["exact_key", "trigram"]
+        assert ctx.decided_by == "trigram"
+
+    async def test_continues_on_close_runner_up(self):
+        calls = []
+        cascade = MatchCascade(
+            make_stages(calls),
+            make_scorer({"trigram": [(0.9, "high_confidence"), (0.85, "high_confidence")]}),
+            enabled=["trigram", "vector"],
+            stop_margin=0.15
+        )
+        await cascade.run(MatchContext(None, "Yesterday", ""))
+        assert calls == ["trigram", "vector"]
+
+    async def test_nothing_decisive_leaves_undecided(self):
+        calls = []
+        cascade = MatchCascade(
+            make_stages(calls),
+            make_scorer({"vector": [(0.75, "medium_confidence")]}),
+            enabled=["trigram", "vector"]
+        )
+        ctx = await cascade.run(MatchContext(None, "Yesterday", ""))
+        assert calls == ["trigram", "vector"]
+        assert ctx.decided_by is None
+        assert ctx.best["confidence"] == 0.75
+
+    async def test_early_exit_disabled(self):
+        calls = []
+        cascade = MatchCascade(
+            make_stages(calls),
+            make_scorer({"exact_key": [(1.0, "exact")]}),
+            enabled=["exact_key", "trigram"],
+            early_exit=False
+        )
+        await cascade.run(MatchContext(None, "Yesterday", ""))
+        assert calls == ["exact_key", "trigram"]
+
+
+class TestPauseAndResume:
+    """Tests for pausing the cascade before batch-level stages."""
+
+    async def test_pause_before_vector(self):
+        calls = []
+        cascade = MatchCascade(
+            make_stages(calls),
+            make_scorer({}),
+            enabled=["exact_key", "trigram", "vector", "llm"]
+        )
+        ctx = MatchContext(None, "Yesterday", "")
+        await cascade.run(ctx, until="vector")
+        assert calls == ["exact_key", "trigram"]
+        assert ctx.decided_by is None
+        assert cascade.is_pending(ctx, "vector")
+
+        await cascade.run(ctx)
+        assert calls == ["exact_key", "trigram", "vector", "llm"]
+        assert not cascade.is_pending(ctx, "vector")
+
+
+class TestDeadlines:
+    """Tests for skipping optional stages near the deadline."""
+
+    async def test_expired_deadline_skips_optional_stages(self):
+        calls = []
+        cascade = MatchCascade(make_stages(calls), make_scorer({}), enabled=CORE_STAGES)
+        deadline = Deadline(1.0)
+        deadline.expires_at -= 2.0
+        ctx = await cascade.run(MatchContext(None, "Yesterday", "", deadline=deadline))
+        assert calls == ["exact_key", "trigram"]
+        assert ctx.skipped_stages == ["vector", "llm"]
+        assert ctx.degraded
+        assert ctx.decided_by is None
+
+    async def test_skips_stage_expected_to_overrun(self):
+        calls = []
+        cascade = MatchCascade(make_stages(calls), make_scorer({}), enabled=CORE_STAGES)
+        cascade.stage_seconds["llm"] = 60.0
+        ctx = await cascade.run(MatchContext(None, "Yesterday", "", deadline=Deadline(30.0)))
+        assert calls == ["exact_key", "trigram", "vector"]
+        assert ctx.skipped_stages == ["llm"]
+
+    async def test_no_deadline_runs_everything(self):
+        calls = []
+        cascade = MatchCascade(make_stages(calls), make_scorer({}), enabled=CORE_STAGES)
+        ctx = await cascade.run(MatchContext(None, "Yesterday", ""))
+        assert calls == ["exact_key", "trigram", "vector", "llm"]
+        assert not ctx.degraded
+
+    def test_earliest(self):
+        assert Deadline.earliest(Deadline(), None).expires_at is None
+        short, long = Deadline(5.0), Deadline(50.0)
+        assert Deadline.earliest(long, short, Deadline()).expires_at == short.expires_at
@@ -0,0 +1,87 @@
+"""
+Unit tests for the Ollama circuit breaker.
+"""
+
+from app.services.circuit_breaker import CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+
+
+def make_breaker(**overrides):
+    options = {
+        "slow_call_seconds": 5.0,
+        "failure_rate_threshold": 0.5,
+        "window_size": 10,
+        "min_calls": 4,
+        "open_seconds": 30.0,
+    }
+    options.update(overrides)
+    return CircuitBreaker("test", **options)
+
+
+class TestCircuitBreaker:
+    """Tests for opening, rejecting and recovering."""
+
+    def test_stays_closed_below_min_calls(self):
+        breaker = make_breaker()
+        for _ in range(3):
+            assert breaker.allow_request()
+            breaker.record_failure()
+        assert breaker.state == CLOSED
+
+    def test_opens_on_failure_rate(self):
+        breaker = make_breaker()
+        for ok in [True, False, True, False]:
+            breaker.allow_request()
+            if ok:
+                breaker.record_success(0.1)
+            else:
+                breaker.record_failure()
+        assert breaker.state == OPEN
+        assert not breaker.available
+        assert not breaker.allow_request()
+        assert breaker.snapshot()["total_rejected"] == 1
+
+    def test_slow_calls_count_as_bad(self):
+        breaker = make_breaker()
+        for _ in range(4):
+            breaker.allow_request()
+            breaker.record_success(10.0)
+        assert breaker.state == OPEN
+
+    def test_half_open_probe_closes_on_success(self):
+        breaker = make_breaker(open_seconds=0.0)
+        for _ in range(4):
+            breaker.allow_request()
+            breaker.record_failure()
+        assert breaker.state == OPEN
+
+        assert breaker.allow_request()
+        assert breaker.state == HALF_OPEN
+        # Only one probe at a time
+        assert not breaker.allow_request()
+
+        breaker.record_success(0.1)
+        assert breaker.state == CLOSED
+        assert breaker.snapshot()["window_calls"] == 0
+
+    def test_half_open_probe_reopens_on_failure(self):
+        breaker = make_breaker(open_seconds=0.0)
+        for _ in range(4):
+            breaker.allow_request()
+            breaker.record_failure()
+
+        assert breaker.allow_request()
+        breaker.record_failure()
+        assert breaker.state == OPEN
+
+    def test_released_probe_lets_next_caller_probe(self):
+        breaker = make_breaker(open_seconds=0.0)
+        for _ in range(4):
+            breaker.allow_request()
+            breaker.record_failure()
+
+        assert breaker.allow_request()
+        assert not breaker.available
+        breaker.release()
+        assert breaker.state == HALF_OPEN
+        assert breaker.available
+        assert breaker.allow_request()
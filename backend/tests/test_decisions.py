@@ -0,0 +1,212 @@
+"""
+Unit tests for the reviewer decision knowledge base.
+"""
+
+import uuid
+from datetime import datetime
+from types import SimpleNamespace
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+from app.api.matches import BulkReviewRequest, bulk_review_matches
+from app.services.cascade import MatchContext
+from app.services.decisions import _latest_per_pair, rebuild_decisions, record_decisions, usage_fingerprint
+from app.services.matching import MatchingService
+
+
+def usage(**fields):
+    values = {"recording_title": None, "recording_artist": None, "work_title": None, "songwriter": None}
+    values.update(fields)
+    return SimpleNamespace(id=1, batch_id=None, **values)
+
+
+def work(work_id, title):
+    return SimpleNamespace(
+        id=work_id, title=title, songwriters=["McCartney, Paul"], alternative_titles=None,
+        title_normalized=None, songwriters_normalized=None
+    )
+
+
+class TestFingerprint:
+    """Tests for usage line fingerprints."""
+
+    def test_ignores_case_and_punctuation(self):
+        a = usage(recording_title="Yesterday!", recording_artist="The Beatles", songwriter="Paul McCartney")
+        b = usage(recording_title="YESTERDAY", recording_artist="the beatles ", songwriter="paul mccartney")
+        assert usage_fingerprint(a) == usage_fingerprint(b)
+
+    def test_fields_not_interchangeable(self):
+        a = usage(recording_title="Yesterday", recording_artist="Beatles")
+        b = usage(recording_title="Yesterday Beatles")
+        assert usage_fingerprint(a) != usage_fingerprint(b)
+
+
+class TestDecisionScoring:
+    """Tests for applying stored decisions to candidates."""
+
+    def test_confirmed_work_is_exact_and_confirmed(self):
+        service = MatchingService(None)
+        ctx = MatchContext(usage(work_title="Yesterdy"), "Yesterdy", "")
+        ctx.decisions = {1: True}
+        service.add_scored_candidate(ctx, work(1, "Yesterday"))["known"] = True
+        service.score_candidates(ctx)
+        assert ctx.best["match_type"] == "exact"
+        assert service.finish_context(ctx)[0].is_confirmed
+
+    def test_rejected_work_never_proposed(self):
+        service = MatchingService(None)
+        ctx = MatchContext(usage(work_title="Yesterday"), "Yesterday", "")
+        ctx.decisions = {1: False}
+        service.add_scored_candidate(ctx, work(1, "Yesterday"))
+        service.add_scored_candidate(ctx, work(2, "Yesterday Once More"))
+        service.score_candidates(ctx)
+        assert [scored["work"].id for scored in ctx.scored] == [2]
+
+
+class TestLatestPerPair:
+    """Tests for collapsing several reviews of one pair into a single upsert row."""
+
+    def test_latest_review_wins(self):
+        earlier = {"fingerprint": "a", "work_id": 1, "is_confirmed": True, "decided_at": datetime(2024, 1, 1)}
+        later = {"fingerprint": "a", "work_id": 1, "is_confirmed": False, "decided_at": datetime(2024, 2, 1)}
+        other = {"fingerprint": "a", "work_id": 2, "is_confirmed": True, "decided_at": datetime(2024, 1, 1)}
+        assert _latest_per_pair([later, other, earlier]) == [later, other]
+
+
+class FakeResult:
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+
+    def all(self):
+        return self.rows
+
+
+class FakeDB:
+    """Session stand-in answering queued results in order and recording statements."""
+
+    def __init__(self, results=()):
+        self.results = list(results)
+        self.statements = []
+
+    async def execute(self, statement, params=None):
+        self.statements.append(statement)
+        return self.results.pop(0) if self.results else FakeResult()
+
+    def expunge_all(self):
+        pass
+
+    async def commit(self):
+        pass
+
+
+def compiled(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def review(match_id, usage_record_id, work_id, is_confirmed, decided_at):
+    return SimpleNamespace(
+        id=match_id, batch_id=None, usage_record_id=usage_record_id, work_id=work_id,
+        is_confirmed=is_confirmed, reviewed_at=decided_at
+    )
+
+
+class TestRecordDecisions:
+    """Tests for storing bulk reviews."""
+
+    async def test_upserts_latest_review_per_pair(self):
+        line = SimpleNamespace(
+            id=5, recording_title="Yesterday", recording_artist="The Beatles", work_title=None, songwriter=None
+        )
+        db = FakeDB([FakeResult([line])])
+        reviews = [
+            review(1, 5, 7, True, datetime(2024, 1, 1)),
+            review(2, 5, 7, False, datetime(2024, 2, 1)),
+        ]
+
+        await record_decisions(db, reviews)
+
+        assert len(db.statements) == 2
+        upsert = db.statements[1].compile(dialect=postgresql.dialect())
+        assert "ON CONFLICT ON CONSTRAINT uq_match_decision_key DO UPDATE" in str(upsert)
+        assert upsert.params["is_confirmed_m0"] is False
+        assert upsert.params["match_result_id_m0"] == 2
+        assert upsert.params["fingerprint_m0"] == usage_fingerprint(line)
+        assert "is_confirmed_m1" not in upsert.params
+
+    async def test_nothing_to_record(self):
+        db = FakeDB()
+        await record_decisions(db, [])
+        assert db.statements == []
+
+
+class TestRebuildDecisions:
+    """Tests for reloading decisions from reviewed matches."""
+
+    async def test_skips_rule_confirmations(self):
+        db = FakeDB()
+        assert await rebuild_decisions(db) == 0
+
+        sql = compiled(db.statements[0])
+        assert "match_results.auto_confirm_rule IS NULL" in sql
+        assert "match_results.reviewed_at IS NOT NULL" in sql
+        assert "match_results.batch_id = usage_records.batch_id" in sql
+
+    async def test_reads_chunks_in_id_order(self):
+        line = usage(recording_title="Yesterday")
+        match = review(9, 1, 7, True, datetime(2024, 1, 1))
+        db = FakeDB([FakeResult([(match, line)])])
+
+        assert await rebuild_decisions(db) == 1
+
+        assert len(db.statements) == 3
+        # The next chunk starts after the last match read
+        next_chunk = db.statements[2].compile(dialect=postgresql.dialect())
+        assert "match_results.id > " in str(next_chunk)
+        assert 9 in next_chunk.params.values()
+
+
+class TestBulkReview:
+    """Tests for selecting the matches a bulk review changes."""
+
+    async def test_filter_only_changes_unreviewed(self):
+        db = FakeDB()
+        request = BulkReviewRequest(
+            action="confirm", batch_id=uuid.uuid4(), match_type="high_confidence",
+            min_confidence=0.8, max_confidence=0.95
+        )
+
+        assert (await bulk_review_matches(request, db=db))["reviewed"] == 0
+
+        sql = compiled(db.statements[0])
+        assert "match_results.is_confirmed = false AND match_results.is_rejected = false" in sql
+        assert "match_results.batch_id = " in sql
+        assert "match_results.match_type = " in sql
+        assert "match_results.confidence_score >= " in sql
+        assert "match_results.confidence_score <= " in sql
+        assert "auto_confirm_rule=" in sql
+
+    async def test_ids_may_change_reviewed_matches(self):
+        db = FakeDB()
+        await bulk_review_matches(BulkReviewRequest(action="reject", match_ids=[1, 2]), db=db)
+
+        sql = compiled(db.statements[0])
+        assert "match_results.id IN " in sql
+        assert "is_confirmed = false AND" not in sql
+        assert "match_results.batch_id = " not in sql
+
+    async def test_reviews_recorded_as_decisions(self):
+        line = SimpleNamespace(
+            id=5, recording_title="Yesterday", recording_artist=None, work_title=None, songwriter=None
+        )
+        db = FakeDB([FakeResult([review(1, 5, 7, True, datetime(2024, 1, 1))]), FakeResult([line])])
+
+        result = await bulk_review_matches(BulkReviewRequest(action="confirm", match_ids=[1]), db=db)
+
+        assert result["reviewed"] == 1
+        assert "match_decisions" in compiled(db.statements[2])
+        assert "UPDATE usage_records" in str(db.statements[3])
+
+    async def test_needs_ids_or_batch(self):
+        with pytest.raises(HTTPException) as error:
+            await bulk_review_matches(BulkReviewRequest(action="confirm"), db=FakeDB())
+        assert error.value.status_code == 400
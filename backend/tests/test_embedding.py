@@ -0,0 +1,155 @@
+"""
+Unit tests for batched embedding requests.
+"""
+
+import asyncio
+from collections import deque
+import httpx
+import pytest
+from app.services import embedding
+from app.services.cascade import Deadline
+from app.services.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from app.services.embedding import EmbeddingService
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.data
+
+
+def fake_client(requests, batch_error=None):
+    """Stand-in for httpx.AsyncClient answering Ollama's embedding endpoints."""
+    class Client:
+        def __init__(self, timeout=None):
+            pass
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def post(self, url, json):
+            requests.append((url.rsplit("/", 1)[-1], json))
+            if url.endswith("/api/embed"):
+                if batch_error is not None:
+                    raise batch_error
+                return FakeResponse({"embeddings": [[float(len(text))] for text in json["input"]]})
+            return FakeResponse({"embedding": [float(len(json["prompt"]))]})
+    return Client
+
+
+def use_fakes(monkeypatch, requests, batch_error=None):
+    monkeypatch.setattr(embedding.httpx, "AsyncClient", fake_client(requests, batch_error))
+    monkeypatch.setattr(
+        embedding, "embedding_breaker", CircuitBreaker("test", slow_call_seconds=60.0, min_calls=100)
+    )
+
+
+class TestBatchEmbeddings:
+    """Tests for embedding several texts in one request."""
+
+    async def test_single_request(self, monkeypatch):
+        requests = []
+        use_fakes(monkeypatch, requests)
+
+        embeddings = await EmbeddingService().get_embeddings_batch(["ab", "", "abcd"])
+
+        assert [endpoint for endpoint, _ in requests] == ["embed"]
+        assert requests[0][1]["input"] == ["ab", "abcd"]
+        assert embeddings == [[2.0], None, [4.0]]
+
+    async def test_failed_batch_falls_back_to_single_requests(self, monkeypatch):
+        requests = []
+        use_fakes(monkeypatch, requests, batch_error=RuntimeError("unsupported endpoint"))
+
+        embeddings = await EmbeddingService().get_embeddings_batch(["ab", "", "abcd"])
+
+        assert [endpoint for endpoint, _ in requests] == ["embed", "embeddings", "embeddings"]
+        assert embeddings == [[2.0], None, [4.0]]
+
+    async def test_short_batch_answer_falls_back(self, monkeypatch):
+        requests = []
+        use_fakes(monkeypatch, requests)
+
+        class ShortClient(fake_client(requests)):
+            async def post(self, url, json):
+                if url.endswith("/api/embed"):
+                    requests.append(("embed", json))
+                    return FakeResponse({"embeddings": [[1.0]]})
+                return await super().post(url, json)
+        monkeypatch.setattr(embedding.httpx, "AsyncClient", ShortClient)
+
+        embeddings = await EmbeddingService().get_embeddings_batch(["ab", "abcd"])
+
+        assert [endpoint for endpoint, _ in requests] == ["embed", "embeddings", "embeddings"]
+        assert embeddings == [[2.0], [4.0]]
+
+
+class TestCancelledProbe:
+    """Tests for a probe request cut short while the circuit is half open."""
+
+    async def test_cancelled_probe_released(self, monkeypatch):
+        requests = []
+        use_fakes(monkeypatch, requests, batch_error=asyncio.CancelledError())
+        breaker = CircuitBreaker("test", slow_call_seconds=60.0, min_calls=1, open_seconds=0.0)
+        breaker.allow_request()
+        breaker.record_failure()
+        monkeypatch.setattr(embedding, "embedding_breaker", breaker)
+
+        with pytest.raises(asyncio.CancelledError):
+            await EmbeddingService().get_embeddings_batch(["ab"])
+
+        assert breaker.state == HALF_OPEN
+        assert breaker.available
+
+
+class TestDeadline:
+    """Tests for embedding requests bounded by the record's deadline."""
+
+    async def test_expired_deadline_skips_request(self, monkeypatch):
+        requests = []
+        use_fakes(monkeypatch, requests)
+        deadline = Deadline(1.0)
+        deadline.expires_at -= 2.0
+
+        embeddings = await EmbeddingService().get_embeddings_batch(["ab", "abcd"], deadline)
+
+        assert requests == []
+        assert embeddings == [None, None]
+        assert embedding.embedding_breaker.outcomes == deque()
+
+    async def test_timeout_capped_by_deadline(self, monkeypatch):
+        requests = []
+        timeouts = []
+        use_fakes(monkeypatch, requests)
+
+        class TimedClient(fake_client(requests)):
+            def __init__(self, timeout=None):
+                timeouts.append(timeout)
+        monkeypatch.setattr(embedding.httpx, "AsyncClient", TimedClient)
+
+        await EmbeddingService().get_embeddings_batch(["ab"], Deadline(5.0))
+        await EmbeddingService().get_embeddings_batch(["ab"])
+
+        assert 4.0 < timeouts[0] <= 5.0
+        assert timeouts[1] == embedding.settings.embedding_timeout_seconds
+
+    async def test_deadline_timeout_leaves_breaker_closed(self, monkeypatch):
+        requests = []
+        use_fakes(monkeypatch, requests, batch_error=httpx.ReadTimeout("timed out"))
+        breaker = CircuitBreaker("test", slow_call_seconds=60.0, min_calls=1, open_seconds=60.0)
+        monkeypatch.setattr(embedding, "embedding_breaker", breaker)
+
+        await EmbeddingService().get_embeddings_batch(["ab"], Deadline(5.0))
+        assert breaker.state == CLOSED
+
+        # Timing out on the configured timeout still counts against Ollama
+        await EmbeddingService().get_embeddings_batch(["ab"])
+        assert breaker.state == OPEN
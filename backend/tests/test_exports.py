@@ -0,0 +1,156 @@
+"""
+Unit tests for streamed exports.
+"""
+
+import csv
+import io
+import json
+from datetime import datetime
+import uuid
+from types import SimpleNamespace
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from app.models import MatchResult
+from app.services import exports
+
+
+def fake_stream_rows(chunks):
+    async def stream_rows(query, sort_columns, chunk_size=exports.EXPORT_CHUNK_SIZE, descending=False):
+        for rows in chunks:
+            yield rows
+    return stream_rows
+
+
+async def collect(iterator):
+    return [chunk async for chunk in iterator]
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+
+class FakeSession:
+    """Session answering one queued chunk per query and tracking whether a transaction is open."""
+
+    def __init__(self, chunks):
+        self.chunks = list(chunks)
+        self.statements = []
+        self.in_transaction = False
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        self.in_transaction = True
+        return FakeResult(self.chunks.pop(0) if self.chunks else [])
+
+    async def commit(self):
+        self.in_transaction = False
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+def match_row(confidence, match_id):
+    return SimpleNamespace(_mapping={"confidence_score": confidence, "match_id": match_id})
+
+
+class TestStreamRows:
+    """Tests for reading exports a keyset chunk at a time."""
+
+    async def test_each_chunk_read_past_the_last(self, monkeypatch):
+        session = FakeSession([[match_row(0.9, 8), match_row(0.9, 5)], [match_row(0.7, 9)]])
+        monkeypatch.setattr(exports, "AsyncSessionLocal", lambda: session)
+        match_id = MatchResult.id.label("match_id")
+        query = select(match_id, MatchResult.confidence_score).where(MatchResult.batch_id == uuid.uuid4())
+
+        chunks = []
+        async for rows in exports.stream_rows(query, (MatchResult.confidence_score, match_id), 2, descending=True):
+            # No transaction is left open while a chunk is sent
+            assert not session.in_transaction
+            chunks.append(len(rows))
+
+        assert chunks == [2, 1]
+        first, second = (statement.compile(dialect=postgresql.dialect()) for statement in session.statements)
+        assert "ORDER BY match_results.confidence_score DESC, match_id DESC" in str(first)
+        assert "(match_results.confidence_score, match_results.id) <" not in str(first)
+        assert "(match_results.confidence_score, match_results.id) <" in str(second)
+        assert 0.9 in second.params.values() and 5 in second.params.values()
+
+    async def test_stops_on_empty_chunk(self, monkeypatch):
+        session = FakeSession([[match_row(0.9, 8), match_row(0.8, 5)], []])
+        monkeypatch.setattr(exports, "AsyncSessionLocal", lambda: session)
+        match_id = MatchResult.id.label("match_id")
+
+        chunks = [rows async for rows in exports.stream_rows(select(match_id), (match_id,), 2)]
+
+        assert len(chunks) == 1
+        assert len(session.statements) == 2
+
+
+class TestStreamCsv:
+    """Tests for incremental CSV writing."""
+
+    async def test_header_is_first_chunk(self, monkeypatch):
+        monkeypatch.setattr(exports, "stream_rows", fake_stream_rows([]))
+        chunks = await collect(exports.stream_csv(None, (), ["A", "B"], list))
+        assert chunks == ["A,B\r\n"]
+
+    async def test_one_chunk_per_partition(self, monkeypatch):
+        partitions = [[(1, "x"), (2, "y")], [(3, "z, quoted")]]
+        monkeypatch.setattr(exports, "stream_rows", fake_stream_rows(partitions))
+        chunks = await collect(exports.stream_csv(None, (), ["Row", "Title"], list))
+
+        assert len(chunks) == 3
+        assert chunks[1] == "1,x\r\n2,y\r\n"
+        rows = list(csv.reader(io.StringIO("".join(chunks))))
+        assert rows == [["Row", "Title"], ["1", "x"], ["2", "y"], ["3", "z, quoted"]]
+
+
+class TestStreamNdjson:
+    """Tests for newline-delimited JSON export."""
+
+    async def test_one_object_per_line(self, monkeypatch):
+        partitions = [[{"id": 1, "at": datetime(2024, 1, 2, 3, 4, 5)}], [{"id": 2, "at": None}]]
+        monkeypatch.setattr(exports, "stream_rows", fake_stream_rows(partitions))
+        text = "".join(await collect(exports.stream_ndjson(None, (), dict)))
+
+        assert [json.loads(line) for line in text.splitlines()] == [
+            {"id": 1, "at": "2024-01-02T03:04:05"},
+            {"id": 2, "at": None},
+        ]
+
+
+class TestStreamParquet:
+    """Tests for Parquet export."""
+
+    async def test_row_group_per_partition(self, monkeypatch):
+        schema = pa.schema([("id", pa.int64()), ("names", pa.list_(pa.string()))])
+        partitions = [
+            [{"id": 1, "names": ["a", "b"]}, {"id": 2, "names": []}],
+            [{"id": 3, "names": None}],
+        ]
+        monkeypatch.setattr(exports, "stream_rows", fake_stream_rows(partitions))
+        data = b"".join(await collect(exports.stream_parquet(None, (), schema, dict)))
+
+        parquet = pq.ParquetFile(io.BytesIO(data))
+        assert parquet.metadata.num_row_groups == 2
+        assert parquet.read().to_pylist() == [
+            {"id": 1, "names": ["a", "b"]},
+            {"id": 2, "names": []},
+            {"id": 3, "names": None},
+        ]
+
+    async def test_empty_result_is_valid_file(self, monkeypatch):
+        schema = pa.schema([("id", pa.int64())])
+        monkeypatch.setattr(exports, "stream_rows", fake_stream_rows([]))
+        data = b"".join(await collect(exports.stream_parquet(None, (), schema, dict)))
+
+        assert pq.ParquetFile(io.BytesIO(data)).read().num_rows == 0
@@ -0,0 +1,89 @@
+"""
+Unit tests for ISWC / work code handling and the identifier fast path.
+"""
+
+from types import SimpleNamespace
+from app.services.cascade import MatchContext
+from app.services.file_processor import FileProcessorService
+from app.services.identifiers import iswc_check_digit, normalize_iswc, normalize_work_code, valid_iswc
+from app.services.matching import MatchingService
+
+
+class TestIswc:
+    """Tests for ISWC normalization and validation."""
+
+    def test_normalize_separators(self):
+        assert normalize_iswc("T-034.524.680-1") == "T0345246801"
+        assert normalize_iswc("t 034 524 680 1") == "T0345246801"
+
+    def test_normalize_rejects_malformed(self):
+        assert normalize_iswc("T-034.524.68-1") is None
+        assert normalize_iswc("034.524.680-1") is None
+        assert normalize_iswc("") is None
+        assert normalize_iswc(None) is None
+
+    def test_check_digit(self):
+        assert iswc_check_digit("034524680") == 1
+        assert valid_iswc("T-034.524.680-1") == "T0345246801"
+        assert valid_iswc("T-034.524.680-2") is None
+
+    def test_work_code(self):
+        assert normalize_work_code(" wrk000001 ") == "WRK000001"
+        assert normalize_work_code("  ") is None
+
+
+class TestIdentifierColumns:
+    """Tests for picking identifier columns out of usage files."""
+
+    def test_columns_detected(self):
+        content = "Work Title|Songwriter|ISWC|Work Code\nYesterday|Paul McCartney|T-034.524.680-1|WRK000001\n"
+        records = FileProcessorService(None).parse_file(content, "usage.txt")
+        assert records[0]["iswc"] == "T-034.524.680-1"
+        assert records[0]["work_code"] == "WRK000001"
+
+    async def test_stored_identifiers_fit_their_columns(self):
+        class FakeDB:
+            def add(self, obj):
+                pass
+
+            async def commit(self):
+                pass
+
+            async def refresh(self, obj):
+                pass
+
+        several = "T-034.524.680-1; T-070.075.566-4; T-010.474.613-2"
+        content = (
+            "Work Title|ISWC|Work Code\n"
+            "Yesterday|T-034.524.680-1| WRK000001 \n"
+            f"Let It Be|{several}|{'X' * 60}\n"
+        )
+        service = FileProcessorService(FakeDB())
+        records = await service.create_usage_records(None, service.parse_file(content, "usage.txt"))
+
+        assert (records[0].iswc, records[0].work_code) == ("T0345246801", "WRK000001")
+        assert (records[1].iswc, records[1].work_code) == (None, None)
+        assert several in records[1].original_row_data.values()
+
+
+class TestIdentifierScoring:
+    """Tests for promoting identifier hits."""
+
+    def score(self, usage_title, work_title):
+        service = MatchingService(None)
+        ctx = MatchContext(SimpleNamespace(id=1), usage_title, "", iswc="T0345246801")
+        work = SimpleNamespace(
+            id=1, title=work_title, songwriters=["Someone"], alternative_titles=None,
+            title_normalized=None, songwriters_normalized=None
+        )
+        service.add_scored_candidate(ctx, work)["identifier"] = "iswc"
+        service.score_candidates(ctx)
+        return ctx.best
+
+    def test_agreeing_title_is_exact(self):
+        best = self.score("Yesterday (Remastered)", "Yesterday")
+        assert best["match_type"] == "exact"
+        assert best["confidence"] == 1.0
+
+    def test_disagreeing_title_not_promoted(self):
+        assert self.score("Stairway to Heaven", "Yesterday") is None
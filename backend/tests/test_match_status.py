@@ -0,0 +1,170 @@
+"""
+Unit tests for the per-record match status.
+"""
+
+import uuid
+from types import SimpleNamespace
+from sqlalchemy.dialects import postgresql
+from app.api.matches import list_unmatched
+from app.services.cascade import MatchCascade
+from app.services.matching import MatchingService
+from app.services.progress import BatchProgress
+from app.services.reviews import refresh_match_status
+
+
+class FakeDB:
+    """Session stand-in recording statements; every query returns no rows."""
+
+    def __init__(self):
+        self.statements = []
+
+    def add(self, obj):
+        pass
+
+    async def flush(self):
+        pass
+
+    async def commit(self):
+        pass
+
+    async def execute(self, statement, params=None):
+        self.statements.append(statement)
+        return SimpleNamespace(all=lambda: [], scalars=lambda: SimpleNamespace(all=lambda: []))
+
+
+def make_service(db, text_scores):
+    """A service whose trigram stage returns one work scored per usage title."""
+    service = MatchingService(db, enforce_deadlines=False)
+    service.cascade = MatchCascade(service.cascade.stages, service.score_candidates, enabled=["trigram"])
+    work = SimpleNamespace(id=1, title="Yesterday", songwriters=["McCartney, Paul"])
+
+    async def find_text(title, songwriter, limit=20):
+        if title not in text_scores:
+            return []
+        title_sim, songwriter_sim = text_scores[title]
+        return [(work, {"title": title_sim, "songwriter": songwriter_sim})]
+    service.find_candidates_by_text = find_text
+    return service
+
+
+def usage(id, title, match_status="unmatched"):
+    return SimpleNamespace(
+        id=id, batch_id=None, work_title=title, recording_title=None, recording_artist=None,
+        songwriter="Paul McCartney", iswc=None, work_code=None, title_embedding=None,
+        match_stage=None, match_status=match_status, is_degraded=False,
+        best_match_id=None, best_confidence=None
+    )
+
+
+TEXT_SCORES = {
+    "Yesterday": (1.0, 1.0),
+    "Yesterdy": (0.75, 0.7),
+}
+
+
+class TestMatchStatus:
+    """Tests for setting and reading usage_records.match_status."""
+
+    async def test_process_batch_sets_status(self):
+        records = [usage(1, "Yesterday"), usage(2, "Yesterdy"), usage(3, "Something Else")]
+
+        results = await make_service(FakeDB(), TEXT_SCORES).process_batch(records)
+
+        assert [r.match_status for r in records] == ["matched", "flagged", "unmatched"]
+        assert (results["matched"], results["flagged"], results["unmatched"]) == (1, 1, 1)
+
+    async def test_rematch_counts_against_previous_status(self):
+        records = [usage(1, "Yesterday", match_status="flagged"), usage(2, "Yesterdy", match_status="flagged")]
+
+        results = await make_service(FakeDB(), TEXT_SCORES).rematch_records(records)
+
+        assert results["matched"] == 1
+        assert results["flagged"] == -1
+        assert results["unmatched"] == 0
+
+    async def test_rematch_counters_committed_with_matches(self):
+        commits = []
+
+        class CommitDB(FakeDB):
+            async def commit(self):
+                commits.append(len(self.statements))
+
+        db = CommitDB()
+        batch_id = uuid.uuid4()
+        progress = BatchProgress(batch_id, 2, flush_seconds=0)
+        records = [usage(1, "Yesterday", match_status="flagged"), usage(2, "Yesterdy", match_status="flagged")]
+
+        await make_service(db, TEXT_SCORES).rematch_records(records, progress=progress)
+
+        assert len(commits) == 1
+        update = db.statements[commits[0] - 1]
+        sql = str(update.compile(dialect=postgresql.dialect()))
+        assert sql.startswith("UPDATE processing_batches")
+        assert "processed_records" not in sql
+        assert (progress.totals["matched"], progress.totals["flagged"], progress.processed) == (1, -1, 0)
+
+    async def test_unmatched_listing_reads_status_column(self):
+        db = FakeDB()
+
+        await list_unmatched(uuid.uuid4(), page=1, page_size=20, cursor=None, count="none", db=db)
+
+        sql = str(db.statements[0].compile(dialect=postgresql.dialect()))
+        assert "usage_records.match_status = " in sql
+        assert "match_results" not in sql
+
+
+class ReviewDB:
+    """Session stand-in whose first statement returns the given status moves."""
+
+    def __init__(self, moves=()):
+        self.results = [list(moves)]
+        self.statements = []
+
+    async def execute(self, statement, params=None):
+        self.statements.append((statement, params))
+        rows = self.results.pop(0) if self.results else []
+        return SimpleNamespace(all=lambda: rows)
+
+
+class TestReviewRefresh:
+    """Tests for keeping record status and batch counters in step with reviews."""
+
+    async def test_nothing_reviewed_runs_nothing(self):
+        db = ReviewDB()
+        assert await refresh_match_status(db, []) == {}
+        assert db.statements == []
+
+    async def test_records_refreshed_in_one_statement(self):
+        batch_id = uuid.uuid4()
+        db = ReviewDB()
+
+        await refresh_match_status(db, [(batch_id, 5), (batch_id, 3), (batch_id, 5)])
+
+        statement, params = db.statements[0]
+        assert params == {"batch_ids": [batch_id, batch_id], "record_ids": [3, 5]}
+        assert "m.is_rejected IS NOT TRUE" in str(statement)
+        assert "COALESCE(best.status, 'unmatched')" in str(statement)
+        # Unchanged statuses leave the counters alone
+        assert len(db.statements) == 1
+
+    async def test_counters_follow_status_moves(self):
+        first, second = uuid.uuid4(), uuid.uuid4()
+        db = ReviewDB([
+            (first, "flagged", "matched"),
+            (first, "flagged", "matched"),
+            (first, "matched", "matched"),
+            (second, "matched", "unmatched"),
+            (second, "unmatched", "matched")
+        ])
+
+        changes = await refresh_match_status(db, [(first, 1), (first, 2), (first, 3), (second, 4), (second, 5)])
+
+        assert changes == {"flagged": -2, "matched": 2}
+        # A batch whose moves cancel out is not updated
+        assert len(db.statements) == 2
+        compiled = db.statements[1][0].compile(dialect=postgresql.dialect())
+        sql = str(compiled)
+        assert sql.startswith("UPDATE processing_batches SET matched_records=(processing_batches.matched_records + ")
+        assert "flagged_records=(processing_batches.flagged_records + " in sql
+        assert first in compiled.params.values()
+        assert {2, -2} <= set(compiled.params.values())
@@ -200,6 +200,262 @@ class TestMatchingScenarios:
         assert expected == pytest.approx(0.855, rel=0.01)
 
 
+class TestConfidenceScore:
+    """Tests for combined confidence scoring."""
+
+    def test_weighted_with_vector(self):
+        score = MatchingService.calculate_confidence(0.6, 0.5, 0.4)
+        assert score == pytest.approx(0.6 * 0.4 + 0.5 * 0.3 + 0.4 * 0.3)
+
+    def test_text_only_rescaled(self):
+        score = MatchingService.calculate_confidence(0.6, 0.5)
+        assert score == pytest.approx((0.6 * 0.4 + 0.5 * 0.3) / 0.7)
+
+    def test_perfect_text_is_conclusive_without_vector(self):
+        score = MatchingService.calculate_confidence(1.0, 1.0)
+        assert score == pytest.approx(1.0)
+
+    def test_boost_capped(self):
+        score = MatchingService.calculate_confidence(1.0, 1.0, 1.0)
+        assert score == 1.0
+
+
+class TestMatchRetention:
+    """Tests for keeping only the top matches of a record."""
+
+    def make_context(self, count):
+        from types import SimpleNamespace
+        from app.services.cascade import MatchContext
+
+        ctx = MatchContext(SimpleNamespace(id=1, batch_id=None), "Yesterday", "")
+        ctx.scored = [
+            {
+                "work": SimpleNamespace(id=i),
+                "confidence": 0.9 - i * 0.01,
+                "match_type": "high_confidence",
+                "title_sim": 0.9,
+                "songwriter_sim": 0.9,
+                "vector_sim": None,
+                "ai_result": None,
+                "known": False
+            }
+            for i in range(count)
+        ]
+        return ctx
+
+    def test_keeps_top_n(self, monkeypatch):
+        monkeypatch.setattr("app.services.matching.settings.max_matches_per_record", 3)
+        matches = MatchingService(None).finish_context(self.make_context(10))
+        assert [m.work_id for m in matches] == [0, 1, 2]
+
+    def test_zero_keeps_all(self, monkeypatch):
+        monkeypatch.setattr("app.services.matching.settings.max_matches_per_record", 0)
+        matches = MatchingService(None).finish_context(self.make_context(10))
+        assert len(matches) == 10
+
+    async def test_adjudicates_only_retained_candidates(self, monkeypatch):
+        monkeypatch.setattr("app.services.matching.settings.max_matches_per_record", 3)
+        monkeypatch.setattr("app.services.matching.settings.use_ai_for_ambiguous", True)
+        monkeypatch.setattr("app.services.matching.settings.ai_review_async", True)
+        ctx = self.make_context(6)
+        for i, scored in enumerate(ctx.scored):
+            scored["match_type"] = "medium_confidence" if i in (1, 4, 5) else "high_confidence"
+            scored["ai_pending"] = False
+            ctx.candidates[scored["work"].id] = scored
+
+        service = MatchingService(None)
+
+        async def no_cached_verdicts(pairs):
+            return {}
+        service.verdict_cache.get_many = no_cached_verdicts
+        await service.adjudicate([ctx])
+
+        assert [work_id for work_id, c in ctx.candidates.items() if c["ai_pending"]] == [1]
+
+
+class TestLazyEmbeddings:
+    """Tests for embedding only the records that reach the vector stage."""
+
+    class FakeDB:
+        def add(self, obj):
+            pass
+
+        async def flush(self):
+            pass
+
+        async def commit(self):
+            pass
+
+    def make_service(self, monkeypatch, embedded):
+        from types import SimpleNamespace
+        from app.services.cascade import MatchCascade
+
+        monkeypatch.setattr("app.services.matching.settings.lazy_usage_embeddings", True)
+        service = MatchingService(self.FakeDB(), enforce_deadlines=False)
+        service.cascade = MatchCascade(
+            service.cascade.stages,
+            service.score_candidates,
+            enabled=["exact_key", "trigram", "vector"]
+        )
+        work = SimpleNamespace(id=1, title="Yesterday", songwriters=["McCartney, Paul"])
+
+        async def find_exact(title, songwriter, limit=20):
+            return [(work, {"title": 1.0, "songwriter": 1.0})] if title == "Yesterday" else []
+
+        async def find_text(title, songwriter, limit=20):
+            return [(work, {"title": 0.7, "songwriter": 0.6})]
+
+        async def find_vector(usage_record, limit=10):
+            return [(work, 0.8)]
+
+        async def get_embeddings_batch(texts, deadline=None):
+            embedded.append(texts)
+            return [[0.1] for _ in texts]
+
+        service.find_candidates_by_exact_title = find_exact
+        service.find_candidates_by_text = find_text
+        service.find_candidates_by_vector = find_vector
+        service.embedding_service.get_embeddings_batch = get_embeddings_batch
+        return service
+
+    @staticmethod
+    def usage(id, title):
+        from types import SimpleNamespace
+        return SimpleNamespace(
+            id=id, batch_id=None, work_title=title, recording_title=title, recording_artist=None,
+            songwriter="Paul McCartney", iswc=None, work_code=None, title_embedding=None,
+            match_stage=None, match_status=None, is_degraded=False,
+            best_match_id=None, best_confidence=None
+        )
+
+    async def test_only_undecided_records_embedded(self, monkeypatch):
+        embedded = []
+        service = self.make_service(monkeypatch, embedded)
+        exact, fuzzy = self.usage(1, "Yesterday"), self.usage(2, "Yesterdy")
+
+        results = await service.process_batch([exact, fuzzy])
+
+        assert len(embedded) == 1
+        assert embedded[0] == [service.embedding_service.normalize_for_embedding("Yesterdy", "Paul McCartney")]
+        assert exact.title_embedding is None
+        assert fuzzy.title_embedding == [0.1]
+        assert exact.match_stage == "exact_key"
+        assert results["embeddings_skipped"] == 1
+
+    async def test_no_request_when_text_decides_everything(self, monkeypatch):
+        embedded = []
+        service = self.make_service(monkeypatch, embedded)
+
+        results = await service.process_batch([self.usage(1, "Yesterday"), self.usage(2, "Yesterday")])
+
+        assert embedded == []
+        assert results["embeddings_skipped"] == 2
+
+    async def test_high_confidence_text_skips_embedding(self, monkeypatch):
+        from types import SimpleNamespace
+
+        embedded = []
+        service = self.make_service(monkeypatch, embedded)
+        works = [SimpleNamespace(id=i, title="Yesterdy", songwriters=["McCartney, Paul"]) for i in (1, 2)]
+
+        async def find_text(title, songwriter, limit=20):
+            # Two near identical candidates: confident, but no clear winner
+            return [(work, {"title": 0.95, "songwriter": 0.95}) for work in works]
+
+        service.find_candidates_by_text = find_text
+        record = self.usage(1, "Yesterdy")
+
+        results = await service.process_batch([record])
+
+        assert embedded == []
+        assert record.title_embedding is None
+        assert results["embeddings_skipped"] == 1
+        assert results["degraded"] == 0
+
+    async def test_deadline_skips_count_as_degraded(self, monkeypatch):
+        embedded = []
+        service = self.make_service(monkeypatch, embedded)
+        service.enforce_deadlines = True
+        monkeypatch.setattr("app.services.matching.settings.record_deadline_seconds", 1e-9)
+
+        results = await service.process_batch([self.usage(1, "Yesterdy")])
+
+        assert embedded == []
+        assert results["embeddings_skipped"] == 0
+        assert results["degraded"] == 1
+
+
+class TestExactTitleCandidates:
+    """Tests for the exact title lookup."""
+
+    async def test_works_fetched_in_one_query(self):
+        from types import SimpleNamespace
+
+        works = [SimpleNamespace(id=1), SimpleNamespace(id=2)]
+        queries = []
+
+        class FakeDB:
+            async def execute(self, statement, params=None):
+                queries.append(str(statement))
+                if len(queries) == 1:
+                    rows = [SimpleNamespace(id=2, songwriter_sim=0.5), SimpleNamespace(id=3, songwriter_sim=None),
+                            SimpleNamespace(id=1, songwriter_sim=None)]
+                    return SimpleNamespace(fetchall=lambda: rows)
+                return SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: works))
+
+        found = await MatchingService(FakeDB()).find_candidates_by_exact_title("Yesterday", "")
+
+        assert [(work.id, scores["songwriter"]) for work, scores in found] == [(2, 0.5), (1, 0.0)]
+        assert len(queries) == 2
+        assert "works.id IN" in queries[1]
+
+
+class TestTextAndVectorCandidates:
+    """Tests for the trigram and vector candidate lookups."""
+
+    @staticmethod
+    def make_db(rows, queries):
+        from types import SimpleNamespace
+
+        works = [SimpleNamespace(id=1), SimpleNamespace(id=2)]
+
+        class FakeDB:
+            async def execute(self, statement, params=None):
+                queries.append(str(statement))
+                if len(queries) == 1:
+                    return SimpleNamespace(fetchall=lambda: rows)
+                return SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: works))
+
+        return FakeDB()
+
+    async def test_text_works_fetched_in_one_query(self):
+        from types import SimpleNamespace
+
+        queries = []
+        rows = [SimpleNamespace(id=2, title_sim=0.9, songwriter_sim=None), SimpleNamespace(id=3, title_sim=0.8, songwriter_sim=0.5),
+                SimpleNamespace(id=1, title_sim=0.7, songwriter_sim=0.4)]
+
+        found = await MatchingService(self.make_db(rows, queries)).find_candidates_by_text("Yesterday", "")
+
+        assert [(work.id, scores["title"], scores["songwriter"]) for work, scores in found] == [(2, 0.9, 0.0), (1, 0.7, 0.4)]
+        assert len(queries) == 2
+        assert "works.id IN" in queries[1]
+
+    async def test_vector_works_fetched_in_one_query(self):
+        from types import SimpleNamespace
+
+        queries = []
+        rows = [SimpleNamespace(id=1, similarity=0.9), SimpleNamespace(id=3, similarity=0.8),
+                SimpleNamespace(id=2, similarity=0.7)]
+        usage = SimpleNamespace(title_embedding=[0.1])
+
+        found = await MatchingService(self.make_db(rows, queries)).find_candidates_by_vector(usage)
+
+        assert [(work.id, similarity) for work, similarity in found] == [(1, 0.9), (2, 0.7)]
+        assert len(queries) == 2
+        assert "works.id IN" in queries[1]
+
+
 class TestEdgeCases:
     """Tests for edge cases and special characters."""
 
@@ -0,0 +1,91 @@
+"""
+Unit tests for the MinHash LSH title index.
+"""
+
+from types import SimpleNamespace
+import pytest
+from app.services.minhash import MinHashLSH, TitleIndex, shingles, title_keys, work_title_texts
+
+
+def build_index():
+    index = MinHashLSH(num_perm=64, bands=16)
+    titles = {
+        1: "hotel california",
+        2: "bohemian rhapsody",
+        3: "stairway to heaven",
+        4: "smells like teen spirit",
+        5: "hotel yorba",
+    }
+    for key, title in titles.items():
+        index.add(key, title)
+    return index
+
+
+class TestMinHashLSH:
+    """Tests for indexing and querying."""
+
+    def test_exact_title_found(self):
+        results = build_index().query("bohemian rhapsody")
+        assert results[0] == (2, 1.0)
+
+    def test_noisy_title_found(self):
+        results = build_index().query("bohemian rapsody")
+        assert results and results[0][0] == 2
+
+    def test_unrelated_title_not_found(self):
+        assert build_index().query("purple rain", min_similarity=0.3) == []
+
+    def test_remove(self):
+        index = build_index()
+        index.remove(2)
+        assert len(index) == 4
+        assert all(key != 2 for key, _ in index.query("bohemian rhapsody"))
+
+    def test_signature_deterministic(self):
+        a, b = MinHashLSH(seed=3), MinHashLSH(seed=3)
+        assert (a.signature("yesterday") == b.signature("yesterday")).all()
+        assert a.signature("") is None
+
+    def test_bands_must_divide_permutations(self):
+        with pytest.raises(ValueError):
+            MinHashLSH(num_perm=64, bands=10)
+
+
+class TestTitleKeys:
+    """Tests for query and index keys of raw titles."""
+
+    def test_version_suffix_variant(self):
+        assert title_keys("Hotel California (Live)") == ["hotel california live", "hotel california"]
+        assert title_keys("Yesterday") == ["yesterday"]
+        assert title_keys(None) == []
+
+    def test_suffix_stripped_title_found(self):
+        index = build_index()
+        best = max(
+            (result for key in title_keys("Hotel California (Remastered 2013)") for result in index.query(key)),
+            key=lambda result: result[1]
+        )
+        assert best == (1, 1.0)
+
+    def test_shingles_padded(self):
+        assert shingles("ab") == {" ab", "ab "}
+
+
+class TestAlternativeTitles:
+    """Tests for indexing every title of a work."""
+
+    def test_work_title_texts(self):
+        texts = work_title_texts("Yesterday (Remastered)", ["Scrambled Eggs", "Yesterday"])
+        assert texts == ["yesterday", "scrambled eggs"]
+
+    def test_alternative_title_found_and_replaced(self):
+        titles = TitleIndex()
+        titles.index = MinHashLSH(num_perm=64, bands=16)
+        work = SimpleNamespace(id=7, title="Yesterday", alternative_titles=["Scrambled Eggs"])
+        titles.add_work(work)
+        assert titles.work_ids(titles.index.query("scrambled eggs")) == [(7, 1.0)]
+
+        work.alternative_titles = []
+        titles.add_work(work)
+        assert titles.work_ids(titles.index.query("scrambled eggs")) == []
+        assert titles.work_ids(titles.index.query("yesterday")) == [(7, 1.0)]
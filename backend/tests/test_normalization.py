@@ -0,0 +1,66 @@
+"""
+Unit tests for text normalization and precomputed similarity features.
+"""
+
+from types import SimpleNamespace
+from rapidfuzz import fuzz
+from app.services.matching import MatchingService
+from app.services.normalization import (
+    build_features, normalize_text, work_features, work_title_features
+)
+
+
+class TestNormalizer:
+    """Tests for the memoized normalizer."""
+
+    def test_matches_service_normalizer(self):
+        for text in ["  HELLO,  World!  ", "Don't Stop", "", None]:
+            assert normalize_text(text) == MatchingService.normalize_text(text)
+
+    def test_memoized(self):
+        normalize_text("Memo Test Title!")
+        from app.services.normalization import _normalize
+        hits = _normalize.cache_info().hits
+        normalize_text("Memo Test Title!")
+        assert _normalize.cache_info().hits == hits + 1
+
+
+class TestFeatures:
+    """Tests for building and scoring with precomputed features."""
+
+    def test_build_features(self):
+        features = build_features("Let It Be!", ["McCartney, Paul", ""])
+        assert features.title == "let it be"
+        assert features.sorted_tokens == "be it let"
+        assert features.token_set == frozenset({"let", "it", "be"})
+        assert features.songwriters == ("mccartney paul",)
+
+    def test_work_features_use_stored_columns(self):
+        work = SimpleNamespace(
+            title="Ignored", songwriters=["Ignored"],
+            title_normalized="let it be ", songwriters_normalized=["mccartney paul"]
+        )
+        features = work_features(work)
+        assert features.title == "let it be"
+        assert features.songwriters == ("mccartney paul",)
+
+    def test_work_title_features_include_alternatives(self):
+        work = SimpleNamespace(
+            title="Yesterday", songwriters=["McCartney, Paul"],
+            title_normalized=None, songwriters_normalized=None,
+            alternative_titles=["Scrambled Eggs", "YESTERDAY"]
+        )
+        titles = work_title_features(work)
+        assert [features.title for features in titles] == ["yesterday", "scrambled eggs"]
+        assert titles[1].songwriters == titles[0].songwriters
+
+    def test_sorted_tokens_equal_token_sort_ratio(self):
+        a, b = build_features("Rhapsody Bohemian live"), build_features("Bohemian Rhapsody")
+        assert fuzz.ratio(a.sorted_tokens, b.sorted_tokens) == fuzz.token_sort_ratio(a.title, b.title)
+
+    def test_feature_similarity_matches_string_similarity(self):
+        pairs = [("Yesterday (Remastered)", "Yesterday"), ("Stairway to Heaven", "Highway to Hell")]
+        for title1, title2 in pairs:
+            assert MatchingService.title_similarity(
+                build_features(title1), build_features(title2)
+            ) == MatchingService.calculate_title_similarity(title1, title2)
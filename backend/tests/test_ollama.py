@@ -0,0 +1,241 @@
+"""
+Unit tests for LLM prompt batching in the Ollama service.
+"""
+
+import asyncio
+import json
+import re
+import httpx
+import pytest
+from app.services import ollama
+from app.services.cascade import Deadline, DeadlineExceeded
+from app.services.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from app.services.ollama import OllamaService
+
+
+def make_candidates(records: int, works: int):
+    return [
+        {
+            "usage_record_id": r,
+            "usage_title": f"Usage {r}",
+            "usage_songwriter": "Writer",
+            "work_id": w,
+            "work_title": f"Work {w}",
+            "work_songwriters": ["Writer, A"],
+            "similarity_scores": {"title": 0.8, "songwriter": 0.6, "vector": None}
+        }
+        for r in range(records)
+        for w in range(works)
+    ]
+
+
+def fake_ranking_model(calls, skip=None):
+    """Fake generation that answers every candidate of every entry in a ranking prompt."""
+    async def generate(prompt, num_predict=200, num_ctx=None, deadline=None):
+        calls.append(prompt)
+        blocks = re.split(r"^ENTRY \d+:", prompt, flags=re.M)[1:]
+        if not blocks:
+            return '{"is_match": false, "confidence": 0.1, "reasoning": "single"}'
+        entries = []
+        for e, block in enumerate(blocks, start=1):
+            count = len(re.findall(r"^\s+\[\d+\]", block, flags=re.M))
+            entries.append({
+                "entry": e,
+                "verdicts": [
+                    {"candidate": c, "is_match": c == 1, "confidence": 0.9, "reasoning": f"e{e}c{c}"}
+                    for c in range(1, count + 1)
+                    if (e, c) != skip
+                ]
+            })
+        return json.dumps({"entries": entries})
+    return generate
+
+
+class TestRankingMode:
+    """Tests for multi-candidate ranking prompts."""
+
+    async def test_one_prompt_for_many_candidates(self):
+        service = OllamaService()
+        service.ranking_mode = True
+        calls = []
+        service._generate = fake_ranking_model(calls)
+
+        results = await service.analyze_batch_matches(make_candidates(3, 3))
+
+        assert len(calls) == 1
+        assert [r["reasoning"] for r in results[:3]] == ["e1c1", "e1c2", "e1c3"]
+        assert results[0]["is_match"] and not results[1]["is_match"]
+        assert results[4]["usage_record_id"] == 1 and results[4]["work_id"] == 1
+
+    async def test_missing_verdict_left_unresolved(self):
+        service = OllamaService()
+        service.ranking_mode = True
+        calls = []
+        service._generate = fake_ranking_model(calls, skip=(1, 2))
+
+        results = await service.analyze_batch_matches(make_candidates(1, 3))
+
+        assert len(calls) == 1
+        assert results[1]["error"]
+        assert results[1]["reasoning"] == "No verdict in AI ranking response"
+        assert not results[0].get("error") and not results[2].get("error")
+
+    async def test_failed_ranking_prompt_not_retried_per_candidate(self):
+        service = OllamaService()
+        service.ranking_mode = True
+        calls = []
+
+        async def failing(prompt, num_predict=200, num_ctx=None, deadline=None):
+            calls.append(prompt)
+            raise RuntimeError("circuit open")
+        service._generate = failing
+
+        results = await service.analyze_batch_matches(make_candidates(2, 3))
+
+        assert len(calls) == 1
+        assert all(result["error"] for result in results)
+        assert results[0]["reasoning"] == "AI ranking error: circuit open"
+
+    async def test_single_mode_one_prompt_per_candidate(self):
+        service = OllamaService()
+        service.ranking_mode = False
+        calls = []
+        service._generate = fake_ranking_model(calls)
+
+        await service.analyze_batch_matches(make_candidates(2, 2))
+
+        assert len(calls) == 4
+
+
+class TestPromptPacking:
+    """Tests for packing records into prompts by token budget."""
+
+    def test_packs_within_budget(self, monkeypatch):
+        service = OllamaService()
+        entries = [
+            {"usage_title": f"Usage {i}", "usage_songwriter": "Writer", "candidates": make_candidates(1, 3)}
+            for i in range(10)
+        ]
+        monkeypatch.setattr("app.services.ollama.settings.ai_prompt_token_budget", 10_000)
+        assert service.pack_ranking_entries(entries) == [list(range(10))]
+
+        monkeypatch.setattr("app.services.ollama.settings.ai_prompt_token_budget", 0)
+        assert service.pack_ranking_entries(entries) == [[i] for i in range(10)]
+
+
+class TestCancelledCall:
+    """Tests for an LLM call cancelled while it is the half-open probe."""
+
+    async def test_cancelled_probe_released(self, monkeypatch):
+        class Client:
+            def __init__(self, timeout=None):
+                pass
+
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+            async def post(self, url, json):
+                raise asyncio.CancelledError()
+
+        breaker = CircuitBreaker("test", slow_call_seconds=60.0, min_calls=1, open_seconds=0.0)
+        breaker.allow_request()
+        breaker.record_failure()
+        monkeypatch.setattr(ollama, "llm_breaker", breaker)
+        monkeypatch.setattr(ollama.httpx, "AsyncClient", Client)
+
+        with pytest.raises(asyncio.CancelledError):
+            await OllamaService()._generate("prompt")
+
+        assert breaker.state == HALF_OPEN
+        assert breaker.available
+
+
+def expired_deadline() -> Deadline:
+    deadline = Deadline(1.0)
+    deadline.expires_at -= 2.0
+    return deadline
+
+
+class TestDeadline:
+    """Tests for LLM calls bounded by the record or batch deadline."""
+
+    def use_client(self, monkeypatch, timeouts):
+        class Client:
+            def __init__(self, timeout=None):
+                timeouts.append(timeout)
+
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+            async def post(self, url, json):
+                response = httpx.Response(200, json={"response": "{}"})
+                response.request = httpx.Request("POST", url)
+                return response
+        monkeypatch.setattr(ollama.httpx, "AsyncClient", Client)
+        monkeypatch.setattr(ollama, "llm_breaker", CircuitBreaker("test", slow_call_seconds=60.0))
+
+    async def test_timeout_capped_by_deadline(self, monkeypatch):
+        timeouts = []
+        self.use_client(monkeypatch, timeouts)
+
+        await OllamaService()._generate("prompt", deadline=Deadline(5.0))
+        await OllamaService()._generate("prompt")
+
+        assert 4.0 < timeouts[0] <= 5.0
+        assert timeouts[1] == ollama.settings.llm_timeout_seconds
+
+    async def test_expired_deadline_skips_call(self, monkeypatch):
+        timeouts = []
+        self.use_client(monkeypatch, timeouts)
+        service = OllamaService()
+
+        with pytest.raises(DeadlineExceeded):
+            await service._generate("prompt", deadline=expired_deadline())
+
+        assert timeouts == []
+        assert service.calls == 0
+        assert len(ollama.llm_breaker.outcomes) == 0
+
+    async def test_expired_deadline_gives_error_verdicts(self, monkeypatch):
+        timeouts = []
+        self.use_client(monkeypatch, timeouts)
+        service = OllamaService()
+        service.ranking_mode = True
+
+        results = await service.analyze_batch_matches(make_candidates(2, 2), expired_deadline())
+
+        assert timeouts == []
+        assert all(result["error"] for result in results)
+
+    async def test_deadline_timeout_leaves_breaker_closed(self, monkeypatch):
+        class HungClient:
+            def __init__(self, timeout=None):
+                pass
+
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, *exc):
+                return False
+
+            async def post(self, url, json):
+                raise httpx.ReadTimeout("timed out")
+        breaker = CircuitBreaker("test", slow_call_seconds=60.0, min_calls=1, open_seconds=60.0)
+        monkeypatch.setattr(ollama.httpx, "AsyncClient", HungClient)
+        monkeypatch.setattr(ollama, "llm_breaker", breaker)
+
+        for _ in range(3):
+            with pytest.raises(httpx.ReadTimeout):
+                await OllamaService()._generate("prompt", deadline=Deadline(5.0))
+        assert breaker.state == CLOSED
+
+        # Timing out on the configured timeout still counts against Ollama
+        with pytest.raises(httpx.ReadTimeout):
+            await OllamaService()._generate("prompt")
+        assert breaker.state == OPEN
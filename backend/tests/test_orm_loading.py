@@ -0,0 +1,63 @@
+"""
+Unit tests for keeping embedding columns out of ordinary ORM reads.
+"""
+
+from sqlalchemy import inspect, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import load_only
+from app.api.matches import USAGE_INFO_COLUMNS, WORK_INFO_COLUMNS
+from app.api.works import HAS_EMBEDDING, WORK_RESPONSE_COLUMNS, work_response
+from app.models import UsageRecord, Work
+
+WORK_EMBEDDINGS = ("title_embedding", "songwriter_embedding", "combined_embedding")
+
+
+def selected_columns(statement) -> str:
+    """The SELECT list of a compiled statement."""
+    sql = str(statement.compile(dialect=postgresql.dialect()))
+    return sql.split(" FROM ", 1)[0]
+
+
+class TestDeferredEmbeddings:
+    """Tests for the embedding column mappings."""
+
+    def test_work_embeddings_deferred_with_raiseload(self):
+        for name in WORK_EMBEDDINGS:
+            prop = inspect(Work).attrs[name]
+            assert prop.deferred
+            assert ("raiseload", True) in prop.strategy_key
+
+    def test_plain_select_skips_embeddings(self):
+        columns = selected_columns(select(Work))
+        assert "works.title" in columns
+        for name in WORK_EMBEDDINGS:
+            assert name not in columns
+
+    def test_usage_title_embedding_still_loaded(self):
+        columns = selected_columns(select(UsageRecord))
+        assert "usage_records.title_embedding" in columns
+        assert "songwriter_embedding" not in columns
+
+
+class TestProjections:
+    """Tests for the column lists list endpoints load."""
+
+    def test_work_listing_selects_presence_only(self):
+        columns = selected_columns(
+            select(Work, HAS_EMBEDDING).options(load_only(*WORK_RESPONSE_COLUMNS))
+        )
+        assert "works.combined_embedding IS NOT NULL AS has_embedding" in columns
+        assert "works.combined_embedding," not in columns
+        assert "works.title_embedding" not in columns
+        assert "works.genre" in columns
+
+    def test_match_listing_columns_exclude_embeddings(self):
+        names = {column.key for column in WORK_INFO_COLUMNS + USAGE_INFO_COLUMNS}
+        assert not {name for name in names if name.endswith("embedding")}
+
+    def test_work_response_reports_presence(self):
+        work = Work(
+            id=1, work_code="WRK000001", title="Yesterday", songwriters=["McCartney, Paul"]
+        )
+        assert work_response(work, has_embedding=True).has_embedding is True
+        assert work_response(work, has_embedding=None).has_embedding is False
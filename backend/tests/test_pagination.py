@@ -0,0 +1,63 @@
+"""
+Unit tests for keyset pagination helpers.
+"""
+
+from datetime import datetime
+from decimal import Decimal
+from uuid import UUID
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+from app.api.pagination import decode_cursor, encode_cursor, keyset_page, page_results, parse_datetime
+from app.models import MatchResult
+
+
+class TestCursor:
+    """Tests for encoding and decoding cursors."""
+
+    def test_round_trip(self):
+        values = [Decimal("0.8512"), datetime(2024, 5, 1, 12, 30), UUID(int=7), 42]
+        cursor = encode_cursor(values)
+        assert decode_cursor(cursor, (Decimal, parse_datetime, UUID, int)) == values
+
+    def test_invalid_cursor_rejected(self):
+        with pytest.raises(HTTPException) as error:
+            decode_cursor("not a cursor", (int,))
+        assert error.value.status_code == 400
+
+    def test_wrong_arity_rejected(self):
+        with pytest.raises(HTTPException):
+            decode_cursor(encode_cursor([1, 2]), (int,))
+
+
+class TestKeysetPage:
+    """Tests for building pages."""
+
+    def compile(self, query):
+        return str(query.compile(dialect=postgresql.dialect()))
+
+    def test_cursor_seeks_instead_of_offset(self):
+        query = keyset_page(
+            select(MatchResult),
+            (MatchResult.confidence_score, MatchResult.id),
+            (Decimal, int),
+            page=5, page_size=20, cursor=encode_cursor([Decimal("0.9"), 10]),
+            descending=True
+        )
+        sql = self.compile(query)
+        assert "(match_results.confidence_score, match_results.id) < " in sql
+        assert "OFFSET" not in sql
+        assert "ORDER BY match_results.confidence_score DESC, match_results.id DESC" in sql
+
+    def test_page_without_cursor_uses_offset(self):
+        query = keyset_page(
+            select(MatchResult), (MatchResult.id,), (int,), page=3, page_size=20, cursor=None
+        )
+        assert "OFFSET" in self.compile(query)
+
+    def test_page_results_look_ahead(self):
+        rows, next_cursor = page_results([1, 2, 3], 2, lambda row: (row,))
+        assert rows == [1, 2]
+        assert decode_cursor(next_cursor, (int,)) == [2]
+        assert page_results([1, 2], 2, lambda row: (row,)) == ([1, 2], None)
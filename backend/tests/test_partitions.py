@@ -0,0 +1,313 @@
+"""
+Unit tests for batch partitions and the composite keys they require.
+"""
+
+import uuid
+from collections import namedtuple
+from types import SimpleNamespace
+import pytest
+from sqlalchemy import inspect, select
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.dialects import postgresql
+from app.api.matches import ReviewRequest, review_match
+from app.models import MatchResult, UsageRecord
+from app.services import ai_review
+from app.services import exports
+from app.services import partitions
+from app.services.ai_review import AIReviewWorker
+from app.services.file_processor import FileProcessorService
+from app.services.exports import stream_rows
+from app.services.partitions import create_batch_partitions, drop_batch_partitions
+
+
+class FakeResult:
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+
+    def fetchall(self):
+        return self.rows
+
+    def all(self):
+        return self.rows
+
+    def scalar_one_or_none(self):
+        return self.rows[0] if self.rows else None
+
+
+class FakeDB:
+    """Session stand-in answering queued results in order and recording calls."""
+
+    def __init__(self, results=()):
+        self.results = list(results)
+        self.calls = []
+
+    def add(self, obj):
+        self.calls.append("add")
+
+    async def execute(self, statement, params=None):
+        self.calls.append(statement)
+        return self.results.pop(0) if self.results else FakeResult()
+
+    async def get(self, model, key):
+        self.calls.append(("get", model, key))
+        return SimpleNamespace(
+            id=key[0], recording_title="Yesterday", recording_artist=None, work_title=None, songwriter=None
+        )
+
+    async def commit(self):
+        self.calls.append("commit")
+
+    async def flush(self):
+        pass
+
+    def begin_nested(self):
+        return self
+
+    async def refresh(self, obj):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+def compiled(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+class TestPartitionFunctions:
+    """Tests for creating and dropping a batch's partitions."""
+
+    async def test_create_and_drop_call_sql_functions(self):
+        db = FakeDB()
+        batch_id = uuid.uuid4()
+
+        await create_batch_partitions(db, batch_id)
+        await drop_batch_partitions(db, batch_id)
+
+        created, dropped = (statement.compile(dialect=postgresql.dialect()) for statement in db.calls)
+        assert str(created).startswith("SELECT create_batch_partitions(")
+        assert str(dropped).startswith("SELECT drop_batch_partitions(")
+        assert list(created.params.values()) == [batch_id]
+        assert list(dropped.params.values()) == [batch_id]
+
+    async def test_partitions_created_with_batch(self):
+        db = FakeDB()
+
+        batch = await FileProcessorService(db).create_batch("usage.csv", 10)
+
+        statement = next(call for call in db.calls if not isinstance(call, str))
+        assert "create_batch_partitions" in compiled(statement)
+        assert batch.id in statement.compile(dialect=postgresql.dialect()).params.values()
+        # Created in the same transaction as the batch row
+        assert db.calls.index(statement) < db.calls.index("commit")
+
+
+def db_error(sqlstate):
+    orig = Exception("canceling statement")
+    orig.sqlstate = sqlstate
+    return DBAPIError("SELECT drop_batch_partitions()", {}, orig)
+
+
+class FlakyDB(FakeDB):
+    """Session whose first statements fail with the given errors."""
+
+    def __init__(self, errors):
+        super().__init__()
+        self.errors = list(errors)
+
+    async def execute(self, statement, params=None):
+        self.calls.append(statement)
+        if self.errors:
+            raise self.errors.pop(0)
+        return FakeResult()
+
+
+class TestLockRetry:
+    """Tests for partition DDL giving way to long reads."""
+
+    @pytest.fixture(autouse=True)
+    def no_pause(self, monkeypatch):
+        pauses = []
+
+        async def sleep(seconds):
+            pauses.append(seconds)
+        monkeypatch.setattr(partitions.asyncio, "sleep", sleep)
+        monkeypatch.setattr(partitions.settings, "partition_lock_retries", 2)
+        monkeypatch.setattr(partitions.settings, "partition_lock_retry_seconds", 1.0)
+        return pauses
+
+    async def test_retries_after_lock_timeout(self, no_pause):
+        db = FlakyDB([db_error("55P03"), db_error("55P03")])
+
+        await drop_batch_partitions(db, uuid.uuid4())
+
+        assert len(db.calls) == 3
+        assert no_pause == [1.0, 2.0]
+
+    async def test_gives_up_after_last_retry(self, no_pause):
+        db = FlakyDB([db_error("55P03")] * 3)
+
+        with pytest.raises(DBAPIError):
+            await create_batch_partitions(db, uuid.uuid4())
+        assert len(db.calls) == 3
+
+    async def test_other_errors_not_retried(self, no_pause):
+        db = FlakyDB([db_error("42P01")])
+
+        with pytest.raises(DBAPIError):
+            await drop_batch_partitions(db, uuid.uuid4())
+        assert len(db.calls) == 1
+        assert no_pause == []
+
+
+class LockingDB(FakeDB):
+    """Session that holds a lock on the partitioned parents from reading them until commit.
+
+    Partition DDL fails with a lock timeout while another session in
+    ``holders`` has read a parent and not yet committed.
+    """
+
+    def __init__(self, holders, results=()):
+        super().__init__(results)
+        self.holders = holders
+
+    async def execute(self, statement, params=None):
+        sql = compiled(statement)
+        if "_batch_partitions(" in sql:
+            if self.holders - {self}:
+                raise db_error("55P03")
+        elif "usage_records" in sql or "match_results" in sql:
+            self.holders.add(self)
+        return await super().execute(statement, params)
+
+    async def get(self, model, key):
+        return None
+
+    async def commit(self):
+        self.holders.discard(self)
+        await super().commit()
+
+    async def rollback(self):
+        self.holders.discard(self)
+
+
+ReviewRow = namedtuple("ReviewRow", ["AIReviewTask", "MatchResult", "UsageRecord", "Work"])
+
+
+class VerdictlessCache:
+    def __init__(self, db):
+        self.db = db
+
+    @staticmethod
+    def make_usage_key(title, songwriter):
+        return f"{title}|{songwriter}"
+
+    async def get_many(self, pairs):
+        return {}
+
+    async def put(self, usage_key, work, verdict):
+        pass
+
+
+class TestPartitionsBesideReads:
+    """Tests for creating partitions while reviews and exports are under way."""
+
+    @pytest.fixture(autouse=True)
+    def no_retries(self, monkeypatch):
+        monkeypatch.setattr(partitions.settings, "partition_lock_retries", 0)
+
+    async def test_create_while_llm_reviews(self, monkeypatch):
+        holders = set()
+        batch_id = uuid.uuid4()
+        row = ReviewRow(
+            AIReviewTask=SimpleNamespace(id=1, batch_id=batch_id, attempts=1, status="processing", last_error=None),
+            MatchResult=SimpleNamespace(
+                id=1, batch_id=batch_id, match_type="pending_ai", confidence_score=0.75,
+                title_similarity=0.8, songwriter_similarity=0.6, vector_similarity=None,
+                ai_reasoning=None, is_confirmed=False, is_rejected=False
+            ),
+            UsageRecord=SimpleNamespace(
+                id=1, batch_id=batch_id, work_title="Yesterday", recording_title=None, songwriter="McCartney",
+                match_status="flagged", best_match_id=None, best_confidence=None
+            ),
+            Work=SimpleNamespace(id=7, title="Yesterday", songwriters=["McCartney, Paul"])
+        )
+        worker_db = LockingDB(holders, [
+            FakeResult([SimpleNamespace(id=1)]),
+            FakeResult([row]),
+            FakeResult([SimpleNamespace(id=1)]),
+        ])
+        monkeypatch.setattr(ai_review, "AsyncSessionLocal", lambda: worker_db)
+        monkeypatch.setattr(ai_review, "VerdictCache", lambda db, model, prompt_version: VerdictlessCache(db))
+        created = []
+
+        class CreatingOllama:
+            model = "test"
+            prompt_version = "test"
+            calls = 0
+            call_seconds = 0.0
+
+            async def analyze_batch_matches(self, candidates):
+                # An upload arrives while the LLM is answering
+                await create_batch_partitions(LockingDB(holders), uuid.uuid4())
+                created.append(True)
+                return [{"is_match": True, "confidence": 0.9, "reasoning": "same work"}]
+
+        await AIReviewWorker().process_next(CreatingOllama())
+
+        assert created == [True]
+        assert row.MatchResult.match_type == "ai_matched"
+
+    async def test_create_while_export_streams(self, monkeypatch):
+        holders = set()
+        export_db = LockingDB(holders, [
+            FakeResult([SimpleNamespace(_mapping={"id": 1}), SimpleNamespace(_mapping={"id": 2})]),
+            FakeResult([SimpleNamespace(_mapping={"id": 3})]),
+        ])
+        monkeypatch.setattr(exports, "AsyncSessionLocal", lambda: export_db)
+        query = select(UsageRecord.id).where(UsageRecord.batch_id == uuid.uuid4())
+
+        chunks = []
+        async for rows in stream_rows(query, (UsageRecord.id,), chunk_size=2):
+            chunks.append(len(rows))
+            # An upload arrives between two chunks of a download
+            await create_batch_partitions(LockingDB(holders), uuid.uuid4())
+
+        assert chunks == [2, 1]
+
+
+class TestCompositeKeys:
+    """Tests for reaching partitioned rows by (id, batch_id)."""
+
+    def test_primary_keys_include_batch(self):
+        for model in (UsageRecord, MatchResult):
+            assert [column.name for column in inspect(model).primary_key] == ["id", "batch_id"]
+
+    def test_match_references_usage_record_in_same_batch(self):
+        constraint = next(
+            fk for fk in MatchResult.__table__.foreign_key_constraints
+            if fk.referred_table is UsageRecord.__table__
+        )
+        assert [column.name for column in constraint.columns] == ["usage_record_id", "batch_id"]
+
+    async def test_review_queue_joins_on_batch(self, monkeypatch):
+        db = FakeDB([FakeResult([SimpleNamespace(id=1)])])
+        monkeypatch.setattr(ai_review, "AsyncSessionLocal", lambda: db)
+
+        assert await AIReviewWorker().process_next(SimpleNamespace(model="test", prompt_version="test")) == 0
+
+        sql = compiled(db.calls[2])
+        assert "match_results.id = ai_review_queue.match_result_id AND match_results.batch_id = ai_review_queue.batch_id" in sql
+        assert "usage_records.id = match_results.usage_record_id AND usage_records.batch_id = match_results.batch_id" in sql
+
+    async def test_review_loads_usage_record_by_composite_key(self):
+        batch_id = uuid.uuid4()
+        match = MatchResult(id=3, batch_id=batch_id, usage_record_id=5, work_id=7)
+        db = FakeDB([FakeResult([match])])
+
+        await review_match(3, ReviewRequest(action="confirm"), db=db)
+
+        assert ("get", UsageRecord, (5, batch_id)) in db.calls
@@ -0,0 +1,98 @@
+"""
+Unit tests for phonetic candidate blocking.
+"""
+
+from types import SimpleNamespace
+from app.services.cascade import STAGE_COSTS, MatchContext
+from app.services.matching import MatchingService
+from app.services.songwriters import parse_songwriters
+
+
+class FakeDB:
+    """Session stand-in answering the key query with fixed work ids, then the works that exist."""
+
+    def __init__(self, ids, works):
+        self.ids = ids
+        self.works = works
+        self.queries = []
+
+    async def execute(self, statement, params=None):
+        self.queries.append((str(statement), params))
+        if len(self.queries) == 1:
+            rows = [SimpleNamespace(id=work_id) for work_id in self.ids]
+            return SimpleNamespace(fetchall=lambda: rows)
+        return SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: self.works))
+
+
+def work(id, title, songwriters):
+    return SimpleNamespace(
+        id=id, title=title, songwriters=songwriters, alternative_titles=None,
+        title_normalized=None, songwriters_normalized=None
+    )
+
+
+class TestFindCandidatesByPhonetic:
+    """Tests for the phonetic key query."""
+
+    async def test_nothing_to_block_on(self):
+        db = FakeDB([1], [work(1, "Yesterday", [])])
+        assert await MatchingService(db).find_candidates_by_phonetic("  ", []) == []
+        assert db.queries == []
+
+    async def test_passes_normalized_title_and_surnames(self):
+        db = FakeDB([], [])
+        await MatchingService(db).find_candidates_by_phonetic("Yesterdae!", ["mccartney"], limit=7)
+
+        sql, params = db.queries[0]
+        assert "phonetic_keys" in sql
+        assert params == {"title": "yesterdae", "surnames": ["mccartney"], "max_works": 1000, "limit": 7}
+
+    async def test_common_codes_capped_without_per_row_count(self, monkeypatch):
+        monkeypatch.setattr("app.services.matching.settings.phonetic_code_max_works", 50)
+        db = FakeDB([], [])
+        await MatchingService(db).find_candidates_by_phonetic("Love Song", ["smith"])
+
+        sql, params = db.queries[0]
+        assert params["max_works"] == 50
+        # Each code reads at most one work past the cap, and codes over it are dropped
+        assert sql.count("LIMIT :max_works + 1") == 2
+        assert sql.count("HAVING COUNT(*) <= :max_works") == 2
+        assert "unnest(w." not in sql
+
+    async def test_keeps_query_order_and_skips_missing_works(self):
+        works = [work(1, "Yesterday", []), work(2, "Yesterday Once More", [])]
+        db = FakeDB([2, 3, 1], works)
+
+        found = await MatchingService(db).find_candidates_by_phonetic("Yesterdae", [])
+
+        assert [w.id for w in found] == [2, 1]
+        # The works are fetched together rather than one at a time
+        assert len(db.queries) == 2
+        assert "works.id IN" in db.queries[1][0]
+
+
+class TestPhoneticStage:
+    """Tests for the phonetic cascade stage."""
+
+    def test_runs_between_trigram_and_songwriter(self):
+        assert STAGE_COSTS["trigram"] < STAGE_COSTS["phonetic"] < STAGE_COSTS["songwriter"]
+
+    async def test_scores_sound_alike_candidates(self):
+        service = MatchingService(None)
+        requested = []
+        yesterday = work(1, "Yesterday", ["McCartney, Paul"])
+
+        async def find_phonetic(title, surnames, limit=20):
+            requested.append((title, surnames))
+            return [yesterday]
+        service.find_candidates_by_phonetic = find_phonetic
+
+        ctx = MatchContext(None, "Yesterdae", "Paul Macartney")
+        await service._run_phonetic_stage(ctx)
+
+        expected_keys = sorted(parse_songwriters("Paul Macartney")[0].surname_keys)
+        assert requested == [("Yesterdae", expected_keys)]
+        candidate = ctx.candidates[1]
+        assert candidate["work"] is yesterday
+        assert 0 < candidate["title_sim"] < 1
+        assert candidate["songwriter_sim"] > 0
@@ -0,0 +1,184 @@
+"""
+Unit tests for throttled batch progress and its subscribers.
+"""
+
+import asyncio
+import uuid
+import pytest
+from sqlalchemy.dialects import postgresql
+from app.services.file_processor import FileProcessorService
+from app.services.progress import BATCH_COUNTERS, BatchProgress, ProgressBus, SUBSCRIBER_QUEUE_SIZE
+
+
+class FakeDB:
+    """Session stand-in recording the statements it is given."""
+
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+
+
+class UploadDB(FakeDB):
+    """Session stand-in for an upload, answering every query with nothing."""
+
+    def __init__(self):
+        super().__init__()
+        self.rollbacks = 0
+
+    def add(self, obj):
+        pass
+
+    async def execute(self, statement, params=None):
+        self.statements.append(statement)
+
+    async def commit(self):
+        pass
+
+    async def rollback(self):
+        self.rollbacks += 1
+
+    async def refresh(self, obj):
+        pass
+
+    def begin_nested(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+UPLOAD = "work_title,songwriter\nYesterday,Paul McCartney\n"
+
+
+def results(total, matched=0):
+    counts = {key: 0 for key in BATCH_COUNTERS}
+    counts.update(matched=matched, unmatched=total - matched, total=total)
+    return counts
+
+
+class TestBatchProgress:
+    """Tests for in-memory counters and their flushes."""
+
+    def test_due_after_rows(self):
+        progress = BatchProgress(uuid.uuid4(), 100, flush_seconds=60, flush_rows=20)
+        progress.add(results(10))
+        assert not progress.due()
+        progress.add(results(10))
+        assert progress.due()
+
+    def test_due_after_interval(self):
+        progress = BatchProgress(uuid.uuid4(), 100, flush_seconds=0, flush_rows=1000)
+        assert progress.due()
+
+    async def test_flush_writes_once_per_interval(self):
+        db = FakeDB()
+        progress = BatchProgress(uuid.uuid4(), 100, flush_seconds=60, flush_rows=20)
+        for _ in range(4):
+            progress.add(results(10, matched=4))
+            if progress.due():
+                await progress.flush(db)
+
+        assert len(db.statements) == 2
+        assert progress.pending["matched"] == 0
+        assert progress.totals["matched"] == 16
+
+    async def test_report_once_per_flush(self):
+        db = FakeDB()
+        progress = BatchProgress(uuid.uuid4(), 40, flush_seconds=60, flush_rows=20)
+        progress.add(results(10, matched=10))
+        assert progress.report() is None
+
+        await progress.flush(db)
+        event = progress.report()
+        assert event["processed"] == 10
+        assert event["matched"] == 10
+        assert event["percentage"] == 25.0
+        assert progress.report() is None
+
+    async def test_flush_without_new_records_writes_nothing(self):
+        db = FakeDB()
+        await BatchProgress(uuid.uuid4(), 10).flush(db)
+        assert db.statements == []
+
+
+class TestProgressBus:
+    """Tests for fanning progress out to subscribers."""
+
+    async def test_every_subscriber_gets_events(self):
+        bus = ProgressBus()
+        batch_id = uuid.uuid4()
+        bus.publish(batch_id, {"stage": "matching"})
+
+        async def follow():
+            return [event["stage"] async for event in bus.subscribe(batch_id)]
+
+        followers = [asyncio.create_task(follow()) for _ in range(2)]
+        await asyncio.sleep(0)
+        bus.publish(batch_id, {"stage": "matching_progress"})
+        bus.publish(batch_id, {"stage": "complete"})
+
+        for stages in await asyncio.gather(*followers):
+            assert stages == ["matching", "matching_progress", "complete"]
+        assert not bus.active(batch_id)
+        assert not bus._subscribers
+
+    async def test_slow_subscriber_drops_oldest(self):
+        bus = ProgressBus()
+        batch_id = uuid.uuid4()
+        bus.publish(batch_id, {"stage": "matching_progress", "processed": 0})
+        events = bus.subscribe(batch_id)
+        first = await events.__anext__()
+
+        for processed in range(1, SUBSCRIBER_QUEUE_SIZE + 11):
+            bus.publish(batch_id, {"stage": "matching_progress", "processed": processed})
+        bus.publish(batch_id, {"stage": "complete"})
+
+        received = [event async for event in events]
+        assert first["processed"] == 0
+        assert len(received) == SUBSCRIBER_QUEUE_SIZE
+        assert received[-1]["stage"] == "complete"
+
+
+class TestInterruptedUpload:
+    """Tests for an upload whose client goes away mid-batch."""
+
+    async def start_upload(self, monkeypatch):
+        bus = ProgressBus()
+        monkeypatch.setattr("app.services.file_processor.progress_bus", bus)
+        db = UploadDB()
+        upload = FileProcessorService(db).process_file(UPLOAD, "usage.csv")
+        assert (await upload.__anext__())["stage"] == "parsing"
+        parsed = await upload.__anext__()
+        return bus, db, upload, uuid.UUID(parsed["batch_id"])
+
+    @staticmethod
+    def assert_marked_failed(db):
+        sql = db.statements[-1].compile(dialect=postgresql.dialect())
+        assert str(sql).startswith("UPDATE processing_batches")
+        assert sql.params["status"] == "failed"
+        assert db.rollbacks == 1
+
+    async def test_closed_generator_ends_followers_and_fails_batch(self, monkeypatch):
+        bus, db, upload, batch_id = await self.start_upload(monkeypatch)
+        follower = bus.subscribe(batch_id)
+        assert (await follower.__anext__())["stage"] == "parsed"
+
+        await upload.aclose()
+
+        assert (await follower.__anext__())["stage"] == "error"
+        assert not bus.active(batch_id)
+        self.assert_marked_failed(db)
+
+    async def test_cancelled_upload_ends_followers_and_fails_batch(self, monkeypatch):
+        bus, db, upload, batch_id = await self.start_upload(monkeypatch)
+
+        with pytest.raises(asyncio.CancelledError):
+            await upload.athrow(asyncio.CancelledError())
+
+        assert not bus.active(batch_id)
+        self.assert_marked_failed(db)
@@ -0,0 +1,53 @@
+"""
+Unit tests for songwriter credit parsing.
+"""
+
+from app.services.songwriters import parse_songwriters, split_songwriters, surname_keys
+
+
+class TestSplitSongwriters:
+    """Tests for splitting composite songwriter fields."""
+
+    def test_comma_separated_names(self):
+        assert split_songwriters("Jimmy Page, Robert Plant") == ["Jimmy Page", "Robert Plant"]
+
+    def test_slash(self):
+        assert split_songwriters("Lennon/McCartney") == ["Lennon", "McCartney"]
+
+    def test_surname_first(self):
+        assert split_songwriters("McCartney, Paul") == ["Paul McCartney"]
+
+    def test_surname_first_pairs(self):
+        assert split_songwriters("Lennon, John, McCartney, Paul") == ["John Lennon", "Paul McCartney"]
+
+    def test_word_separators(self):
+        assert split_songwriters("Ashford and Simpson") == ["Ashford", "Simpson"]
+        assert split_songwriters("Drake feat. Rihanna") == ["Drake", "Rihanna"]
+
+    def test_empty(self):
+        assert split_songwriters("") == []
+        assert split_songwriters(None) == []
+
+
+class TestSurnameKeys:
+    """Tests for surname extraction."""
+
+    def test_surname_is_last_word(self):
+        parsed = parse_songwriters("Paul McCartney")
+        assert parsed[0].name == "paul mccartney"
+        assert parsed[0].surname_keys == {"mccartney"}
+
+    def test_suffix_skipped(self):
+        assert parse_songwriters("Sammy Davis Jr.")[0].surname_keys == {"davis"}
+
+    def test_initials(self):
+        assert parse_songwriters("F. Mercury")[0].surname_keys == {"mercury"}
+
+    def test_hyphenated_credit(self):
+        assert parse_songwriters("Lennon-McCartney")[0].surname_keys == {
+            "lennon", "mccartney", "lennonmccartney"
+        }
+
+    def test_catalog_keys(self):
+        assert surname_keys(["McCartney, Paul", "Lennon, John"]) == {"mccartney", "lennon"}
+        assert surname_keys(None) == set()
@@ -0,0 +1,72 @@
+"""
+Unit tests for the persistent LLM verdict cache.
+"""
+
+from datetime import datetime
+from decimal import Decimal
+from types import SimpleNamespace
+from sqlalchemy.dialects import postgresql
+from app.services.verdict_cache import VerdictCache
+
+
+class FakeDB:
+    """Session stand-in returning fixed verdict rows and recording statements."""
+
+    def __init__(self, verdicts=()):
+        self.verdicts = list(verdicts)
+        self.statements = []
+
+    async def execute(self, statement, params=None):
+        self.statements.append(statement)
+        return SimpleNamespace(scalars=lambda: SimpleNamespace(all=lambda: self.verdicts))
+
+
+def work(id, title="Yesterday", songwriters=("McCartney, Paul",), updated_at=None):
+    return SimpleNamespace(id=id, title=title, songwriters=list(songwriters), updated_at=updated_at)
+
+
+def verdict(usage_key, work_id, fingerprint):
+    return SimpleNamespace(
+        usage_key=usage_key, work_id=work_id, work_fingerprint=fingerprint, is_match=True,
+        confidence=Decimal("0.9000"), reasoning="same work", created_at=datetime.utcnow()
+    )
+
+
+class TestWorkFingerprint:
+    """Tests for telling when a work changed in a way verdicts depend on."""
+
+    def test_ignores_unrelated_changes(self):
+        before = work(1, updated_at=datetime(2024, 1, 1))
+        after = work(1, updated_at=datetime(2024, 6, 1))
+        assert VerdictCache.work_fingerprint(before) == VerdictCache.work_fingerprint(after)
+
+    def test_changes_with_title_or_songwriters(self):
+        fingerprint = VerdictCache.work_fingerprint(work(1))
+        assert VerdictCache.work_fingerprint(work(1, title="Yesterday (Remix)")) != fingerprint
+        assert VerdictCache.work_fingerprint(work(1, songwriters=["Lennon, John"])) != fingerprint
+
+
+class TestGetMany:
+    """Tests for looking up the verdicts of many candidates at once."""
+
+    async def test_one_query_for_all_candidates(self):
+        current, changed, uncached = work(1), work(2), work(3)
+        db = FakeDB([
+            verdict("a", 1, VerdictCache.work_fingerprint(current)),
+            verdict("a", 2, VerdictCache.work_fingerprint(work(2, title="Old Title"))),
+        ])
+        cache = VerdictCache(db, model="test", prompt_version="v1")
+
+        found = await cache.get_many([("a", current), ("a", changed), ("b", uncached)])
+
+        assert len(db.statements) == 1
+        sql = str(db.statements[0].compile(dialect=postgresql.dialect()))
+        assert "(ai_verdict_cache.usage_key, ai_verdict_cache.work_id) IN" in sql
+        assert list(found) == [("a", 1)]
+        assert found[("a", 1)] == {"is_match": True, "confidence": 0.9, "reasoning": "same work"}
+        assert (cache.hits, cache.misses) == (1, 2)
+
+    async def test_nothing_to_look_up(self):
+        db = FakeDB()
+        assert await VerdictCache(db).get_many([]) == {}
+        assert db.statements == []
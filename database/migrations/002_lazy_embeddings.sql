@@ -0,0 +1,2 @@
+-- Track how many usage embeddings were skipped because text matching was conclusive
+ALTER TABLE processing_batches ADD COLUMN IF NOT EXISTS embeddings_skipped INTEGER DEFAULT 0;
@@ -0,0 +1,4 @@
+-- Record which matching cascade stage decided each usage record
+ALTER TABLE usage_records ADD COLUMN IF NOT EXISTS match_stage VARCHAR(50);
+
+CREATE INDEX IF NOT EXISTS idx_usage_match_stage ON usage_records(batch_id, match_stage);
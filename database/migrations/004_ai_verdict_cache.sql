@@ -0,0 +1,21 @@
+-- Persistent cache of LLM match verdicts. A verdict goes stale when the
+-- work's title or songwriters change, not on every write to the work:
+-- works.updated_at is bumped by embedding generation and backfills too.
+CREATE TABLE IF NOT EXISTS ai_verdict_cache (
+    id SERIAL PRIMARY KEY,
+    usage_key VARCHAR(64) NOT NULL, -- sha256 of normalized usage title + songwriter
+    work_id INTEGER NOT NULL REFERENCES works(id) ON DELETE CASCADE,
+    model VARCHAR(100) NOT NULL,
+    prompt_version VARCHAR(32) NOT NULL,
+    is_match BOOLEAN NOT NULL,
+    confidence DECIMAL(5, 4) NOT NULL,
+    reasoning TEXT,
+    work_fingerprint VARCHAR(64), -- sha256 of the work title + songwriters the verdict was made on
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT uq_ai_verdict_key UNIQUE (usage_key, work_id, model, prompt_version)
+);
+
+CREATE INDEX IF NOT EXISTS idx_ai_verdict_work ON ai_verdict_cache(work_id);
+
+ALTER TABLE processing_batches ADD COLUMN IF NOT EXISTS ai_cache_hits INTEGER DEFAULT 0;
+ALTER TABLE processing_batches ADD COLUMN IF NOT EXISTS ai_cache_misses INTEGER DEFAULT 0;
@@ -0,0 +1,18 @@
+-- Persistent queue of ambiguous matches waiting for LLM adjudication
+CREATE TABLE IF NOT EXISTS ai_review_queue (
+    id SERIAL PRIMARY KEY,
+    match_result_id INTEGER NOT NULL REFERENCES match_results(id) ON DELETE CASCADE,
+    usage_record_id INTEGER NOT NULL,
+    batch_id UUID NOT NULL,
+    status VARCHAR(20) DEFAULT 'pending', -- 'pending', 'processing', 'done', 'failed'
+    attempts INTEGER DEFAULT 0,
+    last_error TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_ai_review_pending ON ai_review_queue(id) WHERE status = 'pending';
+CREATE INDEX IF NOT EXISTS idx_ai_review_batch_status ON ai_review_queue(batch_id, status);
+CREATE INDEX IF NOT EXISTS idx_ai_review_match ON ai_review_queue(match_result_id);
+
+ALTER TABLE processing_batches ADD COLUMN IF NOT EXISTS ai_reviews_queued INTEGER DEFAULT 0;
@@ -0,0 +1,7 @@
+-- Per-batch LLM usage, used to enforce AI_MAX_CALLS_PER_BATCH / AI_MAX_SECONDS_PER_BATCH
+ALTER TABLE processing_batches ADD COLUMN IF NOT EXISTS ai_skipped INTEGER DEFAULT 0;
+ALTER TABLE processing_batches ADD COLUMN IF NOT EXISTS ai_calls INTEGER DEFAULT 0;
+ALTER TABLE processing_batches ADD COLUMN IF NOT EXISTS ai_seconds DOUBLE PRECISION DEFAULT 0;
+
+-- ai_review_queue.status gains 'skipped': reviews given up on because their
+-- batch's LLM budget ran out, leaving the match medium_confidence
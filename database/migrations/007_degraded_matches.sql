@@ -0,0 +1,5 @@
+-- Records matched without their optional stages to meet a deadline
+ALTER TABLE usage_records ADD COLUMN IF NOT EXISTS is_degraded BOOLEAN DEFAULT FALSE;
+CREATE INDEX IF NOT EXISTS idx_usage_records_degraded ON usage_records(batch_id) WHERE is_degraded;
+
+ALTER TABLE processing_batches ADD COLUMN IF NOT EXISTS degraded_records INTEGER DEFAULT 0;
@@ -0,0 +1,23 @@
+-- Denormalized pointer to each usage record's highest confidence match.
+-- No foreign key: match_results rows are rewritten and pruned independently.
+ALTER TABLE usage_records ADD COLUMN IF NOT EXISTS best_match_id INTEGER;
+ALTER TABLE usage_records ADD COLUMN IF NOT EXISTS best_confidence DECIMAL(5,4);
+
+CREATE INDEX IF NOT EXISTS idx_usage_best_confidence ON usage_records(batch_id, best_confidence DESC);
+
+-- Backfill existing batches
+UPDATE usage_records u
+SET best_match_id = b.id, best_confidence = b.confidence_score
+FROM (
+    SELECT DISTINCT ON (usage_record_id) usage_record_id, id, confidence_score
+    FROM match_results
+    ORDER BY usage_record_id, confidence_score DESC, id
+) b
+WHERE b.usage_record_id = u.id AND u.best_match_id IS NULL;
+
+-- Existing rows beyond MAX_MATCHES_PER_RECORD are left in place; to prune them:
+-- DELETE FROM match_results m USING (
+--     SELECT id, row_number() OVER (PARTITION BY usage_record_id ORDER BY confidence_score DESC, id) AS rank
+--     FROM match_results
+-- ) r
+-- WHERE r.id = m.id AND r.rank > 5 AND NOT m.is_confirmed AND NOT m.is_rejected;
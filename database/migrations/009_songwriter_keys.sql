@@ -0,0 +1,99 @@
+-- Surname -> work inverted index used by the songwriter blocking stage,
+-- kept in step with works.songwriters by a trigger
+CREATE TABLE IF NOT EXISTS work_songwriter_keys (
+    surname_key VARCHAR(200) NOT NULL,
+    work_id INTEGER NOT NULL REFERENCES works(id) ON DELETE CASCADE,
+    PRIMARY KEY (surname_key, work_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_work_songwriter_keys_work ON work_songwriter_keys(work_id);
+
+-- Surname keys of songwriter credits. Mirrors surname_keys() in
+-- app/services/songwriters.py, which parses usage songwriters into the
+-- keys looked up here; change both together.
+CREATE OR REPLACE FUNCTION songwriter_surname_keys(songwriters TEXT[])
+RETURNS TEXT[] AS $$
+DECLARE
+    credit TEXT;
+    part TEXT;
+    pieces TEXT[];
+    names TEXT[];
+    name TEXT;
+    words TEXT[];
+    surname TEXT;
+    keys TEXT[] := '{}';
+BEGIN
+    FOREACH credit IN ARRAY COALESCE(songwriters, '{}') LOOP
+        CONTINUE WHEN credit IS NULL;
+        -- Separators that always delimit names in a composite credit
+        FOR part IN
+            SELECT regexp_split_to_table(
+                credit, '\s*[/;&+|]\s*|\s+(?:and|feat\.?|ft\.?|featuring)\s+', 'i'
+            )
+        LOOP
+            pieces := ARRAY(
+                SELECT regexp_replace(piece, '^\s+|\s+$', '', 'g')
+                FROM unnest(string_to_array(part, ',')) AS piece
+                WHERE piece ~ '\S'
+            );
+            IF cardinality(pieces) = 2 AND pieces[1] !~ '\s' THEN
+                -- "McCartney, Paul"
+                names := ARRAY[pieces[2] || ' ' || pieces[1]];
+            ELSIF cardinality(pieces) >= 2 AND cardinality(pieces) % 2 = 0
+                AND NOT EXISTS (SELECT 1 FROM unnest(pieces) AS piece WHERE piece ~ '\s') THEN
+                -- "Lennon, John, McCartney, Paul"
+                names := ARRAY(
+                    SELECT pieces[i + 1] || ' ' || pieces[i]
+                    FROM generate_series(1, cardinality(pieces), 2) AS i
+                );
+            ELSE
+                names := pieces;
+            END IF;
+
+            FOREACH name IN ARRAY names LOOP
+                -- The surname is the last word that isn't a suffix such as "Jr"
+                words := ARRAY(
+                    SELECT word
+                    FROM regexp_split_to_table(name, '\s+') AS word
+                    WHERE word <> ''
+                      AND btrim(normalize_text(word)) NOT IN ('jr', 'sr', 'ii', 'iii', 'iv')
+                );
+                CONTINUE WHEN cardinality(words) = 0
+                    OR btrim(normalize_text(array_to_string(words, ' '))) = '';
+                surname := words[cardinality(words)];
+                keys := keys
+                    || btrim(normalize_text(surname))
+                    || ARRAY(
+                        SELECT btrim(normalize_text(surname_part))
+                        FROM unnest(string_to_array(surname, '-')) AS surname_part
+                    );
+            END LOOP;
+        END LOOP;
+    END LOOP;
+
+    RETURN ARRAY(SELECT DISTINCT key FROM unnest(keys) AS key WHERE length(key) >= 2);
+END;
+$$ LANGUAGE plpgsql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION sync_work_songwriter_keys()
+RETURNS TRIGGER AS $$
+BEGIN
+    DELETE FROM work_songwriter_keys WHERE work_id = NEW.id;
+    INSERT INTO work_songwriter_keys (surname_key, work_id)
+    SELECT key, NEW.id
+    FROM unnest(songwriter_surname_keys(NEW.songwriters)) AS key
+    ON CONFLICT DO NOTHING;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS works_songwriter_keys_trigger ON works;
+CREATE TRIGGER works_songwriter_keys_trigger
+    AFTER INSERT OR UPDATE OF songwriters ON works
+    FOR EACH ROW
+    EXECUTE FUNCTION sync_work_songwriter_keys();
+
+INSERT INTO work_songwriter_keys (surname_key, work_id)
+SELECT key, w.id
+FROM works w, unnest(songwriter_surname_keys(w.songwriters)) AS key
+ON CONFLICT DO NOTHING;
@@ -0,0 +1,69 @@
+-- Phonetic (Double Metaphone) blocking keys for work titles and songwriter surnames
+CREATE EXTENSION IF NOT EXISTS fuzzystrmatch;
+CREATE EXTENSION IF NOT EXISTS unaccent;
+
+-- Primary and alternate Double Metaphone codes of each word, skipping
+-- one-letter words and words too common to narrow a search
+CREATE OR REPLACE FUNCTION phonetic_keys(words TEXT[])
+RETURNS TEXT[] AS $$
+    SELECT COALESCE(ARRAY(
+        SELECT DISTINCT code
+        FROM unnest(words) AS word,
+             LATERAL (VALUES (dmetaphone(unaccent(word))), (dmetaphone_alt(unaccent(word)))) AS codes(code)
+        WHERE length(word) > 1
+          AND lower(word) <> ALL (ARRAY[
+              'the', 'an', 'of', 'and', 'in', 'on', 'to', 'my', 'me', 'you', 'is', 'it',
+              'for', 'with', 'de', 'la', 'le', 'el', 'feat', 'ft', 'live', 'remastered',
+              'remaster', 'version', 'remix', 'edit', 'mix', 'radio'
+          ])
+          AND code <> ''
+    ), '{}')
+$$ LANGUAGE sql STABLE;
+
+-- Surnames of songwriter credits: the part before the comma of
+-- "Surname, Given", otherwise the last word; hyphenated surnames are split
+CREATE OR REPLACE FUNCTION songwriter_surnames(songwriters TEXT[])
+RETURNS TEXT[] AS $$
+    SELECT COALESCE(ARRAY(
+        SELECT part
+        FROM unnest(songwriters) AS sw,
+             LATERAL regexp_split_to_table(
+                 CASE WHEN position(',' IN sw) > 0
+                      THEN btrim(split_part(sw, ',', 1))
+                      ELSE regexp_replace(btrim(sw), '^.*\s', '')
+                 END,
+                 '-'
+             ) AS part
+        WHERE part <> ''
+    ), '{}')
+$$ LANGUAGE sql IMMUTABLE;
+
+ALTER TABLE works ADD COLUMN IF NOT EXISTS title_phonetic TEXT[];
+ALTER TABLE works ADD COLUMN IF NOT EXISTS songwriter_phonetic TEXT[];
+
+-- Runs after works_normalize_trigger (triggers fire in name order)
+CREATE OR REPLACE FUNCTION update_works_phonetic()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.title_phonetic := phonetic_keys(regexp_split_to_array(NEW.title_normalized, '\s+'));
+    NEW.songwriter_phonetic := phonetic_keys(songwriter_surnames(NEW.songwriters));
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS works_phonetic_trigger ON works;
+CREATE TRIGGER works_phonetic_trigger
+    BEFORE INSERT OR UPDATE OF title, songwriters ON works
+    FOR EACH ROW
+    EXECUTE FUNCTION update_works_phonetic();
+
+-- Backfill without touching updated_at
+ALTER TABLE works DISABLE TRIGGER works_normalize_trigger;
+UPDATE works SET
+    title_phonetic = phonetic_keys(regexp_split_to_array(title_normalized, '\s+')),
+    songwriter_phonetic = phonetic_keys(songwriter_surnames(songwriters))
+WHERE title_phonetic IS NULL;
+ALTER TABLE works ENABLE TRIGGER works_normalize_trigger;
+
+CREATE INDEX IF NOT EXISTS idx_works_title_phonetic ON works USING gin(title_phonetic);
+CREATE INDEX IF NOT EXISTS idx_works_songwriter_phonetic ON works USING gin(songwriter_phonetic);
@@ -0,0 +1,68 @@
+-- Expanded title -> work lookup covering primary and alternative titles
+CREATE TABLE IF NOT EXISTS work_titles (
+    id SERIAL PRIMARY KEY,
+    work_id INTEGER NOT NULL REFERENCES works(id) ON DELETE CASCADE,
+    title VARCHAR(500) NOT NULL,
+    title_normalized VARCHAR(500) NOT NULL,
+    is_primary BOOLEAN NOT NULL DEFAULT FALSE,
+    CONSTRAINT uq_work_titles_work_title UNIQUE (work_id, title_normalized)
+);
+
+CREATE INDEX IF NOT EXISTS idx_work_titles_normalized ON work_titles(title_normalized);
+CREATE INDEX IF NOT EXISTS idx_work_titles_trgm ON work_titles USING gin(title_normalized gin_trgm_ops);
+
+-- Keep work_titles in step with works.title / works.alternative_titles
+CREATE OR REPLACE FUNCTION sync_work_titles()
+RETURNS TRIGGER AS $$
+BEGIN
+    DELETE FROM work_titles WHERE work_id = NEW.id;
+    INSERT INTO work_titles (work_id, title, title_normalized, is_primary)
+    SELECT NEW.id, t.title, btrim(normalize_text(t.title)), t.ord = 1
+    FROM unnest(ARRAY[NEW.title] || COALESCE(NEW.alternative_titles, '{}')) WITH ORDINALITY AS t(title, ord)
+    WHERE btrim(normalize_text(COALESCE(t.title, ''))) <> ''
+    ORDER BY t.ord
+    ON CONFLICT (work_id, title_normalized) DO NOTHING;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS works_titles_trigger ON works;
+CREATE TRIGGER works_titles_trigger
+    AFTER INSERT OR UPDATE OF title, alternative_titles ON works
+    FOR EACH ROW
+    EXECUTE FUNCTION sync_work_titles();
+
+INSERT INTO work_titles (work_id, title, title_normalized, is_primary)
+SELECT w.id, t.title, btrim(normalize_text(t.title)), t.ord = 1
+FROM works w,
+     unnest(ARRAY[w.title] || COALESCE(w.alternative_titles, '{}')) WITH ORDINALITY AS t(title, ord)
+WHERE btrim(normalize_text(COALESCE(t.title, ''))) <> ''
+ORDER BY w.id, t.ord
+ON CONFLICT (work_id, title_normalized) DO NOTHING;
+
+-- Phonetic title keys cover alternative titles too
+CREATE OR REPLACE FUNCTION update_works_phonetic()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.title_phonetic := phonetic_keys(regexp_split_to_array(
+        normalize_text(array_to_string(ARRAY[NEW.title] || COALESCE(NEW.alternative_titles, '{}'), ' ')),
+        '\s+'
+    ));
+    NEW.songwriter_phonetic := phonetic_keys(songwriter_surnames(NEW.songwriters));
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS works_phonetic_trigger ON works;
+CREATE TRIGGER works_phonetic_trigger
+    BEFORE INSERT OR UPDATE OF title, songwriters, alternative_titles ON works
+    FOR EACH ROW
+    EXECUTE FUNCTION update_works_phonetic();
+
+ALTER TABLE works DISABLE TRIGGER works_normalize_trigger;
+UPDATE works SET title_phonetic = phonetic_keys(regexp_split_to_array(
+    normalize_text(array_to_string(ARRAY[title] || alternative_titles, ' ')),
+    '\s+'
+))
+WHERE cardinality(alternative_titles) > 0;
+ALTER TABLE works ENABLE TRIGGER works_normalize_trigger;
@@ -0,0 +1,18 @@
+-- Direct lookup of usage rows by ISWC or work code
+
+-- ISWC as "T" followed by ten digits, NULL when the stored value isn't shaped
+-- like one. Kept in step with app.services.identifiers.normalize_iswc.
+ALTER TABLE works ADD COLUMN IF NOT EXISTS iswc_normalized VARCHAR(11)
+    GENERATED ALWAYS AS (
+        CASE WHEN upper(regexp_replace(iswc, '[\s.\-]', '', 'g')) ~ '^T[0-9]{10}$'
+             THEN upper(regexp_replace(iswc, '[\s.\-]', '', 'g'))
+        END
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_works_iswc_normalized ON works(iswc_normalized)
+    WHERE iswc_normalized IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_works_work_code_upper ON works(upper(work_code));
+
+-- Identifiers carried by the usage file, as given
+ALTER TABLE usage_records ADD COLUMN IF NOT EXISTS iswc VARCHAR(20);
+ALTER TABLE usage_records ADD COLUMN IF NOT EXISTS work_code VARCHAR(50);
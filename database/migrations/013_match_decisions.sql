@@ -0,0 +1,15 @@
+-- Reviewer decisions keyed by usage line fingerprint, checked before matching
+CREATE TABLE IF NOT EXISTS match_decisions (
+    id SERIAL PRIMARY KEY,
+    fingerprint VARCHAR(64) NOT NULL, -- sha256 of normalized recording title, artist, work title, songwriter
+    work_id INTEGER NOT NULL REFERENCES works(id) ON DELETE CASCADE,
+    is_confirmed BOOLEAN NOT NULL, -- FALSE: rejected
+    match_result_id INTEGER, -- review the decision came from
+    decided_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT uq_match_decision_key UNIQUE (fingerprint, work_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_match_decisions_work ON match_decisions(work_id);
+
+-- Existing reviews are loaded with POST /api/matches/rebuild-decisions, as
+-- fingerprints are computed by the application
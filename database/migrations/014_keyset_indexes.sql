@@ -0,0 +1,4 @@
+-- Indexes backing keyset (cursor) pagination of the list endpoints
+CREATE INDEX IF NOT EXISTS idx_works_title_id ON works(title, id);
+CREATE INDEX IF NOT EXISTS idx_batches_created_id ON processing_batches(created_at, id);
+CREATE INDEX IF NOT EXISTS idx_usage_records_batch_row ON usage_records(batch_id, row_number, id);
@@ -0,0 +1,16 @@
+-- Outcome of matching per usage record, so unmatched listings are scoped
+-- to the batch instead of scanning every match_results row
+ALTER TABLE usage_records ADD COLUMN IF NOT EXISTS match_status VARCHAR(20) NOT NULL DEFAULT 'unmatched';
+
+-- Backfill from each record's best match, as MatchingService.classify_outcome does
+UPDATE usage_records u
+SET match_status = CASE
+    WHEN m.match_type IN ('exact', 'high_confidence', 'ai_matched') THEN 'matched'
+    ELSE 'flagged'
+END
+FROM match_results m
+WHERE m.id = u.best_match_id;
+
+CREATE INDEX IF NOT EXISTS idx_usage_records_unmatched ON usage_records(batch_id, row_number, id)
+    WHERE match_status = 'unmatched';
+CREATE INDEX IF NOT EXISTS idx_usage_records_status ON usage_records(batch_id, match_status);
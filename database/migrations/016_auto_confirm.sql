@@ -0,0 +1,3 @@
+-- Matches confirmed by an auto-confirmation rule rather than a reviewer
+ALTER TABLE match_results ADD COLUMN IF NOT EXISTS auto_confirm_rule VARCHAR(50);
+ALTER TABLE processing_batches ADD COLUMN IF NOT EXISTS auto_confirmed_records INTEGER DEFAULT 0;
@@ -0,0 +1,204 @@
+-- Partition usage_records and match_results by batch: one LIST partition per
+-- batch in each table, created with the batch (create_batch_partitions) and
+-- dropped with it (drop_batch_partitions), so deleting or archiving a batch
+-- never touches other batches' rows. Queries filtering on batch_id read
+-- only that batch's partition.
+--
+-- Rewrites both tables; run it while no batches are being processed.
+
+BEGIN;
+
+-- Partition keys must be part of every unique key, so primary keys become
+-- (id, batch_id) and foreign keys into these tables carry the batch
+ALTER TABLE ai_review_queue DROP CONSTRAINT IF EXISTS ai_review_queue_match_result_id_fkey;
+
+ALTER TABLE match_results RENAME TO match_results_unpartitioned;
+ALTER INDEX match_results_pkey RENAME TO match_results_unpartitioned_pkey;
+ALTER TABLE usage_records RENAME TO usage_records_unpartitioned;
+ALTER INDEX usage_records_pkey RENAME TO usage_records_unpartitioned_pkey;
+ALTER SEQUENCE usage_records_id_seq OWNED BY NONE;
+ALTER SEQUENCE match_results_id_seq OWNED BY NONE;
+
+CREATE TABLE usage_records (
+    id INTEGER NOT NULL DEFAULT nextval('usage_records_id_seq'),
+    batch_id UUID NOT NULL,
+    recording_title VARCHAR(500),
+    recording_artist VARCHAR(500),
+    work_title VARCHAR(500),
+    work_title_normalized VARCHAR(500),
+    songwriter VARCHAR(500),
+    songwriter_normalized VARCHAR(500),
+    iswc VARCHAR(20),
+    work_code VARCHAR(50),
+    original_row_data JSONB,
+    row_number INTEGER,
+    title_embedding vector(768),
+    songwriter_embedding vector(768),
+    match_status VARCHAR(20) NOT NULL DEFAULT 'unmatched',
+    match_stage VARCHAR(50),
+    best_match_id INTEGER,
+    best_confidence DECIMAL(5, 4),
+    is_degraded BOOLEAN DEFAULT FALSE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, batch_id)
+) PARTITION BY LIST (batch_id);
+
+CREATE TABLE match_results (
+    id INTEGER NOT NULL DEFAULT nextval('match_results_id_seq'),
+    batch_id UUID NOT NULL,
+    usage_record_id INTEGER NOT NULL,
+    work_id INTEGER NOT NULL REFERENCES works(id) ON DELETE CASCADE,
+    confidence_score DECIMAL(5, 4) NOT NULL,
+    match_type VARCHAR(50) NOT NULL,
+    title_similarity DECIMAL(5, 4),
+    songwriter_similarity DECIMAL(5, 4),
+    vector_similarity DECIMAL(5, 4),
+    ai_reasoning TEXT,
+    is_confirmed BOOLEAN DEFAULT FALSE,
+    is_rejected BOOLEAN DEFAULT FALSE,
+    reviewed_at TIMESTAMP,
+    auto_confirm_rule VARCHAR(50),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (id, batch_id),
+    FOREIGN KEY (usage_record_id, batch_id) REFERENCES usage_records(id, batch_id) ON DELETE CASCADE
+) PARTITION BY LIST (batch_id);
+
+-- Partition naming and lifecycle, shared by the application and scripts.
+-- The lifecycle functions run under lock_timeout; app/services/partitions.py
+-- explains why and retries them.
+CREATE OR REPLACE FUNCTION batch_partition_name(parent TEXT, batch UUID)
+RETURNS TEXT AS $$
+    SELECT parent || '_' || replace(batch::text, '-', '');
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION create_batch_partitions(batch UUID)
+RETURNS VOID AS $$
+BEGIN
+    EXECUTE format(
+        'CREATE TABLE IF NOT EXISTS %I PARTITION OF usage_records FOR VALUES IN (%L)',
+        batch_partition_name('usage_records', batch), batch
+    );
+    EXECUTE format(
+        'CREATE TABLE IF NOT EXISTS %I PARTITION OF match_results FOR VALUES IN (%L)',
+        batch_partition_name('match_results', batch), batch
+    );
+END;
+$$ LANGUAGE plpgsql
+SET lock_timeout = '2s';
+
+CREATE OR REPLACE FUNCTION drop_batch_partitions(batch UUID)
+RETURNS VOID AS $$
+DECLARE
+    parent_name TEXT;
+    partition_name TEXT;
+BEGIN
+    -- A partition can't be detached while queued reviews still point into it
+    DELETE FROM ai_review_queue WHERE batch_id = batch;
+
+    -- Matches first, as they reference the usage records
+    FOREACH parent_name IN ARRAY ARRAY['match_results', 'usage_records'] LOOP
+        partition_name := batch_partition_name(parent_name, batch);
+        IF to_regclass(partition_name) IS NOT NULL THEN
+            EXECUTE format('ALTER TABLE %I DETACH PARTITION %I', parent_name, partition_name);
+            EXECUTE format('DROP TABLE %I', partition_name);
+        END IF;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql
+SET lock_timeout = '2s';
+
+-- One partition per existing batch, including records whose batch row is gone
+SELECT create_batch_partitions(batch_id)
+FROM (
+    SELECT id AS batch_id FROM processing_batches
+    UNION
+    SELECT DISTINCT batch_id FROM usage_records_unpartitioned
+) batches;
+
+INSERT INTO usage_records (
+    id, batch_id, recording_title, recording_artist, work_title, work_title_normalized,
+    songwriter, songwriter_normalized, iswc, work_code, original_row_data, row_number,
+    title_embedding, songwriter_embedding, match_status, match_stage, best_match_id,
+    best_confidence, is_degraded, created_at
+)
+SELECT
+    id, batch_id, recording_title, recording_artist, work_title, work_title_normalized,
+    songwriter, songwriter_normalized, iswc, work_code, original_row_data, row_number,
+    title_embedding, songwriter_embedding, match_status, match_stage, best_match_id,
+    best_confidence, is_degraded, created_at
+FROM usage_records_unpartitioned;
+
+INSERT INTO match_results (
+    id, batch_id, usage_record_id, work_id, confidence_score, match_type, title_similarity,
+    songwriter_similarity, vector_similarity, ai_reasoning, is_confirmed, is_rejected,
+    reviewed_at, auto_confirm_rule, created_at
+)
+SELECT
+    m.id, u.batch_id, m.usage_record_id, m.work_id, m.confidence_score, m.match_type,
+    m.title_similarity, m.songwriter_similarity, m.vector_similarity, m.ai_reasoning,
+    m.is_confirmed, m.is_rejected, m.reviewed_at, m.auto_confirm_rule, m.created_at
+FROM match_results_unpartitioned m
+JOIN usage_records_unpartitioned u ON u.id = m.usage_record_id;
+
+DROP TABLE match_results_unpartitioned;
+DROP TABLE usage_records_unpartitioned;
+ALTER SEQUENCE usage_records_id_seq OWNED BY usage_records.id;
+ALTER SEQUENCE match_results_id_seq OWNED BY match_results.id;
+
+-- The normalize trigger went with the old table. Created on the parent
+-- after the copy, which already carries normalized values, it is cloned
+-- onto every partition, including those created later.
+DROP TRIGGER IF EXISTS usage_normalize_trigger ON usage_records;
+CREATE TRIGGER usage_normalize_trigger
+    BEFORE INSERT OR UPDATE ON usage_records
+    FOR EACH ROW
+    EXECUTE FUNCTION update_usage_normalized();
+
+-- Check that a batch partition created from now on normalizes its rows
+DO $$
+DECLARE
+    check_batch UUID := gen_random_uuid();
+    check_record usage_records%ROWTYPE;
+BEGIN
+    PERFORM create_batch_partitions(check_batch);
+    INSERT INTO usage_records (batch_id, work_title, songwriter)
+    VALUES (check_batch, 'Yesterday!', 'McCartney, Paul')
+    RETURNING * INTO check_record;
+    PERFORM drop_batch_partitions(check_batch);
+
+    IF check_record.work_title_normalized IS DISTINCT FROM normalize_text('Yesterday!')
+        OR check_record.songwriter_normalized IS DISTINCT FROM normalize_text('McCartney, Paul') THEN
+        RAISE EXCEPTION 'usage_normalize_trigger does not fire on batch partitions';
+    END IF;
+END;
+$$;
+
+-- Indexes are created on the parents and so on every partition. Dropped:
+-- idx_usage_batch, as each partition holds a single batch, and the
+-- usage title ivfflat index, which nothing searches and which would be
+-- built on each partition while it is still empty.
+CREATE INDEX idx_usage_title_normalized ON usage_records(work_title_normalized);
+CREATE INDEX idx_usage_match_stage ON usage_records(batch_id, match_stage);
+CREATE INDEX idx_usage_records_degraded ON usage_records(batch_id) WHERE is_degraded;
+CREATE INDEX idx_usage_best_confidence ON usage_records(batch_id, best_confidence DESC);
+CREATE INDEX idx_usage_records_batch_row ON usage_records(batch_id, row_number, id);
+CREATE INDEX idx_usage_records_unmatched ON usage_records(batch_id, row_number, id)
+    WHERE match_status = 'unmatched';
+CREATE INDEX idx_usage_records_status ON usage_records(batch_id, match_status);
+
+CREATE INDEX idx_match_usage ON match_results(usage_record_id);
+CREATE INDEX idx_match_work ON match_results(work_id);
+CREATE INDEX idx_match_confidence ON match_results(confidence_score);
+CREATE INDEX idx_match_type ON match_results(match_type);
+
+DELETE FROM ai_review_queue q
+WHERE NOT EXISTS (
+    SELECT 1 FROM match_results m WHERE m.id = q.match_result_id AND m.batch_id = q.batch_id
+);
+ALTER TABLE ai_review_queue ADD CONSTRAINT ai_review_queue_match_result_fkey
+    FOREIGN KEY (match_result_id, batch_id) REFERENCES match_results(id, batch_id) ON DELETE CASCADE;
+
+COMMIT;
+
+ANALYZE usage_records;
+ANALYZE match_results;
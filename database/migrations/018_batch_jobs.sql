@@ -0,0 +1,21 @@
+-- Background deletion (and optional archival) of batches
+CREATE TABLE IF NOT EXISTS batch_jobs (
+    id UUID PRIMARY KEY,
+    batch_id UUID NOT NULL, -- no foreign key: the batch is what gets deleted
+    archive BOOLEAN NOT NULL DEFAULT FALSE,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending', -- 'pending', 'running', 'completed', 'failed'
+    rows_total INTEGER DEFAULT 0,
+    rows_done INTEGER DEFAULT 0,
+    -- The step the job is on, so deletion reports progress after archiving:
+    -- 'archiving', 'dropping_partitions' or 'deleting_batch'. A job resumed
+    -- after a restart skips the steps it already finished.
+    phase VARCHAR(30),
+    archive_path TEXT,
+    error_message TEXT,
+    started_at TIMESTAMP,
+    completed_at TIMESTAMP,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_batch_jobs_batch ON batch_jobs(batch_id);
+CREATE INDEX IF NOT EXISTS idx_batch_jobs_active ON batch_jobs(status) WHERE status IN ('pending', 'running');
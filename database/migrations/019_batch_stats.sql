@@ -0,0 +1,26 @@
+-- Per-batch statistics kept up to date as batches are matched and reviewed,
+-- so dashboards never scan match_results
+CREATE TABLE IF NOT EXISTS batch_stats (
+    batch_id UUID PRIMARY KEY REFERENCES processing_batches(id) ON DELETE CASCADE,
+    match_types JSONB NOT NULL DEFAULT '{}', -- match_type -> match results
+    confidence_histogram JSONB NOT NULL DEFAULT '{}', -- bucket lower bound ('0.85') -> match results
+    decided_by JSONB NOT NULL DEFAULT '{}', -- cascade stage -> usage records it decided
+    stage_runs JSONB NOT NULL DEFAULT '{}', -- cascade stage -> records it ran for
+    stage_seconds JSONB NOT NULL DEFAULT '{}', -- cascade stage -> total seconds
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Add the numbers of two JSON objects key by key: ({"a": 1}, {"a": 2, "b": 1}) -> {"a": 3, "b": 1}
+CREATE OR REPLACE FUNCTION jsonb_add_counts(totals JSONB, delta JSONB)
+RETURNS JSONB AS $$
+    SELECT COALESCE(jsonb_object_agg(key, amount), '{}'::jsonb)
+    FROM (
+        SELECT key, SUM(value::numeric) AS amount
+        FROM (
+            SELECT key, value FROM jsonb_each_text(COALESCE(totals, '{}'::jsonb))
+            UNION ALL
+            SELECT key, value FROM jsonb_each_text(COALESCE(delta, '{}'::jsonb))
+        ) entries
+        GROUP BY key
+    ) sums;
+$$ LANGUAGE sql IMMUTABLE;
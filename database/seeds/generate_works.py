@@ -74,8 +74,10 @@ def generate_title():
 
 
 def generate_iswc(index):
-    """Generate a plausible ISWC."""
-    return f"T-{str(index).zfill(3)}.{random.randint(100, 999)}.{random.randint(100, 999)}-{random.randint(0, 9)}"
+    """Generate a plausible ISWC with a valid check digit."""
+    digits = f"{index % 1000:03d}{random.randint(100, 999)}{random.randint(100, 999)}"
+    total = 1 + sum(position * int(digit) for position, digit in enumerate(digits, start=1))
+    return f"T-{digits[:3]}.{digits[3:6]}.{digits[6:]}-{(10 - total % 10) % 10}"
 
 
 def generate_work(index):
@@ -81,6 +81,13 @@ export default function BatchDetails() {
             AI
           </span>
         );
+      case 'pending_ai':
+        return (
+          <span className="badge badge-info">
+            <Sparkles size={10} style={{ marginRight: '4px' }} />
+            AI pending
+          </span>
+        );
       case 'medium_confidence':
         return <span className="badge badge-warning">Medium</span>;
       case 'low_confidence':
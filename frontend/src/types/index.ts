@@ -6,6 +6,17 @@ export interface Batch {
   matched_records: number;
   unmatched_records: number;
   flagged_records: number;
+  embeddings_skipped?: number;
+  ai_cache_hits?: number;
+  ai_cache_misses?: number;
+  ai_cache_hit_rate?: number | null;
+  ai_reviews_queued?: number;
+  pending_ai_reviews?: number;
+  ai_skipped?: number;
+  ai_calls?: number;
+  ai_seconds?: number;
+  degraded_records?: number;
+  auto_confirmed_records?: number;
   status: 'pending' | 'processing' | 'completed' | 'failed';
   error_message?: string;
   started_at?: string;
@@ -35,7 +46,7 @@ export interface Match {
   usage_record: UsageRecord;
   work: Work;
   confidence_score: number;
-  match_type: 'exact' | 'high_confidence' | 'medium_confidence' | 'low_confidence' | 'ai_matched';
+  match_type: 'exact' | 'high_confidence' | 'medium_confidence' | 'low_confidence' | 'ai_matched' | 'pending_ai';
   title_similarity?: number;
   songwriter_similarity?: number;
   vector_similarity?: number;
@@ -43,6 +54,7 @@ export interface Match {
   is_confirmed: boolean;
   is_rejected: boolean;
   reviewed_at?: string;
+  auto_confirm_rule?: string | null;
   created_at: string;
 }
 